@@ -1,22 +1,23 @@
 from distutils.log import debug
 import os
 import json
-from flask import Flask, request
+from flask import Flask, request, jsonify
 from flask import send_file, abort, render_template
 from housing.config.configuration import Configuration
-from housing.constants import CONFIG_DIR, get_current_time_stamp
+from housing.constants import CONFIG_DIR, PREDICTION_INTERVAL_QUANTILE_LIST, get_current_time_stamp
 from housing.entity.housing_predictor import HousingPredictor, HousingData
+from housing.entity.prediction_interval import validate_quantile_list
 from housing.pipeline.pipeline import Pipeline
 from housing.utils.utils import read_yaml_file, write_yaml_file
 from housing.logger import logging, get_log_dataframe
 from housing.exception import HousingException
 
-
 ROOT_DIR = os.getcwd()
 LOG_FOLDER_NAME = "housing_logs"
 PIPELINE_FOLDER_NAME = "housing"
 SAVED_MODELS_DIR_NAME = "saved_models"
 MODEL_CONFIG_FILE_PATH = os.path.join(ROOT_DIR, CONFIG_DIR, "model.yaml")
+SCHEMA_FILE_PATH = os.path.join(ROOT_DIR, CONFIG_DIR, "schema.yaml")
 LOG_DIR = os.path.join(ROOT_DIR, LOG_FOLDER_NAME)
 PIPELINE_DIR = os.path.join(ROOT_DIR, PIPELINE_FOLDER_NAME)
 MODEL_DIR = os.path.join(ROOT_DIR, SAVED_MODELS_DIR_NAME)
@@ -24,6 +25,8 @@ MODEL_DIR = os.path.join(ROOT_DIR, SAVED_MODELS_DIR_NAME)
 
 HOUSING_DATA_KEY = "housing_data"
 MEDIAN_HOUSING_VALUE_KEY = "median_house_value"
+QUANTILE_LIST_KEY = "quantiles"
+PREDICTION_INTERVAL_KEY = "prediction_interval"
 
 app = Flask(__name__)
 
@@ -73,17 +76,45 @@ def index():
 def view_experiment_history():
     try:
         experiment_df = Pipeline.get_experiments_status()
-        context = {"experiment": experiment_df.to_html(classes="table table-striped col-12")}
+        stage_metric_df = Pipeline.get_stage_metrics()
+        context = {
+            "experiment": experiment_df.to_html(classes="table table-striped col-12"),
+            "stage_metric": stage_metric_df.to_html(classes="table table-striped col-12", index=False),
+        }
         return render_template("experiment_history.html", context=context)
     except Exception as e:
         return str(e)
 
+
 @app.route("/train", methods=["GET", "POST"])
 def train():
     message = ""
-    pipeline = Pipeline(config=Configuration(current_time_stamp=get_current_time_stamp()))
+    # ?profile=true dumps cProfile stats of each stage in artifact profile directory
+    profile_stages = request.args.get("profile", "false").lower() == "true"
+    # ?sample_mode=true runs quick pipeline on data sample, its model is never accepted or exported
+    is_sample_mode = request.args.get("sample_mode")
+    if is_sample_mode is not None:
+        is_sample_mode = is_sample_mode.lower() == "true"
+    # ?resume=true continues experiment interrupted by worker restart, completed search fits are not repeated
+    interrupted_experiment = None
+    if request.args.get("resume", "false").lower() == "true":
+        interrupted_experiment = Pipeline.get_interrupted_experiment()
+    if interrupted_experiment is not None:
+        pipeline = Pipeline(
+            config=Configuration(
+                current_time_stamp=interrupted_experiment.artifact_time_stamp,
+                is_sample_mode=interrupted_experiment.is_sample_mode,
+            ),
+            profile_stages=profile_stages,
+            resume_experiment_id=interrupted_experiment.experiment_id,
+        )
+    else:
+        pipeline = Pipeline(
+            config=Configuration(current_time_stamp=get_current_time_stamp(), is_sample_mode=is_sample_mode),
+            profile_stages=profile_stages,
+        )
     if not Pipeline.experiment.running_status:
-        message = "Training started."
+        message = "Training started." if interrupted_experiment is None else "Training resumed."
         pipeline.start()
     else:
         message = "Training is already in progress."
@@ -131,6 +162,45 @@ def predict():
     return render_template("predict.html", context=context)
 
 
+@app.route("/api/predict", methods=["POST"])
+def predict_api():
+    """
+    JSON prediction with uncertainty band. Request: {"housing_data": record or list of records, "quantiles": [...]},
+    quantiles are optional. Response: median house value and value at every quantile of every record.
+    Invalid requests get 400 with the reason, prediction failures get 500 without internal details.
+    """
+    payload = request.get_json(force=True, silent=True)
+    if not isinstance(payload, dict) or HOUSING_DATA_KEY not in payload:
+        return jsonify({"error": f"Invalid request: JSON object with {HOUSING_DATA_KEY} is expected"}), 400
+    record_list = payload[HOUSING_DATA_KEY]
+    record_list = [record_list] if isinstance(record_list, dict) else record_list
+    error_message = HousingData.get_record_list_error_message(record_list, read_yaml_file(SCHEMA_FILE_PATH))
+    if error_message is not None:
+        return jsonify({"error": f"Invalid request: {error_message}"}), 400
+    try:
+        quantile_list = validate_quantile_list(
+            payload.get(QUANTILE_LIST_KEY, PREDICTION_INTERVAL_QUANTILE_LIST)
+        ).tolist()
+    except Exception as e:
+        return jsonify({"error": f"Invalid request: {e}"}), 400
+    try:
+        housing_df = HousingData.get_housing_input_data_frame_of_records(record_list)
+        housing_predictor = HousingPredictor(model_dir=MODEL_DIR)
+        median_housing_value, prediction_interval = housing_predictor.predict_with_interval(
+            X=housing_df, quantile_list=quantile_list
+        )
+        return jsonify(
+            {
+                MEDIAN_HOUSING_VALUE_KEY: median_housing_value.tolist(),
+                QUANTILE_LIST_KEY: quantile_list,
+                PREDICTION_INTERVAL_KEY: prediction_interval.tolist(),
+            }
+        )
+    except Exception as e:
+        logging.info(f"Prediction api error: {e}")
+        return jsonify({"error": "Prediction failed"}), 500
+
+
 @app.route("/saved_models", defaults={"req_path": "saved_models"})
 @app.route("/saved_models/<path:req_path>")
 def saved_models_dir(req_path):
@@ -154,19 +224,47 @@ def saved_models_dir(req_path):
     return render_template("saved_models_files.html", result=result)
 
 
+def get_search_plan(model_config: dict):
+    # planner imports model selection modules, loaded only when model config page is used
+    from housing.entity.search_planner import SearchCostPlanner
+
+    model_trainer_config = Configuration().get_model_trainer_config()
+    search_cost_planner = SearchCostPlanner(
+        model_config=model_config,
+        fit_timing_file_path=model_trainer_config.fit_timing_file_path,
+        search_time_budget=model_trainer_config.search_time_budget,
+        default_fit_time=model_trainer_config.default_fit_time,
+    )
+    return search_cost_planner.get_search_plan()
+
+
 @app.route("/update_model_config", methods=["GET", "POST"])
 def update_model_config():
     try:
+        message = None
         if request.method == "POST":
             model_config = request.form["new_model_config"]
             model_config = model_config.replace("'", '"')
             print(model_config)
             model_config = json.loads(model_config)
 
-            write_yaml_file(file_path=MODEL_CONFIG_FILE_PATH, data=model_config)
+            search_plan = get_search_plan(model_config=model_config)
+            if search_plan.is_within_budget:
+                write_yaml_file(file_path=MODEL_CONFIG_FILE_PATH, data=model_config)
+                message = f"Model config updated. Estimated search time: {search_plan.estimated_time:.1f} seconds"
+            else:
+                message = (
+                    f"Model config rejected. {search_plan.fit_count} fits estimated to take "
+                    f"{search_plan.estimated_time:.1f} seconds, more than budget of "
+                    f"{search_plan.search_time_budget} seconds"
+                )
 
         model_config = read_yaml_file(file_path=MODEL_CONFIG_FILE_PATH)
-        return render_template("update_model.html", result={"model_config": model_config})
+        search_plan = get_search_plan(model_config=model_config)
+        return render_template(
+            "update_model.html",
+            result={"model_config": model_config, "search_plan": search_plan, "message": message},
+        )
 
     except Exception as e:
         logging.exception(e)
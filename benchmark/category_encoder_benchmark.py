@@ -0,0 +1,129 @@
+# Fit and transform time of categorical pipeline and of whole preprocessing: previous sparse OneHotEncoder with
+# StandardScaler(with_mean=False) versus dense schema driven CategoryEncoder, on synthetic rows following schema
+# ? usage: python benchmark/category_encoder_benchmark.py --rows 20640 1000000
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from housing.component.data_transformation import DataTransformation  # noqa: E402
+from housing.constants import (  # noqa: E402
+    ROOT_DIR,
+    SCHEMA_CATEGORICAL_COLUMN_KEY,
+    SCHEMA_DOMAIN_VALUE_KEY,
+    SCHEMA_NUMERICAL_COLUMN_KEY,
+)
+from housing.entity.artifact_entity import DataValidationArtifact  # noqa: E402
+from housing.entity.config_entity import DataTransformationConfig  # noqa: E402
+from housing.utils.utils import read_yaml_file  # noqa: E402
+
+SCHEMA_FILE_PATH = os.path.join(ROOT_DIR, "config", "schema.yaml")
+
+
+def get_data(rows: int, schema: dict) -> pd.DataFrame:
+    random_state = np.random.RandomState(42)
+    df = pd.DataFrame(
+        random_state.rand(rows, len(schema[SCHEMA_NUMERICAL_COLUMN_KEY])) * 1000 + 1,
+        columns=schema[SCHEMA_NUMERICAL_COLUMN_KEY],
+    )
+    for column in schema[SCHEMA_CATEGORICAL_COLUMN_KEY]:
+        df[column] = random_state.choice(schema[SCHEMA_DOMAIN_VALUE_KEY][column], rows)
+    return df
+
+
+def get_preprocessing_pair(schema: dict) -> tuple:
+    """Return (previous, current) preprocessing objects, previous one differs in categorical pipeline only"""
+    data_transformation = DataTransformation(
+        data_transformation_config=DataTransformationConfig(
+            add_bedroom_per_room=True,
+            transformed_train_dir=None,
+            transformed_test_dir=None,
+            preprocess_object_file_path=None,
+            streaming_chunk_size=None,
+            streaming_fit_sample_size=None,
+            array_order="C",
+            precision="float64",
+            inplace_scaling=True,
+            spatial_n_neighbors=None,
+        ),
+        data_ingestion_artifact=None,
+        data_validation_artifact=DataValidationArtifact(SCHEMA_FILE_PATH, None, None, True, None),
+    )
+    preprocessing = data_transformation.get_data_transformer_object()
+    previous_cat_pipe = Pipeline(
+        steps=[
+            ("imputer", SimpleImputer(strategy="most_frequent")),
+            ("ohe", OneHotEncoder()),
+            ("scaler", StandardScaler(with_mean=False)),
+        ]
+    )
+    previous_preprocessing = clone(preprocessing).set_params(cat_pipeline=previous_cat_pipe)
+    return previous_preprocessing, preprocessing
+
+
+def best_time(function, X, repeat: int) -> float:
+    time_list = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function(X)
+        time_list.append(time.perf_counter() - start_time)
+    return min(time_list)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sparse OneHotEncoder vs dense CategoryEncoder")
+    parser.add_argument("--rows", type=int, nargs="+", default=[20640, 1000000])
+    parser.add_argument("--repeat", type=int, default=3, help="best wall time of repeated runs is reported")
+    args = parser.parse_args()
+    schema = read_yaml_file(SCHEMA_FILE_PATH)
+    categorical_columns = schema[SCHEMA_CATEGORICAL_COLUMN_KEY]
+
+    print(f"{'rows':>10}  {'case':<36}{'previous s':>12}{'current s':>12}{'speedup':>9}")
+    for rows in args.rows:
+        df = get_data(rows, schema)
+        previous_preprocessing, preprocessing = get_preprocessing_pair(schema)
+        previous_cat_pipe = previous_preprocessing.transformers[1][1]
+        cat_pipe = preprocessing.transformers[1][1]
+        case_dict = {
+            "categorical pipeline fit_transform": (
+                lambda X: previous_cat_pipe.fit_transform(X[categorical_columns]),
+                lambda X: cat_pipe.fit_transform(X[categorical_columns]),
+            ),
+            "categorical pipeline transform": (
+                lambda X: previous_cat_pipe.transform(X[categorical_columns]),
+                lambda X: cat_pipe.transform(X[categorical_columns]),
+            ),
+            "preprocessing fit_transform": (previous_preprocessing.fit_transform, preprocessing.fit_transform),
+            "preprocessing transform": (previous_preprocessing.transform, preprocessing.transform),
+        }
+        for case_name, (previous_function, function) in case_dict.items():
+            previous_time = best_time(previous_function, df, args.repeat)
+            current_time = best_time(function, df, args.repeat)
+            print(
+                f"{rows:>10}  {case_name:<36}{previous_time:>12.4f}{current_time:>12.4f}"
+                f"{previous_time / current_time:>9.2f}"
+            )
+            sys.stdout.flush()
+
+        # same values up to category column order, previous encoder sorts categories
+        previous_arr = previous_preprocessing.transform(df)
+        previous_arr = previous_arr.toarray() if hasattr(previous_arr, "toarray") else previous_arr
+        arr = preprocessing.transform(df)
+        encoder = cat_pipe.named_steps["encoder"]
+        n_numerical = arr.shape[1] - len(encoder.scale_)
+        order = np.argsort(np.concatenate(encoder.categories_).astype(str), kind="stable")
+        arr = np.c_[arr[:, :n_numerical], arr[:, n_numerical:][:, order]]
+        print(f"{rows:>10}  max abs difference of output: {np.abs(previous_arr - arr).max():.2e}")
+
+
+if __name__ == "__main__":
+    main()
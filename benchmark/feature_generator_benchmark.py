@@ -0,0 +1,97 @@
+# Transform time and peak memory of FeatureGenerator and of the numerical preprocessing pipeline:
+# previous np.c_ implementation versus preallocated output with in-place ratios, with and without in-place scaling.
+# Peak is traced memory allocated during the call, input excluded.
+# ? usage: python benchmark/feature_generator_benchmark.py --rows 1000000 10000000
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, StandardScaler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from housing.component.data_transformation import FeatureGenerator  # noqa: E402
+
+# numerical columns of schema, in schema order
+COLUMN_LIST = [
+    "longitude",
+    "latitude",
+    "housing_median_age",
+    "total_rooms",
+    "total_bedrooms",
+    "population",
+    "households",
+    "median_income",
+]
+
+
+def previous_transform(X: np.ndarray) -> np.ndarray:
+    """FeatureGenerator.transform before preallocated output, three ratio temporaries and np.c_ copy"""
+    room_per_household = X[:, 3] / X[:, 6]
+    population_per_household = X[:, 5] / X[:, 6]
+    bedrooms_per_room = X[:, 4] / X[:, 3]
+    return np.c_[X, room_per_household, population_per_household, bedrooms_per_room]
+
+
+def get_data(rows: int, dtype: str) -> np.ndarray:
+    random_state = np.random.RandomState(42)
+    # no zero households or rooms, previous implementation would pass inf to scaler
+    return (random_state.rand(rows, len(COLUMN_LIST)) * 1000 + 1).astype(dtype)
+
+
+def get_pipeline(feature_generator, inplace_scaling: bool) -> Pipeline:
+    return Pipeline(
+        steps=[
+            ("imputer", SimpleImputer(strategy="median")),
+            ("feature_gen", feature_generator),
+            ("scaler", StandardScaler(copy=not inplace_scaling)),
+        ]
+    )
+
+
+def measure(function, X: np.ndarray) -> tuple:
+    """Return (wall time, peak traced memory in MB) of function(X)"""
+    gc.collect()
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    result = function(X)
+    wall_time = time.perf_counter() - start_time
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return wall_time, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FeatureGenerator transform time and peak memory")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000000, 10000000])
+    parser.add_argument("--dtype", default="float64", choices=["float32", "float64"])
+    args = parser.parse_args()
+
+    case_dict = {
+        "feature generator, previous": previous_transform,
+        "feature generator, preallocated": FeatureGenerator(columns=COLUMN_LIST).transform,
+        "numerical pipeline, previous": get_pipeline(FunctionTransformer(previous_transform), False).fit_transform,
+        "numerical pipeline, preallocated": get_pipeline(FeatureGenerator(columns=COLUMN_LIST), False).fit_transform,
+        "numerical pipeline, + inplace scaling": get_pipeline(
+            FeatureGenerator(columns=COLUMN_LIST), True
+        ).fit_transform,
+    }
+    print(f"{'rows':>10}  {'case':<40}{'time s':>9}{'peak MB':>10}{'input MB':>10}")
+    for rows in args.rows:
+        X = get_data(rows, args.dtype)
+        for case_name, function in case_dict.items():
+            wall_time, peak = measure(function, X)
+            print(f"{rows:>10}  {case_name:<40}{wall_time:>9.3f}{peak:>10.1f}{X.nbytes / 2**20:>10.1f}")
+            sys.stdout.flush()
+        del X
+
+
+if __name__ == "__main__":
+    main()
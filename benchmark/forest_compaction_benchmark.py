@@ -0,0 +1,74 @@
+# Size, prediction latency and accuracy of compacted RandomForestRegressor against original forest per compaction
+# tolerance and leaf value dtype. Forest is compacted on out of bag training rows and scored on separate fresh rows.
+# ? usage: python benchmark/forest_compaction_benchmark.py --rows 20640 --n-estimators 100 --tolerance 0 0.005 0.02
+import argparse
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from housing.constants import COMPACTION_VALUE_DTYPE_LIST  # noqa: E402
+from housing.entity.forest_compaction import compact_forest, get_rmse  # noqa: E402
+
+
+def get_data(rows: int, n_features: int, random_state: np.random.RandomState) -> tuple:
+    X = random_state.randn(rows, n_features)
+    y = 3 * X[:, 0] + np.sin(X[:, 1]) + X[:, 2] * X[:, 3] + random_state.randn(rows) * 0.3
+    return X, y
+
+
+def get_latency(model, X: np.ndarray, n_row_sample: int) -> tuple:
+    """Return (batch prediction time of X, median single row prediction time)"""
+    start_time = time.perf_counter()
+    model.predict(X)
+    batch_latency = time.perf_counter() - start_time
+    row_latency_list = []
+    for row_idx in range(n_row_sample):
+        start_time = time.perf_counter()
+        model.predict(X[row_idx : row_idx + 1])
+        row_latency_list.append(time.perf_counter() - start_time)
+    return batch_latency, float(np.median(row_latency_list))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Original vs compacted RandomForestRegressor")
+    parser.add_argument("--rows", type=int, default=20640, help="training rows, fresh rows are 20%%")
+    parser.add_argument("--n-features", type=int, default=19)
+    parser.add_argument("--n-estimators", type=int, default=100)
+    parser.add_argument("--tolerance", type=float, nargs="+", default=[0.0, 0.005, 0.02])
+    parser.add_argument("--n-row-sample", type=int, default=100)
+    args = parser.parse_args()
+    random_state = np.random.RandomState(42)
+    X_train, y_train = get_data(args.rows, args.n_features, random_state)
+    X_fresh, y_fresh = get_data(args.rows // 5, args.n_features, random_state)
+
+    forest = RandomForestRegressor(n_estimators=args.n_estimators, random_state=42).fit(X_train, y_train)
+    batch_latency, row_latency = get_latency(forest, X_fresh, args.n_row_sample)
+    print(f"{'model':<26}{'trees':>7}{'pickled MB':>12}{'batch s':>10}{'row ms':>9}{'fresh rmse':>12}")
+    print(
+        f"{'original':<26}{args.n_estimators:>7}{len(pickle.dumps(forest)) / 1e6:>12.2f}"
+        f"{batch_latency:>10.4f}{row_latency * 1e3:>9.3f}{float(get_rmse(y_fresh, forest.predict(X_fresh))):>12.5f}"
+    )
+    for tolerance in args.tolerance:
+        for value_dtype in COMPACTION_VALUE_DTYPE_LIST:
+            case_name = f"tolerance {tolerance:g} {value_dtype}"
+            compacted_model, _ = compact_forest(forest, X_train, y_train, tolerance, value_dtype=value_dtype)
+            if compacted_model is None:
+                print(f"{case_name:<26}  quantization exceeds tolerance")
+                continue
+            batch_latency, row_latency = get_latency(compacted_model, X_fresh, args.n_row_sample)
+            print(
+                f"{case_name:<26}{compacted_model.n_estimators:>7}{len(pickle.dumps(compacted_model)) / 1e6:>12.2f}"
+                f"{batch_latency:>10.4f}{row_latency * 1e3:>9.3f}"
+                f"{float(get_rmse(y_fresh, compacted_model.predict(X_fresh))):>12.5f}"
+            )
+            sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# File size, save time and load time of HousingEstimatorModel: previous plain pickle versus object container of
+# save_object, uncompressed (read and memory mapped) and per compressor, on synthetic rows following schema
+# ? usage: python benchmark/model_serialization_benchmark.py --rows 20640 --n-estimators 100
+import argparse
+import importlib
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from housing.component.data_transformation import DataTransformation  # noqa: E402
+from housing.component.model_trainer import HousingEstimatorModel  # noqa: E402
+from housing.constants import (  # noqa: E402
+    OBJECT_COMPRESSOR_LIST,
+    ROOT_DIR,
+    SCHEMA_CATEGORICAL_COLUMN_KEY,
+    SCHEMA_DOMAIN_VALUE_KEY,
+    SCHEMA_NUMERICAL_COLUMN_KEY,
+)
+from housing.entity.artifact_entity import DataValidationArtifact  # noqa: E402
+from housing.entity.config_entity import DataTransformationConfig  # noqa: E402
+from housing.utils.utils import get_compression_codec, load_object, read_yaml_file, save_object  # noqa: E402
+
+SCHEMA_FILE_PATH = os.path.join(ROOT_DIR, "config", "schema.yaml")
+
+
+def get_data(rows: int, schema: dict) -> pd.DataFrame:
+    random_state = np.random.RandomState(42)
+    df = pd.DataFrame(
+        random_state.rand(rows, len(schema[SCHEMA_NUMERICAL_COLUMN_KEY])) * 1000 + 1,
+        columns=schema[SCHEMA_NUMERICAL_COLUMN_KEY],
+    )
+    for column in schema[SCHEMA_CATEGORICAL_COLUMN_KEY]:
+        df[column] = random_state.choice(schema[SCHEMA_DOMAIN_VALUE_KEY][column], rows)
+    return df
+
+
+def get_model_dict(df: pd.DataFrame, y: np.ndarray, n_estimators: int) -> dict:
+    """Return fitted HousingEstimatorModel of every candidate model"""
+    data_transformation = DataTransformation(
+        data_transformation_config=DataTransformationConfig(
+            add_bedroom_per_room=True,
+            transformed_train_dir=None,
+            transformed_test_dir=None,
+            preprocess_object_file_path=None,
+            streaming_chunk_size=None,
+            streaming_fit_sample_size=None,
+            array_order="C",
+            precision="float64",
+            inplace_scaling=True,
+            spatial_n_neighbors=None,
+        ),
+        data_ingestion_artifact=None,
+        data_validation_artifact=DataValidationArtifact(SCHEMA_FILE_PATH, None, None, True, None),
+    )
+    preprocessing = data_transformation.get_data_transformer_object()
+    X = preprocessing.fit_transform(df)
+    model_dict = {}
+    for module_name, class_name, params in [
+        ("sklearn.linear_model", "LinearRegression", {}),
+        ("sklearn.ensemble", "RandomForestRegressor", {"n_estimators": n_estimators, "random_state": 42}),
+    ]:
+        model = getattr(importlib.import_module(module_name), class_name)(**params).fit(X, y)
+        model_dict[class_name] = HousingEstimatorModel(preprocessing_object=preprocessing, trained_model_object=model)
+    return model_dict
+
+
+def best_time(function, repeat: int) -> tuple:
+    """Return (result, best wall time) of repeated calls"""
+    time_list = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        result = function()
+        time_list.append(time.perf_counter() - start_time)
+    return result, min(time_list)
+
+
+def save_pickle(file_path: str, obj):
+    """Previous save_object"""
+    with open(file_path, "wb") as file_obj:
+        pickle.dump(obj, file_obj)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plain pickle vs object container model files")
+    parser.add_argument("--rows", type=int, default=20640)
+    parser.add_argument("--n-estimators", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3, help="best wall time of repeated runs is reported")
+    args = parser.parse_args()
+    schema = read_yaml_file(SCHEMA_FILE_PATH)
+    df = get_data(args.rows, schema)
+    y = df[schema[SCHEMA_NUMERICAL_COLUMN_KEY][-1]].to_numpy() * 100
+    model_dict = get_model_dict(df, y, args.n_estimators)
+
+    compressor_list = []
+    for compressor in OBJECT_COMPRESSOR_LIST:
+        try:
+            get_compression_codec(compressor)
+            compressor_list.append(compressor)
+        except Exception as e:
+            print(f"skipping compressor {compressor}: {e}")
+
+    print(f"{'model':<24}{'format':<22}{'size MB':>10}{'save s':>10}{'load s':>10}{'same prediction':>17}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for model_name, model in model_dict.items():
+            expected = model.predict(df.head(1000))
+            case_list = [("pickle", save_pickle, lambda file_path: load_object(file_path))]
+            for compressor in compressor_list:
+                case_list.append(
+                    (
+                        f"container {compressor}",
+                        lambda file_path, obj, compressor=compressor: save_object(file_path, obj, compressor),
+                        lambda file_path: load_object(file_path),
+                    )
+                )
+                if compressor == OBJECT_COMPRESSOR_LIST[0]:
+                    case_list.append(
+                        (
+                            "container none mmap",
+                            lambda file_path, obj: save_object(file_path, obj),
+                            lambda file_path: load_object(file_path, mmap_mode="r"),
+                        )
+                    )
+            for case_name, save, load in case_list:
+                file_path = os.path.join(temp_dir, case_name.replace(" ", "_"), "model.pkl")
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                _, save_time = best_time(lambda: save(file_path, model), args.repeat)
+                loaded_model, load_time = best_time(lambda: load(file_path), args.repeat)
+                same = np.array_equal(loaded_model.predict(df.head(1000)), expected)
+                print(
+                    f"{model_name:<24}{case_name:<22}{os.path.getsize(file_path) / 1e6:>10.2f}"
+                    f"{save_time:>10.4f}{load_time:>10.4f}{str(same):>17}"
+                )
+                sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
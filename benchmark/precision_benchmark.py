@@ -0,0 +1,145 @@
+# Compare float64 and float32 precision per stage on ingested housing data: wall time and peak traced memory of
+# transformation, training and prediction, bytes of transformed arrays and test accuracy delta of every model.
+# memory is traced during timed calls, tracing overhead is included in wall time of both precisions alike
+# ? usage: python benchmark/precision_benchmark.py --train-file artifact/data_ingestion/<ts>/ingested_data/train/housing.csv
+# ingested files are produced by running the pipeline once, test file is looked up next to train file
+import argparse
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from housing.component.data_transformation import DataTransformation  # noqa: E402
+from housing.component.model_trainer import HousingEstimatorModel  # noqa: E402
+from housing.constants import ROOT_DIR, TARGET_COLUMN_KEY  # noqa: E402
+from housing.entity.artifact_entity import DataValidationArtifact  # noqa: E402
+from housing.entity.config_entity import DataTransformationConfig  # noqa: E402
+from housing.entity.model_factory import ModelFactory, get_regression_metric_list  # noqa: E402
+from housing.utils.utils import load_data, read_yaml_file  # noqa: E402
+
+SCHEMA_FILE_PATH = os.path.join(ROOT_DIR, "config", "schema.yaml")
+
+MODEL_DICT = {
+    "LinearRegression": ("sklearn.linear_model", "LinearRegression", {}),
+    "RandomForestRegressor": ("sklearn.ensemble", "RandomForestRegressor", {"max_depth": 12, "random_state": 42}),
+}
+
+
+def measure(function, *args, **kwargs):
+    """Return (result, wall time, peak traced memory in MB) of function call"""
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    result = function(*args, **kwargs)
+    wall_time = time.perf_counter() - start_time
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, wall_time, peak / 2**20
+
+
+def run_precision(precision: str, train_file_path: str, test_file_path: str, n_estimators: int) -> dict:
+    target_column_name = read_yaml_file(SCHEMA_FILE_PATH)[TARGET_COLUMN_KEY]
+    data_transformation = DataTransformation(
+        data_transformation_config=DataTransformationConfig(
+            add_bedroom_per_room=True,
+            transformed_train_dir=None,
+            transformed_test_dir=None,
+            preprocess_object_file_path=None,
+            streaming_chunk_size=None,
+            streaming_fit_sample_size=None,
+            array_order="C",
+            precision=precision,
+            inplace_scaling=False,
+            spatial_n_neighbors=None,
+        ),
+        data_ingestion_artifact=None,
+        data_validation_artifact=DataValidationArtifact(SCHEMA_FILE_PATH, None, None, True, None),
+    )
+    train_df = load_data(train_file_path, SCHEMA_FILE_PATH, precision=precision)
+    test_df = load_data(test_file_path, SCHEMA_FILE_PATH, precision=precision)
+    y_train = train_df.pop(target_column_name).to_numpy(dtype=precision)
+    y_test = test_df.pop(target_column_name).to_numpy(dtype=precision)
+    preprocessing_obj = data_transformation.get_data_transformer_object()
+
+    result = {"precision": precision, "stage": {}, "accuracy": {}}
+    x_train, wall_time, peak = measure(preprocessing_obj.fit_transform, train_df)
+    result["stage"]["transformation"] = (wall_time, peak)
+    result["array_bytes"] = x_train.nbytes + y_train.nbytes
+
+    for model_name, (module_name, class_name, params) in MODEL_DICT.items():
+        model = ModelFactory.class_for_name(module_name, class_name)(**params)
+        if "n_estimators" in model.get_params():
+            model.set_params(n_estimators=n_estimators)
+        _, wall_time, peak = measure(model.fit, x_train, y_train)
+        result["stage"][f"fit {model_name}"] = (wall_time, peak)
+        # prediction input is raw test data as received by HousingEstimatorModel in serving
+        housing_model = HousingEstimatorModel(preprocessing_object=preprocessing_obj, trained_model_object=model)
+        y_pred, wall_time, peak = measure(housing_model.predict, test_df)
+        result["stage"][f"predict {model_name}"] = (wall_time, peak)
+        r2, rmse = get_regression_metric_list(y_test, [y_pred])
+        result["accuracy"][model_name] = (float(r2[0]), float(rmse[0]))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per stage time, memory and accuracy of float64 vs float32")
+    parser.add_argument("--train-file", default=None, help="ingested train csv, test csv is in sibling test dir")
+    parser.add_argument("--n-estimators", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3, help="best wall time of repeated runs is reported")
+    args = parser.parse_args()
+
+    train_file_path = args.train_file
+    if train_file_path is None:
+        train_file_list = glob.glob(
+            os.path.join(ROOT_DIR, "housing", "artifact", "data_ingestion", "*", "*", "train", "*.csv")
+        )
+        if len(train_file_list) == 0:
+            raise FileNotFoundError("No ingested train file found, run the pipeline or pass --train-file")
+        train_file_path = max(train_file_list, key=os.path.getmtime)
+    test_file_path = os.path.join(
+        os.path.dirname(os.path.dirname(train_file_path)), "test", os.path.basename(train_file_path)
+    )
+    print(f"train file: {train_file_path}")
+
+    result_dict = {}
+    for precision in ["float64", "float32"]:
+        result_list = [run_precision(precision, train_file_path, test_file_path, args.n_estimators)]
+        result_list += [
+            run_precision(precision, train_file_path, test_file_path, args.n_estimators) for _ in range(args.repeat - 1)
+        ]
+        result = result_list[0]
+        for stage_name in result["stage"]:
+            result["stage"][stage_name] = (
+                min(run["stage"][stage_name][0] for run in result_list),
+                result["stage"][stage_name][1],
+            )
+        result_dict[precision] = result
+
+    base, single = result_dict["float64"], result_dict["float32"]
+    print(f"\n{'stage':<32}{'f64 s':>9}{'f32 s':>9}{'speedup':>9}{'f64 MB':>9}{'f32 MB':>9}{'saved':>8}")
+    for stage_name, (base_time, base_peak) in base["stage"].items():
+        single_time, single_peak = single["stage"][stage_name]
+        print(
+            f"{stage_name:<32}{base_time:>9.3f}{single_time:>9.3f}{base_time / single_time:>9.2f}"
+            f"{base_peak:>9.1f}{single_peak:>9.1f}{1 - single_peak / base_peak:>8.0%}"
+        )
+    print(
+        f"\ntransformed arrays: {base['array_bytes'] / 2**20:.1f} MB (float64), "
+        f"{single['array_bytes'] / 2**20:.1f} MB (float32)"
+    )
+    print(f"\n{'model':<24}{'f64 r2':>10}{'f32 r2':>10}{'r2 delta':>11}{'f64 rmse':>11}{'f32 rmse':>11}")
+    for model_name, (base_r2, base_rmse) in base["accuracy"].items():
+        single_r2, single_rmse = single["accuracy"][model_name]
+        print(
+            f"{model_name:<24}{base_r2:>10.5f}{single_r2:>10.5f}{single_r2 - base_r2:>11.2e}"
+            f"{base_rmse:>11.1f}{single_rmse:>11.1f}"
+        )
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# Latency of HousingEstimatorModel.predict_interval against latency budget of a prediction request, for forest,
+# compacted forest and linear model, and against naive interval iterating estimators_ of the forest in python.
+# Coverage is share of fresh rows whose target lies between first and last quantile.
+# ? usage: python benchmark/prediction_interval_benchmark.py --rows 20640 --n-estimators 100 --latency-budget-ms 50
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from housing.component.data_transformation import DataTransformation  # noqa: E402
+from housing.component.model_trainer import HousingEstimatorModel  # noqa: E402
+from housing.constants import (  # noqa: E402
+    PREDICTION_INTERVAL_QUANTILE_LIST,
+    ROOT_DIR,
+    SCHEMA_CATEGORICAL_COLUMN_KEY,
+    SCHEMA_DOMAIN_VALUE_KEY,
+    SCHEMA_NUMERICAL_COLUMN_KEY,
+)
+from housing.entity.artifact_entity import DataValidationArtifact  # noqa: E402
+from housing.entity.config_entity import DataTransformationConfig  # noqa: E402
+from housing.entity.forest_compaction import compact_forest  # noqa: E402
+from housing.entity.prediction_interval import get_linear_interval_statistics  # noqa: E402
+from housing.utils.utils import read_yaml_file  # noqa: E402
+
+SCHEMA_FILE_PATH = os.path.join(ROOT_DIR, "config", "schema.yaml")
+
+
+def get_data(rows: int, schema: dict, random_state: np.random.RandomState) -> tuple:
+    """Return input dataframe following schema and noisy target depending on a few columns"""
+    df = pd.DataFrame(
+        random_state.rand(rows, len(schema[SCHEMA_NUMERICAL_COLUMN_KEY])) * 1000 + 1,
+        columns=schema[SCHEMA_NUMERICAL_COLUMN_KEY],
+    )
+    for column in schema[SCHEMA_CATEGORICAL_COLUMN_KEY]:
+        df[column] = random_state.choice(schema[SCHEMA_DOMAIN_VALUE_KEY][column], rows)
+    y = 200 * df.iloc[:, 7] + 50 * df.iloc[:, 2] + random_state.randn(rows) * 20000
+    return df, y.to_numpy()
+
+
+def get_preprocessing():
+    data_transformation = DataTransformation(
+        data_transformation_config=DataTransformationConfig(
+            add_bedroom_per_room=True,
+            transformed_train_dir=None,
+            transformed_test_dir=None,
+            preprocess_object_file_path=None,
+            streaming_chunk_size=None,
+            streaming_fit_sample_size=None,
+            array_order="C",
+            precision="float64",
+            inplace_scaling=True,
+            spatial_n_neighbors=None,
+        ),
+        data_ingestion_artifact=None,
+        data_validation_artifact=DataValidationArtifact(SCHEMA_FILE_PATH, None, None, True, None),
+    )
+    return data_transformation.get_data_transformer_object()
+
+
+def get_naive_forest_interval(housing_model, X, quantile_list: list) -> np.ndarray:
+    """Previous way: predict every tree of estimators_ one by one in python"""
+    transformed_feature = housing_model.preprocessing_object.transform(X)
+    estimator_prediction = np.stack(
+        [estimator.predict(transformed_feature) for estimator in housing_model.trained_model_object.estimators_],
+        axis=1,
+    )
+    return np.quantile(estimator_prediction, quantile_list, axis=1).T
+
+
+def get_median_latency(function, X, n_row_sample: int) -> float:
+    """Return median time of single row calls"""
+    latency_list = []
+    for row_idx in range(n_row_sample):
+        start_time = time.perf_counter()
+        function(X.iloc[row_idx : row_idx + 1])
+        latency_list.append(time.perf_counter() - start_time)
+    return float(np.median(latency_list))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prediction interval latency against latency budget")
+    parser.add_argument("--rows", type=int, default=20640)
+    parser.add_argument("--n-estimators", type=int, default=100)
+    parser.add_argument("--batch-rows", type=int, default=1000)
+    parser.add_argument("--n-row-sample", type=int, default=100)
+    parser.add_argument("--latency-budget-ms", type=float, default=50.0, help="budget of single row request")
+    args = parser.parse_args()
+    schema = read_yaml_file(SCHEMA_FILE_PATH)
+    random_state = np.random.RandomState(42)
+    train_df, y_train = get_data(args.rows, schema, random_state)
+    fresh_df, y_fresh = get_data(args.batch_rows, schema, random_state)
+    quantile_list = PREDICTION_INTERVAL_QUANTILE_LIST
+
+    preprocessing = get_preprocessing()
+    X_train = preprocessing.fit_transform(train_df)
+    forest = RandomForestRegressor(n_estimators=args.n_estimators, min_samples_leaf=3, random_state=42)
+    forest.fit(X_train, y_train)
+    compacted_forest, _ = compact_forest(forest, X_train, y_train, tolerance=0.005)
+    linear_model = LinearRegression().fit(X_train, y_train)
+    model_dict = {
+        "RandomForestRegressor": HousingEstimatorModel(preprocessing, forest),
+        "CompactForestRegressor": HousingEstimatorModel(preprocessing, compacted_forest),
+        "LinearRegression": HousingEstimatorModel(
+            preprocessing, linear_model, get_linear_interval_statistics(linear_model, X_train, y_train)
+        ),
+    }
+
+    budget = args.latency_budget_ms / 1e3
+    print(f"single row latency budget: {args.latency_budget_ms:g} ms, quantiles {quantile_list}")
+    print(
+        f"{'model':<24}{'method':<20}{'row ms':>9}{'predict+interval ms':>22}{'in budget':>11}"
+        f"{'batch ms':>10}{'coverage':>10}"
+    )
+    for model_name, housing_model in model_dict.items():
+        # first call builds flat node arrays of sklearn forest, as the first request after loading model
+        housing_model.predict_interval(fresh_df.iloc[:1], quantile_list)
+        method_dict = {"predict_interval": lambda X: housing_model.predict_interval(X, quantile_list)}
+        if model_name == "RandomForestRegressor":
+            method_dict["naive estimators_"] = lambda X: get_naive_forest_interval(housing_model, X, quantile_list)
+        predict_latency = get_median_latency(housing_model.predict, fresh_df, args.n_row_sample)
+        for method_name, method in method_dict.items():
+            row_latency = get_median_latency(method, fresh_df, args.n_row_sample)
+            start_time = time.perf_counter()
+            interval = method(fresh_df)
+            batch_latency = time.perf_counter() - start_time
+            coverage = np.mean((interval[:, 0] <= y_fresh) & (y_fresh <= interval[:, -1]))
+            request_latency = predict_latency + row_latency
+            print(
+                f"{model_name:<24}{method_name:<20}{row_latency * 1e3:>9.2f}{request_latency * 1e3:>22.2f}"
+                f"{str(request_latency <= budget):>11}{batch_latency * 1e3:>10.1f}{coverage:>10.3f}"
+            )
+            sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# Compare search strategies of model.yaml on transformed housing data: wall time, best cv score and
+# time to reach the cv score of exhaustive search (within --tolerance).
+# ? usage: python benchmark/search_strategy_benchmark.py --train-file artifact/data_transformation/<ts>/transformed_data/train/housing_feature.npy
+# transformed train file is produced by running the pipeline once
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from housing.constants import TRANSFORMED_FEATURE_FILE_SUFFIX, TRANSFORMED_TARGET_FILE_SUFFIX  # noqa: E402
+from housing.entity.model_factory import ModelFactory  # noqa: E402
+from housing.utils.utils import load_numpy_array_data  # noqa: E402
+
+PARAM_GRID = {
+    "max_features": [0.33, 0.66, 1.0],
+    "min_samples_leaf": [1, 3, 6, 12],
+    "max_depth": [8, 16, None],
+}
+
+STRATEGY_DICT = {
+    "exhaustive": {"name": "exhaustive"},
+    "randomized": {"name": "randomized", "n_iter": 12, "random_state": 42},
+    "halving_n_samples": {"name": "halving", "resource": "n_samples", "random_state": 42},
+    "halving_n_estimators": {"name": "halving", "resource": "n_estimators", "min_resources": 10},
+}
+
+
+def get_model_config(search_strategy: dict, n_estimators: int, cv: int, n_jobs: int) -> dict:
+    param_grid = dict(PARAM_GRID)
+    if search_strategy.get("resource") != "n_estimators":
+        param_grid["n_estimators"] = [n_estimators]
+    return {
+        "grid_search": {
+            "module": "sklearn.model_selection",
+            "class": "GridSearchCV",
+            "params": {"cv": cv, "verbose": 0, "n_jobs": n_jobs},
+        },
+        "model_selection": {
+            "module_0": {
+                "module": "sklearn.ensemble",
+                "class": "RandomForestRegressor",
+                "params": {"n_estimators": n_estimators, "random_state": 42},
+                "search_param_grid": param_grid,
+                # time budget disables delegation to GridSearchCV so that every strategy runs on the same engine
+                "search_strategy": {**search_strategy, "time_budget": 10**9},
+            }
+        },
+    }
+
+
+def run_strategy(strategy_name: str, model_config: dict, X, y) -> dict:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        model_config_path = os.path.join(temp_dir, "model.yaml")
+        with open(model_config_path, "w") as file:
+            yaml.safe_dump(model_config, file)
+        model_factory = ModelFactory(model_config_path=model_config_path)
+        start_time = time.perf_counter()
+        grid_searched_best_model_list = model_factory.initiate_best_parameter_search_for_initialized_models(
+            initialized_model_list=model_factory.get_initialized_model_list(), input_feature=X, output_feature=y
+        )
+        wall_time = time.perf_counter() - start_time
+    return {
+        "strategy": strategy_name,
+        "wall_time": wall_time,
+        "best_score": grid_searched_best_model_list[0].best_score,
+        "best_parameters": grid_searched_best_model_list[0].best_parameters,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time to equal score of parameter search strategies")
+    parser.add_argument("--train-file", default=None, help="transformed train feature array, target file is next to it")
+    parser.add_argument("--n-estimators", type=int, default=90)
+    parser.add_argument("--cv", type=int, default=3)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--tolerance", type=float, default=0.005, help="cv score gap treated as equal score")
+    args = parser.parse_args()
+
+    train_file_path = args.train_file
+    if train_file_path is None:
+        train_file_list = glob.glob(
+            os.path.join(
+                "housing", "artifact", "data_transformation", "*", "*", "train", f"*{TRANSFORMED_FEATURE_FILE_SUFFIX}"
+            )
+        )
+        if len(train_file_list) == 0:
+            raise FileNotFoundError("No transformed train file found, run the pipeline or pass --train-file")
+        train_file_path = max(train_file_list, key=os.path.getmtime)
+    X = load_numpy_array_data(file_path=train_file_path, mmap_mode="r")
+    y = load_numpy_array_data(
+        file_path=train_file_path.replace(TRANSFORMED_FEATURE_FILE_SUFFIX, TRANSFORMED_TARGET_FILE_SUFFIX),
+        mmap_mode="r",
+    )
+    print(f"train file: {train_file_path}, rows: {len(X)}, features: {X.shape[1]}")
+
+    result_list = []
+    for strategy_name, search_strategy in STRATEGY_DICT.items():
+        model_config = get_model_config(search_strategy, args.n_estimators, args.cv, args.n_jobs)
+        result = run_strategy(strategy_name, model_config, X, y)
+        result_list.append(result)
+        print(f"{strategy_name}: {result['wall_time']:.2f}s, cv score {result['best_score']:.4f}")
+
+    reference_result = result_list[0]
+    print(f"\n{'strategy':<22}{'wall time':>10}{'cv score':>10}{'gap':>9}{'speedup':>9}  equal score")
+    for result in result_list:
+        gap = reference_result["best_score"] - result["best_score"]
+        speedup = reference_result["wall_time"] / result["wall_time"]
+        print(
+            f"{result['strategy']:<22}{result['wall_time']:>10.2f}{result['best_score']:>10.4f}{gap:>9.4f}"
+            f"{speedup:>9.2f}  {gap <= args.tolerance}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# Peak memory of parallel cv search with in-memory training arrays (each worker receives its own copy) versus
+# memory mapped training arrays and fold indices shared by all workers.
+# Memory is summed over search process and its workers as PSS, shared pages are split between the processes that
+# map them, so shared arrays are counted once. /dev/shm growth (joblib automatic memmapping folder) is reported too.
+# ? usage: python benchmark/shared_array_benchmark.py --rows 400000 --n-jobs 1 8 32
+# linux only, reads /proc
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SEARCH_SCRIPT = """
+import os, sys, yaml, numpy as np
+sys.path.insert(0, {root_dir!r})
+from housing.entity.model_factory import ModelFactory
+from housing.utils.utils import create_memory_mapped_array
+work_dir, mode, n_jobs, rows, features = sys.argv[1], sys.argv[2], int(sys.argv[3]), int(sys.argv[4]), int(sys.argv[5])
+random_state = np.random.RandomState(42)
+X = random_state.rand(rows, features)
+y = X @ random_state.rand(features) + random_state.rand(rows)
+shared_array_dir = None
+if mode == "shared":
+    shared_array_dir = os.path.join(work_dir, "shared_array")
+    X = create_memory_mapped_array(os.path.join(shared_array_dir, "x_train.npy"), X)
+    y = create_memory_mapped_array(os.path.join(shared_array_dir, "y_train.npy"), y)
+model_config = {{
+    "grid_search": {{"module": "sklearn.model_selection", "class": "GridSearchCV", "params": {{"cv": 5, "verbose": 0}}}},
+    "parallel_search": {{"enabled": True, "n_jobs": n_jobs}},
+    "model_selection": {{
+        "module_0": {{
+            "module": "sklearn.linear_model",
+            "class": "Ridge",
+            "search_param_grid": {{"alpha": [0.01, 0.1, 1.0, 10.0], "fit_intercept": [True, False]}},
+        }}
+    }},
+}}
+model_config_path = os.path.join(work_dir, "model.yaml")
+with open(model_config_path, "w") as file:
+    yaml.safe_dump(model_config, file)
+model_factory = ModelFactory(model_config_path=model_config_path, shared_array_dir=shared_array_dir)
+model_factory.initiate_best_parameter_search_for_initialized_models(model_factory.get_initialized_model_list(), X, y)
+"""
+
+
+def get_descendant_pid_list(root_pid: int) -> list:
+    parent_pid_dict = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as stat_file:
+                # comm field may contain spaces, parent pid is second field after closing parenthesis
+                parent_pid_dict[int(entry)] = int(stat_file.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    pid_list = [root_pid]
+    for pid in pid_list:
+        pid_list.extend(child_pid for child_pid, parent_pid in parent_pid_dict.items() if parent_pid == pid)
+    return pid_list
+
+
+def get_memory_kb(pid: int) -> tuple:
+    """Return (pss, rss) of pid in KB"""
+    memory = {"Pss:": 0, "Rss:": 0}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as smaps_file:
+            for line in smaps_file:
+                field = line.split()
+                if field[0] in memory:
+                    memory[field[0]] = int(field[1])
+    except OSError:
+        pass
+    return memory["Pss:"], memory["Rss:"]
+
+
+def get_shm_used_bytes() -> int:
+    return shutil.disk_usage("/dev/shm").used if os.path.isdir("/dev/shm") else 0
+
+
+def measure_search(mode: str, n_jobs: int, rows: int, features: int) -> dict:
+    with tempfile.TemporaryDirectory() as work_dir:
+        script = SEARCH_SCRIPT.format(root_dir=ROOT_DIR)
+        shm_start = get_shm_used_bytes()
+        peak = {"pss_kb": 0, "rss_kb": 0, "shm_bytes": 0, "process_count": 0}
+        process = subprocess.Popen(
+            [sys.executable, "-c", script, work_dir, mode, str(n_jobs), str(rows), str(features)],
+            stdout=subprocess.DEVNULL,
+        )
+
+        def sample():
+            while process.poll() is None:
+                pid_list = get_descendant_pid_list(process.pid)
+                memory_list = [get_memory_kb(pid) for pid in pid_list]
+                peak["pss_kb"] = max(peak["pss_kb"], sum(pss for pss, _ in memory_list))
+                peak["rss_kb"] = max(peak["rss_kb"], sum(rss for _, rss in memory_list))
+                peak["shm_bytes"] = max(peak["shm_bytes"], get_shm_used_bytes() - shm_start)
+                peak["process_count"] = max(peak["process_count"], len(pid_list))
+                time.sleep(0.05)
+
+        start_time = time.perf_counter()
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        process.wait()
+        sampler.join()
+        if process.returncode != 0:
+            raise RuntimeError(f"search failed for mode={mode} n_jobs={n_jobs}")
+        return {"mode": mode, "n_jobs": n_jobs, "wall_time": time.perf_counter() - start_time, **peak}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory of parallel cv search, in-memory vs shared arrays")
+    parser.add_argument("--rows", type=int, default=400000)
+    parser.add_argument("--features", type=int, default=16)
+    parser.add_argument("--n-jobs", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+
+    print(f"training matrix: {args.rows} x {args.features} float64 = {args.rows * args.features * 8 / 2**20:.1f} MB")
+    print(f"{'mode':<11}{'n_jobs':>7}{'procs':>7}{'peak pss MB':>13}{'peak rss MB':>13}{'shm MB':>9}{'time s':>9}")
+    for n_jobs in args.n_jobs:
+        for mode in ["in_memory", "shared"]:
+            result = measure_search(mode, n_jobs, args.rows, args.features)
+            print(
+                f"{result['mode']:<11}{result['n_jobs']:>7}{result['process_count']:>7}"
+                f"{result['pss_kb'] / 1024:>13.1f}{result['rss_kb'] / 1024:>13.1f}"
+                f"{result['shm_bytes'] / 2**20:>9.1f}{result['wall_time']:>9.2f}"
+            )
+            sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# Training and serving time of SpatialFeatureGenerator neighborhood features: KD-tree versus naive pairwise
+# nearest neighbors (O(n^2), run up to --naive-max-rows only), and latency of single row and batched serving
+# ? usage: python benchmark/spatial_feature_benchmark.py --rows 20000 100000 1000000
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from housing.component.data_transformation import SpatialFeatureGenerator  # noqa: E402
+
+# numerical columns of schema, in schema order
+COLUMN_LIST = [
+    "longitude",
+    "latitude",
+    "housing_median_age",
+    "total_rooms",
+    "total_bedrooms",
+    "population",
+    "households",
+    "median_income",
+]
+
+
+def get_data(rows: int, random_state: np.random.RandomState) -> np.ndarray:
+    X = random_state.rand(rows, len(COLUMN_LIST)) * 1000 + 1
+    X[:, 0] = random_state.uniform(-124.3, -114.3, rows)
+    X[:, 1] = random_state.uniform(32.5, 42.0, rows)
+    X[:, 7] = random_state.uniform(0.5, 15.0, rows)
+    return X
+
+
+def get_naive_neighbor_median_income(X: np.ndarray, n_neighbors: int, chunk_size: int = 1000) -> np.ndarray:
+    """Mean median_income of nearest rows by full pairwise distance, each row left out of its own neighborhood"""
+    coordinate = SpatialFeatureGenerator.get_projected_coordinate(X[:, 1], X[:, 0])
+    result = np.empty(len(X))
+    for chunk_start in range(0, len(X), chunk_size):
+        chunk = coordinate[chunk_start : chunk_start + chunk_size]
+        distance = ((chunk[:, np.newaxis, :] - coordinate[np.newaxis, :, :]) ** 2).sum(axis=2)
+        distance[np.arange(len(chunk)), np.arange(chunk_start, chunk_start + len(chunk))] = np.inf
+        neighbor_index = np.argpartition(distance, n_neighbors, axis=1)[:, :n_neighbors]
+        result[chunk_start : chunk_start + len(chunk)] = X[neighbor_index, 7].mean(axis=1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KD-tree vs pairwise neighborhood features")
+    parser.add_argument("--rows", type=int, nargs="+", default=[20000, 100000, 1000000])
+    parser.add_argument("--n-neighbors", type=int, default=10)
+    parser.add_argument("--naive-max-rows", type=int, default=20000)
+    parser.add_argument("--serving-rows", type=int, default=1000)
+    args = parser.parse_args()
+    random_state = np.random.RandomState(42)
+
+    print(f"{'rows':>10}{'kd-tree fit+transform s':>26}{'pairwise s':>13}{'max abs diff':>15}")
+    for rows in args.rows:
+        X = get_data(rows, random_state)
+        spatial_feature_generator = SpatialFeatureGenerator(n_neighbors=args.n_neighbors, columns=COLUMN_LIST)
+        start_time = time.perf_counter()
+        generated_feature = spatial_feature_generator.fit(X).transform(X)
+        tree_time = time.perf_counter() - start_time
+        naive_time, max_diff = float("nan"), float("nan")
+        if rows <= args.naive_max_rows:
+            start_time = time.perf_counter()
+            naive_feature = get_naive_neighbor_median_income(X, args.n_neighbors)
+            naive_time = time.perf_counter() - start_time
+            max_diff = np.abs(generated_feature[:, len(COLUMN_LIST)] - naive_feature).max()
+        print(f"{rows:>10}{tree_time:>26.3f}{naive_time:>13.3f}{max_diff:>15.2e}")
+        sys.stdout.flush()
+
+        # serving rows are new rows, as received by HousingEstimatorModel.predict
+        serving_X = get_data(args.serving_rows, random_state)
+        latency_list = []
+        for row_idx in range(args.serving_rows):
+            start_time = time.perf_counter()
+            spatial_feature_generator.transform(serving_X[row_idx : row_idx + 1])
+            latency_list.append(time.perf_counter() - start_time)
+        start_time = time.perf_counter()
+        spatial_feature_generator.transform(serving_X)
+        batch_time = time.perf_counter() - start_time
+        print(
+            f"{'':>10}serving: single row call median {np.median(latency_list) * 1e6:.0f} us, "
+            f"batch of {args.serving_rows} {batch_time / args.serving_rows * 1e6:.1f} us per row"
+        )
+
+
+if __name__ == "__main__":
+    main()
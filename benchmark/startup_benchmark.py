@@ -0,0 +1,59 @@
+# Measure cold start of a web worker: time to import the app module and resident memory after import.
+# Each measurement runs in a fresh interpreter so that no module is already imported.
+# ? usage: python benchmark/startup_benchmark.py --module app --repeat 5
+# run it on two commits to compare before and after
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULE_LIST = [
+    "evidently",
+    "matplotlib",
+    "sklearn.model_selection",
+    "housing.component.data_validation",
+    "housing.component.model_trainer",
+    "housing.entity.model_factory",
+]
+
+MEASURE_SCRIPT = """
+import json, resource, sys, time
+start_time = time.perf_counter()
+import {module}
+import_time = time.perf_counter() - start_time
+max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+heavy_module_list = {heavy_module_list}
+print(json.dumps({{
+    "import_time": import_time,
+    "max_rss_mb": max_rss_mb,
+    "module_count": len(sys.modules),
+    "loaded_heavy_module": [name for name in heavy_module_list if name in sys.modules],
+}}))
+"""
+
+
+def measure_cold_import(module: str) -> dict:
+    script = MEASURE_SCRIPT.format(module=module, heavy_module_list=HEAVY_MODULE_LIST)
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold import time and RSS of a web worker")
+    parser.add_argument("--module", default="app", help="module imported by worker. Defaults to app")
+    parser.add_argument("--repeat", type=int, default=5, help="number of fresh interpreters to measure")
+    args = parser.parse_args()
+
+    result_list = [measure_cold_import(args.module) for _ in range(args.repeat)]
+    import_time_list = [result["import_time"] for result in result_list]
+    max_rss_list = [result["max_rss_mb"] for result in result_list]
+    print(f"module: {args.module}, repeat: {args.repeat}")
+    print(f"import time (s): median {statistics.median(import_time_list):.3f}, min {min(import_time_list):.3f}")
+    print(f"max rss (MB): median {statistics.median(max_rss_list):.1f}")
+    print(f"modules loaded: {result_list[-1]['module_count']}")
+    print(f"training modules loaded: {result_list[-1]['loaded_heavy_module']}")
+
+
+if __name__ == "__main__":
+    main()
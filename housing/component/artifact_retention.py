@@ -0,0 +1,313 @@
+import os
+import shutil
+import hashlib
+import argparse
+import pandas as pd
+from datetime import datetime
+from housing.entity.config_entity import ArtifactRetentionConfig
+from housing.entity.artifact_entity import ArtifactRetentionArtifact
+from housing.exception import HousingException
+from housing.logger import logging
+from housing.constants import *
+from housing.utils.utils import read_yaml_file
+
+# artifact directories having one sub directory per pipeline run named with run time stamp
+TIME_STAMPED_ARTIFACT_DIR_LIST = [
+    DATA_INGESTION_ARTIFACT_DIR,
+    DATA_VALIDATION_ARTIFACT_DIR,
+    DATA_TRANSFORMATION_ARTIFACT_DIR,
+    MODEL_TRAINER_ARTIFACT_DIR,
+    STAGE_PROFILE_DIR_NAME,
+]
+TIME_STAMP_FORMAT_LIST = ["%Y-%m-%dT%H-%M-%S", "%Y-%m-%d-%H-%M-%S"]
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def get_file_path_list(path_list: list) -> list:
+    file_path_list = []
+    for path in path_list:
+        if os.path.isfile(path):
+            file_path_list.append(path)
+            continue
+        for dir_path, _, file_name_list in os.walk(path):
+            file_path_list.extend(os.path.join(dir_path, file_name) for file_name in file_name_list)
+    return file_path_list
+
+
+def get_total_bytes(path_list: list) -> int:
+    """Return disk usage of files under path_list, hardlinked files are counted once"""
+    inode_size = {}
+    for file_path in get_file_path_list(path_list):
+        file_stat = os.stat(file_path)
+        inode_size[(file_stat.st_dev, file_stat.st_ino)] = file_stat.st_size
+    return sum(inode_size.values())
+
+
+def get_reclaimable_bytes(path_list: list) -> int:
+    """Return bytes freed by removing path_list, a hardlinked file frees space only when all its links are removed"""
+    inode_link = {}
+    for file_path in get_file_path_list(path_list):
+        file_stat = os.stat(file_path)
+        key = (file_stat.st_dev, file_stat.st_ino)
+        size, link_count, removed_link_count = inode_link.get(key, (file_stat.st_size, file_stat.st_nlink, 0))
+        inode_link[key] = (size, link_count, removed_link_count + 1)
+    return sum(size for size, link_count, removed_link_count in inode_link.values() if removed_link_count >= link_count)
+
+
+def get_file_hash(file_path: str) -> str:
+    file_hash = hashlib.sha256()
+    with open(file_path, "rb") as file_obj:
+        for chunk in iter(lambda: file_obj.read(HASH_CHUNK_SIZE), b""):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+class ArtifactRetention:
+    def __init__(self, artifact_retention_config: ArtifactRetentionConfig):
+        try:
+            self.artifact_retention_config = artifact_retention_config
+        except Exception as e:
+            raise HousingException(e) from e
+
+    @staticmethod
+    def get_run_sort_key(time_stamp: str, run_dir_list: list):
+        for time_stamp_format in TIME_STAMP_FORMAT_LIST:
+            try:
+                return datetime.strptime(time_stamp, time_stamp_format).timestamp()
+            except ValueError:
+                continue
+        # unknown directory name, fallback to last modification time
+        return max(os.path.getmtime(run_dir) for run_dir in run_dir_list)
+
+    def get_run_dirs(self) -> dict:
+        """Return dictionary of run time stamp and list of its artifact directories, latest run first"""
+        try:
+            artifact_dir = self.artifact_retention_config.artifact_dir
+            run_dirs = {}
+            for artifact_dir_name in TIME_STAMPED_ARTIFACT_DIR_LIST:
+                stage_dir = os.path.join(artifact_dir, artifact_dir_name)
+                if not os.path.isdir(stage_dir):
+                    continue
+                for time_stamp in os.listdir(stage_dir):
+                    run_dir = os.path.join(stage_dir, time_stamp)
+                    if os.path.isdir(run_dir):
+                        run_dirs.setdefault(time_stamp, []).append(run_dir)
+            sorted_time_stamp_list = sorted(
+                run_dirs, key=lambda time_stamp: self.get_run_sort_key(time_stamp, run_dirs[time_stamp]), reverse=True
+            )
+            return {time_stamp: run_dirs[time_stamp] for time_stamp in sorted_time_stamp_list}
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def get_referenced_time_stamps(self) -> set:
+        """Return time stamps of runs whose trained model is best model or in history of model evaluation file"""
+        try:
+            model_evaluation_file_path = self.artifact_retention_config.model_evaluation_file_path
+            if not os.path.exists(model_evaluation_file_path):
+                return set()
+            model_eval_content = read_yaml_file(file_path=model_evaluation_file_path)
+            model_eval_content = dict() if model_eval_content is None else model_eval_content
+
+            model_path_list = []
+            if BEST_MODEL_KEY in model_eval_content:
+                model_path_list.append(model_eval_content[BEST_MODEL_KEY][MODEL_PATH_KEY])
+            for model_info in model_eval_content.get(HISTORY_KEY, dict()).values():
+                model_path_list.append(model_info[MODEL_PATH_KEY])
+
+            referenced_time_stamps = set()
+            for model_path in model_path_list:
+                path_part_list = os.path.normpath(model_path).split(os.sep)
+                if MODEL_TRAINER_ARTIFACT_DIR in path_part_list[:-1]:
+                    referenced_time_stamps.add(path_part_list[path_part_list.index(MODEL_TRAINER_ARTIFACT_DIR) + 1])
+            logging.info(f"Time stamps of runs referenced by model evaluation: {referenced_time_stamps}")
+            return referenced_time_stamps
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def get_removable_export_dirs(self) -> list:
+        """Return exported model directories other than serving model and last keep_last_n_run exports"""
+        try:
+            model_export_dir = self.artifact_retention_config.model_export_dir
+            if not os.path.isdir(model_export_dir):
+                return []
+            # export directories are named with numeric time stamp, latest one is served by HousingPredictor
+            export_dir_name_list = sorted(
+                (dir_name for dir_name in os.listdir(model_export_dir) if dir_name.isdigit()), key=int, reverse=True
+            )
+            keep_last_n_run = max(self.artifact_retention_config.keep_last_n_run, 1)
+            return [os.path.join(model_export_dir, dir_name) for dir_name in export_dir_name_list[keep_last_n_run:]]
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def get_removal_plan(self) -> list:
+        """Return list of paths to be removed as per keep last n runs, model references and disk quota"""
+        try:
+            run_dirs = self.get_run_dirs()
+            referenced_time_stamps = self.get_referenced_time_stamps()
+            current_time_stamp = self.artifact_retention_config.current_time_stamp
+            keep_last_n_run = self.artifact_retention_config.keep_last_n_run
+
+            removal_path_list = self.get_removable_export_dirs()
+            quota_candidate_list = []
+            for run_number, (time_stamp, run_dir_list) in enumerate(run_dirs.items()):
+                if time_stamp == current_time_stamp:
+                    continue
+                # only trained model of referenced run is needed to load it again
+                removable_run_dir_list = [
+                    run_dir
+                    for run_dir in run_dir_list
+                    if not (
+                        time_stamp in referenced_time_stamps
+                        and os.path.basename(os.path.dirname(run_dir)) == MODEL_TRAINER_ARTIFACT_DIR
+                    )
+                ]
+                if run_number < keep_last_n_run:
+                    quota_candidate_list.append(removable_run_dir_list)
+                else:
+                    removal_path_list.extend(removable_run_dir_list)
+
+            max_total_bytes = self.artifact_retention_config.max_total_bytes
+            if max_total_bytes is not None:
+                storage_path_list = [self.artifact_retention_config.artifact_dir]
+                storage_path_list.append(self.artifact_retention_config.model_export_dir)
+                remaining_bytes = get_total_bytes(storage_path_list) - get_reclaimable_bytes(removal_path_list)
+                # removing oldest runs first till disk usage is within quota
+                for removable_run_dir_list in reversed(quota_candidate_list):
+                    if remaining_bytes <= max_total_bytes:
+                        break
+                    remaining_bytes -= get_reclaimable_bytes(removal_path_list + removable_run_dir_list)
+                    remaining_bytes += get_reclaimable_bytes(removal_path_list)
+                    removal_path_list.extend(removable_run_dir_list)
+                if remaining_bytes > max_total_bytes:
+                    logging.warning(
+                        f"Artifacts use {remaining_bytes} bytes after retention, more than quota {max_total_bytes} bytes"
+                    )
+            logging.info(f"Artifact removal plan: {removal_path_list}")
+            return removal_path_list
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def get_stopped_time_stamps(self) -> set:
+        """
+        Return time stamps of runs recorded as stopped (completed or failed) in experiment file, they are neither
+        running nor resumable, so their artifacts are written no more
+        """
+        try:
+            experiment_file_path = os.path.join(
+                self.artifact_retention_config.artifact_dir, EXPERIMENT_DIR_NAME, EXPERIMENT_FILE_NAME
+            )
+            if not os.path.exists(experiment_file_path):
+                return set()
+            df = pd.read_csv(experiment_file_path, dtype={"artifact_time_stamp": str})
+            # last record of a run is its latest state, a resumed run is recorded running again
+            last_record_df = df.drop_duplicates(subset=["artifact_time_stamp"], keep="last")
+            return set(last_record_df.loc[~last_record_df["running_status"].astype(bool), "artifact_time_stamp"])
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def deduplicate_files(self, excluded_path_list: list, dry_run: bool) -> int:
+        """
+        Replace identical files across stopped runs other than current one with hardlink of single copy, returns
+        bytes reclaimed. Running and resumable runs, exported models and experiment and evaluation files are left
+        alone.
+        """
+        try:
+            excluded_path_set = {os.path.abspath(path) for path in excluded_path_list}
+            stopped_time_stamps = self.get_stopped_time_stamps()
+            stopped_time_stamps.discard(self.artifact_retention_config.current_time_stamp)
+            run_dir_list = [
+                run_dir
+                for time_stamp, run_dir_list in self.get_run_dirs().items()
+                if time_stamp in stopped_time_stamps
+                for run_dir in run_dir_list
+            ]
+            size_file_path = {}
+            for run_dir in run_dir_list:
+                if os.path.abspath(run_dir) in excluded_path_set:
+                    continue
+                for file_path in get_file_path_list([run_dir]):
+                    size_file_path.setdefault(os.path.getsize(file_path), []).append(file_path)
+
+            deduplicated_bytes = 0
+            for size, file_path_list in size_file_path.items():
+                # hashing only files which have same size as some other file
+                if size == 0 or len(file_path_list) < 2:
+                    continue
+                hash_file_path = {}
+                for file_path in file_path_list:
+                    hash_file_path.setdefault(get_file_hash(file_path), []).append(file_path)
+                for source_file_path, *duplicate_file_path_list in hash_file_path.values():
+                    source_stat = os.stat(source_file_path)
+                    for duplicate_file_path in duplicate_file_path_list:
+                        duplicate_stat = os.stat(duplicate_file_path)
+                        if (duplicate_stat.st_dev, duplicate_stat.st_ino) == (source_stat.st_dev, source_stat.st_ino):
+                            continue
+                        if duplicate_stat.st_dev != source_stat.st_dev:
+                            # hardlink can't span file systems
+                            continue
+                        if duplicate_stat.st_nlink == 1:
+                            deduplicated_bytes += size
+                        if dry_run:
+                            continue
+                        temp_file_path = f"{duplicate_file_path}.retention_link"
+                        os.link(source_file_path, temp_file_path)
+                        os.replace(temp_file_path, duplicate_file_path)
+                        logging.info(f"Deduplicated [{duplicate_file_path}] with hardlink of [{source_file_path}]")
+            return deduplicated_bytes
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def initiate_artifact_retention(self, dry_run: bool = False) -> ArtifactRetentionArtifact:
+        try:
+            logging.info(f"Artifact Retention Log Started".center(100, "-"))
+            removal_path_list = self.get_removal_plan()
+            reclaimed_bytes = get_reclaimable_bytes(removal_path_list)
+            if not dry_run:
+                for removal_path in removal_path_list:
+                    logging.info(f"Removing artifact: [{removal_path}]")
+                    shutil.rmtree(removal_path, ignore_errors=True)
+
+            deduplicated_bytes = 0
+            if self.artifact_retention_config.deduplicate:
+                deduplicated_bytes = self.deduplicate_files(excluded_path_list=removal_path_list, dry_run=dry_run)
+
+            action = "would be" if dry_run else "were"
+            artifact_retention_artifact = ArtifactRetentionArtifact(
+                is_dry_run=dry_run,
+                removed_path_list=removal_path_list,
+                reclaimed_bytes=reclaimed_bytes,
+                deduplicated_bytes=deduplicated_bytes,
+                message=f"{reclaimed_bytes} bytes {action} reclaimed by removal "
+                f"and {deduplicated_bytes} bytes by deduplication",
+            )
+            logging.info(f"Artifact Retention Artifact: {artifact_retention_artifact}")
+            return artifact_retention_artifact
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def __del__(self):
+        logging.info(f"Artifact Retention Log Completed".center(100, "-"))
+
+
+def main():
+    # python -m housing.component.artifact_retention --dry-run
+    from housing.config.configuration import Configuration
+
+    parser = argparse.ArgumentParser(description="Remove old pipeline artifacts as per artifact_retention_config")
+    parser.add_argument("--dry-run", action="store_true", help="report bytes to be reclaimed without removing")
+    args = parser.parse_args()
+    try:
+        artifact_retention = ArtifactRetention(
+            artifact_retention_config=Configuration().get_artifact_retention_config()
+        )
+        artifact_retention_artifact = artifact_retention.initiate_artifact_retention(dry_run=args.dry_run)
+        for removed_path in artifact_retention_artifact.removed_path_list:
+            print(removed_path)
+        print(artifact_retention_artifact.message)
+    except Exception as e:
+        logging.error(f"{e}")
+        print(e)
+
+
+if __name__ == "__main__":
+    main()
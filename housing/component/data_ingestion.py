@@ -1,8 +1,10 @@
 import os
+import shutil
 from housing.entity.config_entity import DataIngestionConfig
 from housing.entity.artifact_entity import DataIngestionArtifact
 from housing.exception import HousingException
 from housing.logger import logging
+from housing.utils.utils import open_for_replace
 import tarfile
 from urllib import request  # for high level http requests it's recommended to use requests package
 import pandas as pd
@@ -26,8 +28,8 @@ class DataIngestion:
             download_url = self.data_ingestion_config.dataset_download_url
             tgz_download_dir = self.data_ingestion_config.tgz_download_dir
             if os.path.exists(tgz_download_dir):
-                # won't be triggered as it's timestamp based
-                os.remove(tgz_download_dir)
+                # directory is timestamp based, it only exists when an interrupted run is resumed
+                shutil.rmtree(tgz_download_dir)
             os.makedirs(tgz_download_dir, exist_ok=True)
             housing_file_name = os.path.basename(download_url)
             tgz_file_path = os.path.join(tgz_download_dir, housing_file_name)
@@ -42,8 +44,8 @@ class DataIngestion:
         try:
             raw_data_dir = self.data_ingestion_config.raw_data_dir
             if os.path.exists(raw_data_dir):
-                # won't be triggered as it's timestamp based
-                os.remove(raw_data_dir)
+                # directory is timestamp based, it only exists when an interrupted run is resumed
+                shutil.rmtree(raw_data_dir)
             os.makedirs(raw_data_dir, exist_ok=True)
             logging.info(f"Extracting {tgz_file_path} into {raw_data_dir}")
             with tarfile.open(tgz_file_path) as housing_tgz_file_obj:
@@ -62,6 +64,12 @@ class DataIngestion:
             df_housing["income_category"] = pd.cut(
                 df_housing["median_income"], bins=[0.0, 1.5, 3.0, 4.5, 6.0, np.inf], labels=[1, 2, 3, 4, 5]
             )
+            sample_size = self.data_ingestion_config.sample_size
+            if sample_size is not None and sample_size < len(df_housing):
+                logging.info(f"Sample mode: taking stratified sample of {sample_size} rows")
+                sample_split = StratifiedShuffleSplit(n_splits=1, train_size=sample_size, random_state=42)
+                sample_index, _ = next(sample_split.split(df_housing, df_housing["income_category"]))
+                df_housing = df_housing.iloc[sample_index].reset_index(drop=True)
             logging.info(f"Splitting Data into train and test set")
             strat_train_set = None
             strat_test_set = None
@@ -74,11 +82,13 @@ class DataIngestion:
             if strat_train_set is not None:
                 os.makedirs(self.data_ingestion_config.ingested_train_dir, exist_ok=True)
                 logging.info(f"Exporting training dataset to file: [{train_file_path}]")
-                strat_train_set.to_csv(train_file_path, index=False)
+                with open_for_replace(train_file_path, "w", newline="") as train_file:
+                    strat_train_set.to_csv(train_file, index=False)
             if strat_test_set is not None:
                 os.makedirs(self.data_ingestion_config.ingested_test_dir, exist_ok=True)
                 logging.info(f"Exporting test dataset to file: [{test_file_path}]")
-                strat_test_set.to_csv(test_file_path, index=False)
+                with open_for_replace(test_file_path, "w", newline="") as test_file:
+                    strat_test_set.to_csv(test_file, index=False)
             data_ingestion_artifact = DataIngestionArtifact(
                 train_file_path=train_file_path,
                 test_file_path=test_file_path,
@@ -1,18 +1,20 @@
 import os
 import numpy as np
 import pandas as pd
-from housing.config.configuration import Configuration
 from housing.entity.artifact_entity import DataIngestionArtifact, DataValidationArtifact, DataTransformationArtifact
 from housing.entity.config_entity import DataTransformationConfig
 from housing.exception import HousingException
 from housing.logger import logging
 from housing.constants import *
-from housing.utils.utils import read_yaml_file, save_object, save_numpy_array_data, load_data
-from sklearn.base import BaseEstimator, TransformerMixin
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from housing.utils.utils import read_yaml_file, save_object, save_numpy_array_data, load_data, read_data_in_chunks
+from housing.utils.utils import get_temp_file_path, replace_file
+from housing.entity.cv_cache import get_array_fingerprint
+from sklearn.base import BaseEstimator, TransformerMixin, clone
+from sklearn.preprocessing import StandardScaler, FunctionTransformer
 from sklearn.compose import ColumnTransformer
 from sklearn.impute import SimpleImputer
 from sklearn.pipeline import Pipeline
+from scipy.spatial import cKDTree
 
 
 class FeatureGenerator(BaseEstimator, TransformerMixin):
@@ -24,6 +26,7 @@ class FeatureGenerator(BaseEstimator, TransformerMixin):
         households_idx: int = 6,
         total_bedrooms_idx: int = 4,
         columns: list = None,
+        zero_division_value: float = 0.0,
     ):
         """Generate Additional Feature for prediction
 
@@ -34,6 +37,8 @@ class FeatureGenerator(BaseEstimator, TransformerMixin):
             households_idx (int, optional): index of households. Defaults to 6.
             total_bedrooms_idx (int, optional): index of total_bedrooms. Defaults to 4.
             columns (list, optional): list of columns of dataframe in same sequence to get index of feature. Defaults to None.
+            zero_division_value (float, optional): ratio feature value of rows with zero households or rooms,
+                instead of inf. Defaults to 0.0.
         """
         try:
             self.columns = columns
@@ -48,6 +53,7 @@ class FeatureGenerator(BaseEstimator, TransformerMixin):
             self.population_idx = population_idx
             self.households_idx = households_idx
             self.total_bedrooms_idx = total_bedrooms_idx
+            self.zero_division_value = zero_division_value
         except Exception as e:
             raise HousingException(e) from e
 
@@ -69,19 +75,234 @@ class FeatureGenerator(BaseEstimator, TransformerMixin):
             np.ndarray: return data with additional feature
         """
         try:
-            room_per_household = X[:, self.total_rooms_idx] / X[:, self.households_idx]
-            population_per_household = X[:, self.population_idx] / X[:, self.households_idx]
+            X = np.asarray(X)
+            # (numerator, denominator) index of room_per_household, population_per_household, bedrooms_per_room
+            ratio_index_list = [
+                (self.total_rooms_idx, self.households_idx),
+                (self.population_idx, self.households_idx),
+            ]
             if self.add_bedrooms_per_room:
-                bedrooms_per_room = X[:, self.total_bedrooms_idx] / X[:, self.total_rooms_idx]
-                generated_feature = np.c_[X, room_per_household, population_per_household, bedrooms_per_room]
+                ratio_index_list.append((self.total_bedrooms_idx, self.total_rooms_idx))
+
+            # ratios are divided straight into columns of one preallocated output, input is copied once
+            dtype = X.dtype if np.issubdtype(X.dtype, np.floating) else np.float64
+            generated_feature = np.empty((X.shape[0], X.shape[1] + len(ratio_index_list)), dtype=dtype)
+            generated_feature[:, : X.shape[1]] = X
+            # attribute is missing in preprocessing objects pickled before it was added
+            zero_division_value = getattr(self, "zero_division_value", 0.0)
+            for offset, (numerator_idx, denominator_idx) in enumerate(ratio_index_list):
+                ratio = generated_feature[:, X.shape[1] + offset]
+                denominator = X[:, denominator_idx]
+                ratio.fill(zero_division_value)
+                np.divide(X[:, numerator_idx], denominator, out=ratio, where=denominator != 0)
+            return generated_feature
+        except Exception as e:
+            raise HousingException(e) from e
+
+
+class SpatialFeatureGenerator(BaseEstimator, TransformerMixin):
+    def __init__(
+        self,
+        n_neighbors: int = 10,
+        latitude_idx: int = 1,
+        longitude_idx: int = 0,
+        median_income_idx: int = 7,
+        columns: list = None,
+    ):
+        """Generate neighborhood features from spatial index over latitude and longitude
+
+        KD-tree of training rows is built once in fit and pickled with preprocessing, every row is one
+        O(log n) query so fitting is O(n log n) and serving a row takes microseconds. Distances to the few
+        fixed coast and city reference points are computed directly.
+        Coordinates are projected to kilometers around latitude of California, distances are in km.
+
+        Args:
+            n_neighbors (int, optional): number of nearest training rows averaged. Defaults to 10.
+            latitude_idx (int, optional): index of latitude. Defaults to 1.
+            longitude_idx (int, optional): index of longitude. Defaults to 0.
+            median_income_idx (int, optional): index of median_income. Defaults to 7.
+            columns (list, optional): list of columns of dataframe in same sequence to get index of feature. Defaults to None.
+        """
+        try:
+            self.columns = columns
+            if self.columns is not None:
+                latitude_idx = self.columns.index(COLUMN_LATITUDE)
+                longitude_idx = self.columns.index(COLUMN_LONGITUDE)
+                median_income_idx = self.columns.index(COLUMN_MEDIAN_INCOME)
+
+            self.n_neighbors = n_neighbors
+            self.latitude_idx = latitude_idx
+            self.longitude_idx = longitude_idx
+            self.median_income_idx = median_income_idx
+        except Exception as e:
+            raise HousingException(e) from e
+
+    @staticmethod
+    def get_projected_coordinate(latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+        """Return (n, 2) equirectangular projection in km, accurate within a few percent over California"""
+        coordinate = np.empty((len(latitude), 2))
+        np.multiply(longitude, 111.32 * np.cos(np.radians(37.0)), out=coordinate[:, 0])
+        np.multiply(latitude, 110.57, out=coordinate[:, 1])
+        return coordinate
+
+    def get_coordinate(self, X: np.ndarray) -> np.ndarray:
+        return self.get_projected_coordinate(X[:, self.latitude_idx], X[:, self.longitude_idx])
+
+    def fit(self, X, y=None):
+        try:
+            X = np.asarray(X)
+            self.tree_ = cKDTree(self.get_coordinate(X))
+            self.median_income_ = np.asarray(X[:, self.median_income_idx], dtype=np.float64)
+            # transform of the fitted rows themselves leaves every row out of its own neighborhood
+            self.fit_fingerprint_ = get_array_fingerprint(X)
+            city_coordinate, coast_coordinate = np.array(CITY_COORDINATE_LIST), np.array(COAST_COORDINATE_LIST)
+            self.city_coordinate_ = self.get_projected_coordinate(city_coordinate[:, 0], city_coordinate[:, 1])
+            self.coast_coordinate_ = self.get_projected_coordinate(coast_coordinate[:, 0], coast_coordinate[:, 1])
+            return self
+        except Exception as e:
+            raise HousingException(e) from e
+
+    @staticmethod
+    def get_min_distance(coordinate: np.ndarray, reference_coordinate: np.ndarray) -> np.ndarray:
+        """Return distance of every row to its nearest reference point, rows are broadcast in bounded chunks"""
+        min_distance = np.empty(len(coordinate))
+        for chunk_start in range(0, len(coordinate), 1 << 16):
+            chunk = coordinate[chunk_start : chunk_start + (1 << 16)]
+            squared_distance = ((chunk[:, np.newaxis, :] - reference_coordinate[np.newaxis, :, :]) ** 2).sum(axis=2)
+            min_distance[chunk_start : chunk_start + len(chunk)] = np.sqrt(squared_distance.min(axis=1))
+        return min_distance
+
+    def transform(self, X: np.ndarray, y: np.ndarray = None) -> np.ndarray:
+        """Add neighborhood feature at last position of columns in the following sequence:
+            Data, neighbor_median_income, distance_to_coast, distance_to_city
+
+        Args:
+            X (np.ndarray): Feature Data
+            y (np.ndarray, optional): Target. Defaults to None.
+
+        Raises:
+            HousingException: Exception
+
+        Returns:
+            np.ndarray: return data with additional feature
+        """
+        try:
+            X = np.asarray(X)
+            coordinate = self.get_coordinate(X)
+            n_neighbors = min(self.n_neighbors, self.tree_.n)
+            if get_array_fingerprint(X) == self.fit_fingerprint_:
+                # one extra neighbor is queried and the row itself is dropped, or the farthest one when a
+                # duplicate location was returned in place of the row
+                neighbor_index = self.tree_.query(coordinate, k=n_neighbors + 1)[1].reshape(len(X), -1)
+                keep = neighbor_index != np.arange(len(X))[:, np.newaxis]
+                keep[keep.all(axis=1), -1] = False
+                neighbor_index = neighbor_index[keep].reshape(len(X), n_neighbors)
             else:
-                # or np.hstack
-                generated_feature = np.c_[X, room_per_household, population_per_household]
+                neighbor_index = self.tree_.query(coordinate, k=n_neighbors)[1].reshape(len(X), -1)
+
+            dtype = X.dtype if np.issubdtype(X.dtype, np.floating) else np.float64
+            generated_feature = np.empty((X.shape[0], X.shape[1] + 3), dtype=dtype)
+            generated_feature[:, : X.shape[1]] = X
+            generated_feature[:, X.shape[1]] = self.median_income_[neighbor_index].mean(axis=1)
+            generated_feature[:, X.shape[1] + 1] = self.get_min_distance(coordinate, self.coast_coordinate_)
+            generated_feature[:, X.shape[1] + 2] = self.get_min_distance(coordinate, self.city_coordinate_)
             return generated_feature
         except Exception as e:
             raise HousingException(e) from e
 
 
+class CategoryEncoder(BaseEstimator, TransformerMixin):
+    def __init__(self, categories: list = None, handle_unknown: str = "error", scale: bool = True, dtype=np.float64):
+        """Dense one hot encoding of categorical columns into fixed width output
+
+        Every category has its own output column in the order of categories. Indicator value is written directly
+        into zero initialized output by row and column index, scaled by standard deviation of indicator column
+        when scale is True, same as sparse OneHotEncoder followed by StandardScaler(with_mean=False).
+
+        Args:
+            categories (list, optional): category list of each column, None or None entry to learn sorted
+                categories from fitted data. Defaults to None.
+            handle_unknown (str, optional): "error" to raise on category missing from categories,
+                "ignore" to encode it as all zero columns. Defaults to "error".
+            scale (bool, optional): divide indicator by standard deviation of its column. Defaults to True.
+            dtype (optional): dtype of output. Defaults to np.float64.
+        """
+        try:
+            if handle_unknown not in ["error", "ignore"]:
+                raise ValueError(f"handle_unknown must be error or ignore, got {handle_unknown}")
+            self.categories = categories
+            self.handle_unknown = handle_unknown
+            self.scale = scale
+            self.dtype = dtype
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def get_category_code_list(self, X: np.ndarray) -> list:
+        """Return index of category of every row per column, -1 for unknown category"""
+        code_list = []
+        for column_idx, category_index in enumerate(self.category_index_list_):
+            code = category_index.get_indexer(X[:, column_idx])
+            unknown = code < 0
+            if self.handle_unknown == "error" and unknown.any():
+                raise ValueError(
+                    f"Unknown categories {sorted(set(X[unknown, column_idx]), key=str)} in column {column_idx}, "
+                    f"known categories are {list(category_index)}"
+                )
+            code_list.append(code)
+        return code_list
+
+    def partial_fit(self, X, y=None):
+        """Update indicator counts with X, categories are set on first call"""
+        try:
+            X = np.asarray(X, dtype=object)
+            if not hasattr(self, "categories_"):
+                categories = self.categories if self.categories is not None else [None] * X.shape[1]
+                self.categories_ = [
+                    np.array(sorted(pd.unique(X[:, column_idx]), key=str) if category_list is None else category_list)
+                    for column_idx, category_list in enumerate(categories)
+                ]
+                self.category_index_list_ = [pd.Index(category_list) for category_list in self.categories_]
+                self.n_samples_seen_ = 0
+                self.category_count_ = np.zeros(sum(len(category_list) for category_list in self.categories_))
+            offset = 0
+            for code, category_list in zip(self.get_category_code_list(X), self.categories_):
+                # unknown rows are all zero and count towards n_samples_seen_ only
+                self.category_count_[offset : offset + len(category_list)] += np.bincount(
+                    code[code >= 0], minlength=len(category_list)
+                )
+                offset += len(category_list)
+            self.n_samples_seen_ += X.shape[0]
+            # population standard deviation of indicator column, zero variance columns keep unit scale
+            frequency = self.category_count_ / self.n_samples_seen_
+            self.scale_ = np.sqrt(frequency * (1 - frequency))
+            self.scale_[self.scale_ < 10 * np.finfo(self.scale_.dtype).eps] = 1.0
+            return self
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def fit(self, X, y=None):
+        for attribute in ["categories_", "category_index_list_", "n_samples_seen_", "category_count_", "scale_"]:
+            if hasattr(self, attribute):
+                delattr(self, attribute)
+        return self.partial_fit(X, y)
+
+    def transform(self, X, y=None):
+        try:
+            X = np.asarray(X, dtype=object)
+            indicator_value = 1 / self.scale_ if self.scale else np.ones_like(self.scale_)
+            encoded_feature = np.zeros((X.shape[0], len(self.scale_)), dtype=self.dtype)
+            row_index = np.arange(X.shape[0])
+            offset = 0
+            for code, category_list in zip(self.get_category_code_list(X), self.categories_):
+                known = code >= 0
+                column_index = offset + code[known]
+                encoded_feature[row_index[known], column_index] = indicator_value[column_index]
+                offset += len(category_list)
+            return encoded_feature
+        except Exception as e:
+            raise HousingException(e) from e
+
+
 class DataTransformation:
     def __init__(
         self,
@@ -96,32 +317,51 @@ class DataTransformation:
         except Exception as e:
             raise HousingException(e) from e
 
-    def get_data_transformer_object(self) -> ColumnTransformer:
+    def get_data_transformer_object(self, categories: list = None) -> ColumnTransformer:
+        """
+        Categories of categorical columns are taken from domain_value of schema.
+        categories: categories of each categorical column missing from domain_value, None to learn them from fitted data
+        """
         try:
             schema_file_path = self.data_validation_artifact.schema_file_path
             dataset_schema = read_yaml_file(schema_file_path)
             numerical_columns = dataset_schema[SCHEMA_NUMERICAL_COLUMN_KEY]
             categorical_columns = dataset_schema[SCHEMA_CATEGORICAL_COLUMN_KEY]
-            num_pipe = Pipeline(
-                steps=[
-                    ("imputer", SimpleImputer(strategy="median")),
-                    (
-                        "feature_gen",
-                        FeatureGenerator(
-                            add_bedrooms_per_room=self.data_transformation_config.add_bedroom_per_room,
-                            columns=numerical_columns,
-                        ),
+            domain_value = dataset_schema.get(SCHEMA_DOMAIN_VALUE_KEY) or {}
+            if categories is None:
+                categories = [None] * len(categorical_columns)
+            categories = [
+                domain_value.get(column, category_list)
+                for column, category_list in zip(categorical_columns, categories)
+            ]
+            precision = self.data_transformation_config.precision
+            num_steps = [
+                # imputer, feature generator and scaler keep float dtype of their input, casting first
+                # carries the precision through the pipeline for training and prediction input alike
+                ("cast", FunctionTransformer(np.asarray, kw_args={"dtype": precision})),
+                ("imputer", SimpleImputer(strategy="median")),
+                (
+                    "feature_gen",
+                    FeatureGenerator(
+                        add_bedrooms_per_room=self.data_transformation_config.add_bedroom_per_room,
+                        columns=numerical_columns,
                     ),
-                    ("scaler", StandardScaler()),
-                ]
-            )
+                ),
+            ]
+            if self.data_transformation_config.spatial_n_neighbors is not None:
+                spatial_feature_generator = SpatialFeatureGenerator(
+                    n_neighbors=self.data_transformation_config.spatial_n_neighbors, columns=numerical_columns
+                )
+                num_steps.append(("spatial_gen", spatial_feature_generator))
+            # feature generator output is a fresh buffer, so it can be scaled in place
+            num_steps.append(("scaler", StandardScaler(copy=not self.data_transformation_config.inplace_scaling)))
+            num_pipe = Pipeline(steps=num_steps)
             cat_pipe = Pipeline(
                 steps=[
                     ("imputer", SimpleImputer(strategy="most_frequent")),
-                    ("ohe", OneHotEncoder()),
-                    ("scaler", StandardScaler(with_mean=False)),
+                    ("encoder", CategoryEncoder(categories=categories, dtype=precision)),
                 ]
-            )  # with_mean=False is due to sparse matrix from OneHotEncoder
+            )
             logging.info(f"Numerical Column: {numerical_columns}")
             logging.info(f"Categorical Column: {categorical_columns}")
             preprocessing = ColumnTransformer(
@@ -131,9 +371,180 @@ class DataTransformation:
         except Exception as e:
             raise HousingException(e) from e
 
+    def read_data_in_chunks(self, file_path: str):
+        """Iterate chunks of streaming_chunk_size rows of file_path with schema dtypes, same as load_data"""
+        return read_data_in_chunks(
+            file_path,
+            schema_file_path=self.data_validation_artifact.schema_file_path,
+            chunk_size=self.data_transformation_config.streaming_chunk_size,
+            precision=self.data_transformation_config.precision,
+        )
+
+    def get_streaming_fit_sample(self, file_path: str, categorical_columns: list):
+        """
+        Read file_path chunk by chunk and return uniform random sample of at most streaming_fit_sample_size rows,
+        categories of every categorical column and row count. Memory is bounded by sample size and chunk size.
+        """
+        try:
+            fit_sample_size = self.data_transformation_config.streaming_fit_sample_size
+            random_state = np.random.RandomState(42)
+            fit_sample_df = None
+            category_dict = {column: set() for column in categorical_columns}
+            row_count = 0
+            for chunk_df in self.read_data_in_chunks(file_path):
+                row_count += len(chunk_df)
+                for column in categorical_columns:
+                    category_dict[column].update(chunk_df[column].dropna().unique())
+                # reservoir sampling by random key, rows with smallest keys over all chunks form a uniform sample
+                chunk_df = chunk_df.assign(_sample_key=random_state.random_sample(len(chunk_df)))
+                fit_sample_df = chunk_df if fit_sample_df is None else pd.concat([fit_sample_df, chunk_df])
+                fit_sample_df = fit_sample_df.nsmallest(fit_sample_size, "_sample_key")
+            if row_count == 0:
+                raise ValueError(f"{file_path} has no data rows, preprocessing can't be fitted")
+            categories = [sorted(category_dict[column]) for column in categorical_columns]
+            return fit_sample_df.drop(columns=["_sample_key"]), categories, row_count
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def update_scaler_statistics(self, preprocessing_obj: ColumnTransformer, file_path: str):
+        """
+        Refit last step of every pipeline of fitted preprocessing_obj (StandardScaler or CategoryEncoder) with
+        partial_fit over all chunks of file_path, so that scaling statistics are exact while imputers are fitted
+        on the sample
+        """
+        try:
+            pipeline_list = [
+                (preprocessing_obj.named_transformers_[name], columns)
+                for name, _, columns in preprocessing_obj.transformers
+            ]
+            scaler_list = [clone(pipeline.steps[-1][1]) for pipeline, _ in pipeline_list]
+            for chunk_df in self.read_data_in_chunks(file_path):
+                for (pipeline, columns), scaler in zip(pipeline_list, scaler_list):
+                    scaler_input = chunk_df[columns]
+                    for _, step in pipeline.steps[:-1]:
+                        scaler_input = step.transform(scaler_input)
+                    scaler.partial_fit(scaler_input)
+            for (pipeline, _), scaler in zip(pipeline_list, scaler_list):
+                pipeline.steps[-1] = (pipeline.steps[-1][0], scaler)
+        except Exception as e:
+            raise HousingException(e) from e
+
+    @staticmethod
+    def get_transformed_file_path_list(file_path: str, transformed_dir: str) -> list:
+        """Return [input feature, target] npy file paths of transformed data of csv file_path"""
+        file_name = os.path.splitext(os.path.basename(file_path))[0]
+        return [
+            os.path.join(transformed_dir, f"{file_name}{TRANSFORMED_FEATURE_FILE_SUFFIX}"),
+            os.path.join(transformed_dir, f"{file_name}{TRANSFORMED_TARGET_FILE_SUFFIX}"),
+        ]
+
+    def transform_in_chunks(
+        self,
+        preprocessing_obj: ColumnTransformer,
+        file_path: str,
+        target_column_name: str,
+        feature_file_path: str,
+        target_file_path: str,
+    ):
+        """Transform file_path chunk by chunk into memory mapped input feature and target npy files"""
+        try:
+            chunk_size = self.data_transformation_config.streaming_chunk_size
+            row_count = sum(len(chunk_df) for chunk_df in pd.read_csv(file_path, chunksize=chunk_size, usecols=[0]))
+            if row_count == 0:
+                # width of transformed data is only known from a transformed chunk
+                raise ValueError(f"{file_path} has no data rows, nothing to transform")
+            os.makedirs(os.path.dirname(feature_file_path), exist_ok=True)
+            feature_arr = None
+            precision = self.data_transformation_config.precision
+            # arrays are written to temporary files which replace previous ones, never rewritten in place
+            temp_feature_file_path = get_temp_file_path(feature_file_path)
+            temp_target_file_path = get_temp_file_path(target_file_path)
+            target_arr = np.lib.format.open_memmap(
+                temp_target_file_path, mode="w+", dtype=precision, shape=(row_count,)
+            )
+            row_start = 0
+            for chunk_df in self.read_data_in_chunks(file_path):
+                input_feature_arr = preprocessing_obj.transform(chunk_df.drop(columns=[target_column_name]))
+                if hasattr(input_feature_arr, "toarray"):
+                    input_feature_arr = input_feature_arr.toarray()
+                if feature_arr is None:
+                    feature_arr = np.lib.format.open_memmap(
+                        temp_feature_file_path,
+                        mode="w+",
+                        dtype=input_feature_arr.dtype,
+                        shape=(row_count, input_feature_arr.shape[1]),
+                        fortran_order=self.data_transformation_config.array_order == "F",
+                    )
+                row_stop = row_start + len(chunk_df)
+                feature_arr[row_start:row_stop] = input_feature_arr
+                target_arr[row_start:row_stop] = chunk_df[target_column_name].to_numpy(dtype=precision)
+                row_start = row_stop
+            feature_arr.flush()
+            target_arr.flush()
+            del feature_arr, target_arr
+            replace_file(temp_feature_file_path, feature_file_path)
+            replace_file(temp_target_file_path, target_file_path)
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def initiate_streaming_data_transformation(self) -> DataTransformationArtifact:
+        """
+        Fit preprocessing and transform data chunk by chunk, memory stays flat in dataset size:
+        categories are collected from all rows, imputers are fitted on bounded random sample,
+        scaling statistics are updated incrementally over all rows and transformed data is written chunk by chunk
+        """
+        try:
+            train_file_path = self.data_ingestion_artifact.train_file_path
+            test_file_path = self.data_ingestion_artifact.test_file_path
+            schema = read_yaml_file(self.data_validation_artifact.schema_file_path)
+            target_column_name = schema[TARGET_COLUMN_KEY]
+
+            logging.info(f"Collecting fit sample and categories of {train_file_path} in chunks")
+            fit_sample_df, categories, row_count = self.get_streaming_fit_sample(
+                train_file_path, schema[SCHEMA_CATEGORICAL_COLUMN_KEY]
+            )
+            logging.info(f"Fitting preprocessing on {len(fit_sample_df)} of {row_count} rows")
+            preprocessing_obj = self.get_data_transformer_object(categories=categories)
+            preprocessing_obj.fit(fit_sample_df.drop(columns=[target_column_name]))
+            del fit_sample_df
+            logging.info("Updating scaling statistics over all rows")
+            self.update_scaler_statistics(preprocessing_obj, train_file_path)
+
+            train_feature_file_path, train_target_file_path = self.get_transformed_file_path_list(
+                train_file_path, self.data_transformation_config.transformed_train_dir
+            )
+            test_feature_file_path, test_target_file_path = self.get_transformed_file_path_list(
+                test_file_path, self.data_transformation_config.transformed_test_dir
+            )
+            logging.info("Transforming training and testing data in chunks")
+            self.transform_in_chunks(
+                preprocessing_obj, train_file_path, target_column_name, train_feature_file_path, train_target_file_path
+            )
+            self.transform_in_chunks(
+                preprocessing_obj, test_file_path, target_column_name, test_feature_file_path, test_target_file_path
+            )
+
+            preprocessing_obj_filepath = self.data_transformation_config.preprocess_object_file_path
+            save_object(preprocessing_obj_filepath, preprocessing_obj)
+            data_transformation_artifact = DataTransformationArtifact(
+                is_transformed=True,
+                message="Data Transformed Successfully in streaming mode",
+                transformed_train_feature_file_path=train_feature_file_path,
+                transformed_train_target_file_path=train_target_file_path,
+                transformed_test_feature_file_path=test_feature_file_path,
+                transformed_test_target_file_path=test_target_file_path,
+                preprocessed_object_file_path=preprocessing_obj_filepath,
+            )
+            logging.info(f"Data Transformation Artifact: {data_transformation_artifact}")
+            return data_transformation_artifact
+        except Exception as e:
+            raise HousingException(e) from e
+
     def initiate_data_transformation(self) -> DataTransformationArtifact:
         try:
             logging.info(f"Data Transformation Log Started".center(100, "-"))
+            if self.data_transformation_config.streaming_chunk_size is not None:
+                return self.initiate_streaming_data_transformation()
             train_file_path = self.data_ingestion_artifact.train_file_path
             test_file_path = self.data_ingestion_artifact.test_file_path
             schema_file_path = self.data_validation_artifact.schema_file_path
@@ -142,8 +553,9 @@ class DataTransformation:
 
             logging.info("Loaded training and testing data")
             # loading training and test data
-            train_df = load_data(file_path=train_file_path, schema_file_path=schema_file_path)
-            test_df = load_data(file_path=test_file_path, schema_file_path=schema_file_path)
+            precision = self.data_transformation_config.precision
+            train_df = load_data(file_path=train_file_path, schema_file_path=schema_file_path, precision=precision)
+            test_df = load_data(file_path=test_file_path, schema_file_path=schema_file_path, precision=precision)
 
             # input and target feature
             input_feature_train_df = train_df.drop([target_column_name], axis=1)
@@ -157,24 +569,22 @@ class DataTransformation:
             input_feature_train_arr = preprocessing_obj.fit_transform(input_feature_train_df)
             input_feature_test_arr = preprocessing_obj.transform(input_feature_test_df)
 
-            # concatenating data
-            train_arr = np.c_[input_feature_train_arr, np.array(target_feature_train_df)]
-            test_arr = np.c_[input_feature_test_arr, np.array(target_feature_test_df)]
-
-            # storing data
-            transformed_train_dir = self.data_transformation_config.transformed_train_dir
-            transformed_test_dir = self.data_transformation_config.transformed_test_dir
-
-            train_file_name = os.path.basename(train_file_path).replace(".csv", ".npz")
-            test_file_name = os.path.basename(test_file_path).replace(".csv", ".npz")
+            # storing data, input feature and target are stored as separate aligned files without concatenating them
+            train_feature_file_path, train_target_file_path = self.get_transformed_file_path_list(
+                train_file_path, self.data_transformation_config.transformed_train_dir
+            )
+            test_feature_file_path, test_target_file_path = self.get_transformed_file_path_list(
+                test_file_path, self.data_transformation_config.transformed_test_dir
+            )
+            array_order = self.data_transformation_config.array_order
 
             logging.info("Storing transformed data")
-            transformed_train_file_path = os.path.join(transformed_train_dir, train_file_name)
-            transformed_test_file_path = os.path.join(transformed_test_dir, test_file_name)
-            save_numpy_array_data(file_path=transformed_train_file_path, array=train_arr)
-            save_numpy_array_data(file_path=transformed_test_file_path, array=test_arr)
-            logging.info(f"Stored Transformed Train Data at {transformed_train_file_path}")
-            logging.info(f"Stored Transformed Test Data at {transformed_test_file_path}")
+            save_numpy_array_data(train_feature_file_path, input_feature_train_arr, order=array_order)
+            save_numpy_array_data(train_target_file_path, target_feature_train_df.to_numpy(dtype=precision).ravel())
+            save_numpy_array_data(test_feature_file_path, input_feature_test_arr, order=array_order)
+            save_numpy_array_data(test_target_file_path, target_feature_test_df.to_numpy(dtype=precision).ravel())
+            logging.info(f"Stored Transformed Train Data at {train_feature_file_path}, {train_target_file_path}")
+            logging.info(f"Stored Transformed Test Data at {test_feature_file_path}, {test_target_file_path}")
 
             # storing preprocessing object
             preprocessing_obj_filepath = self.data_transformation_config.preprocess_object_file_path
@@ -184,8 +594,10 @@ class DataTransformation:
             data_transformation_artifact = DataTransformationArtifact(
                 is_transformed=True,
                 message="Data Transformed Successfully",
-                transformed_train_file_path=transformed_train_file_path,
-                transformed_test_file_path=transformed_test_file_path,
+                transformed_train_feature_file_path=train_feature_file_path,
+                transformed_train_target_file_path=train_target_file_path,
+                transformed_test_feature_file_path=test_feature_file_path,
+                transformed_test_target_file_path=test_target_file_path,
                 preprocessed_object_file_path=preprocessing_obj_filepath,
             )
             logging.info(f"Data Transformation Artifact: {data_transformation_artifact}")
@@ -4,14 +4,19 @@ from housing.entity.config_entity import ModelEvaluationConfig
 from housing.entity.artifact_entity import (
     DataIngestionArtifact,
     DataValidationArtifact,
+    DataTransformationArtifact,
     ModelTrainerArtifact,
     ModelEvaluationArtifact,
 )
 from housing.constants import *
 import numpy as np
 import os
-from housing.utils.utils import write_yaml_file, read_yaml_file, load_object, load_data
-from housing.entity.model_factory import evaluate_regression_model
+import time
+from housing.utils.utils import write_yaml_file, read_yaml_file, load_object, load_data, load_numpy_array_data
+from housing.entity.model_factory import evaluate_regression_model, get_prediction_list, get_regression_metric_list
+from housing.entity.bootstrap_comparison import compare_with_bootstrap
+from housing.entity.prediction_cache import PredictionCache, get_file_checksum, get_model_checksum
+from housing.entity.forest_compaction import CompactionComparison
 
 
 class ModelEvaluation:
@@ -21,12 +26,176 @@ class ModelEvaluation:
         data_ingestion_artifact: DataIngestionArtifact,
         data_validation_artifact: DataValidationArtifact,
         model_trainer_artifact: ModelTrainerArtifact,
+        data_transformation_artifact: DataTransformationArtifact = None,
     ):
+        """
+        data_transformation_artifact: transformed arrays of this run, scored instead of raw data when production and
+        trained model share preprocessing of this run, None to always score raw data
+        """
         try:
             self.model_evaluation_config = model_evaluation_config
             self.model_trainer_artifact = model_trainer_artifact
             self.data_ingestion_artifact = data_ingestion_artifact
             self.data_validation_artifact = data_validation_artifact
+            self.data_transformation_artifact = data_transformation_artifact
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def is_preprocessing_shared(self, model, trained_model_object) -> bool:
+        """
+        Return True when production model, trained model and transformed arrays of this run come from same fitted
+        preprocessing object, compared by checksum of pickled preprocessing object
+        """
+        try:
+            if model is None or self.data_transformation_artifact is None:
+                return False
+            preprocessing_checksum = get_model_checksum(
+                load_object(file_path=self.data_transformation_artifact.preprocessed_object_file_path)
+            )
+            return (
+                get_model_checksum(trained_model_object.preprocessing_object) == preprocessing_checksum
+                and get_model_checksum(model.preprocessing_object) == preprocessing_checksum
+            )
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def get_transformed_data(self):
+        """Return read only memory mapped input and target feature of transformed training and testing data of run"""
+        try:
+            artifact = self.data_transformation_artifact
+            return (
+                load_numpy_array_data(artifact.transformed_train_feature_file_path, mmap_mode="r"),
+                load_numpy_array_data(artifact.transformed_train_target_file_path, mmap_mode="r"),
+                load_numpy_array_data(artifact.transformed_test_feature_file_path, mmap_mode="r"),
+                load_numpy_array_data(artifact.transformed_test_target_file_path, mmap_mode="r"),
+            )
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def get_raw_data(self):
+        """Return input and target feature of raw training and testing data"""
+        try:
+            schema_file_path = self.data_validation_artifact.schema_file_path
+            train_dataframe = load_data(
+                file_path=self.data_ingestion_artifact.train_file_path, schema_file_path=schema_file_path
+            )
+            test_dataframe = load_data(
+                file_path=self.data_ingestion_artifact.test_file_path, schema_file_path=schema_file_path
+            )
+            target_column_name = read_yaml_file(file_path=schema_file_path)[TARGET_COLUMN_KEY]
+
+            # target_column
+            logging.info(f"Converting target column into numpy array.")
+            train_target_arr = np.array(train_dataframe[target_column_name])
+            test_target_arr = np.array(test_dataframe[target_column_name])
+            logging.info(f"Conversion completed target column into numpy array.")
+
+            # dropping target column from the dataframe
+            logging.info(f"Dropping target column from the dataframe.")
+            train_dataframe.drop(target_column_name, axis=1, inplace=True)
+            test_dataframe.drop(target_column_name, axis=1, inplace=True)
+            logging.info(f"Dropping target column from the dataframe completed.")
+            return train_dataframe, train_target_arr, test_dataframe, test_target_arr
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def get_prediction_cache(self) -> PredictionCache:
+        """Return prediction cache shared by runs, None when disabled"""
+        try:
+            if self.model_evaluation_config.prediction_cache_dir is None:
+                return None
+            return PredictionCache(
+                cache_dir=self.model_evaluation_config.prediction_cache_dir,
+                max_size_bytes=self.model_evaluation_config.prediction_cache_max_size,
+            )
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def is_confidently_better(self, model_list: list, X_test, y_test, model_checksum_list: list) -> bool:
+        """
+        Return True when trained model (second of model_list) has lower test rmse than production model (first) in
+        at least confidence_level share of paired bootstrap resamples, always True when bootstrap is disabled.
+        Test predictions are read from prediction cache filled by evaluate_regression_model.
+        """
+        try:
+            n_resamples = self.model_evaluation_config.bootstrap_n_resamples
+            if n_resamples is None:
+                return True
+            base_prediction, new_prediction = get_prediction_list(
+                model_list,
+                X_test,
+                self.get_prediction_cache(),
+                model_checksum_list,
+                self.model_evaluation_config.n_jobs,
+            )
+            bootstrap_comparison = compare_with_bootstrap(
+                y=y_test,
+                base_prediction=base_prediction,
+                new_prediction=new_prediction,
+                n_resamples=n_resamples,
+                confidence_level=self.model_evaluation_config.confidence_level,
+            )
+            logging.info(f"Bootstrap comparison of trained and production model: {bootstrap_comparison}")
+            return bootstrap_comparison.probability_better >= bootstrap_comparison.confidence_level
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def compare_compacted_model(self, compacted_model, original_model, X_test, y_test, n_row_sample: int = 100):
+        """
+        Compare file size, prediction latency and test accuracy of compacted trained model against its original
+        forest, comparison is logged and added to compaction report of model trainer
+        """
+        try:
+            latency_dict, prediction_list = dict(), []
+            for model_name, model in [("original", original_model), ("compacted", compacted_model)]:
+                start_time = time.perf_counter()
+                prediction_list.append(model.predict(X_test))
+                batch_latency = time.perf_counter() - start_time
+                row_latency_list = []
+                rows = X_test.iloc if hasattr(X_test, "iloc") else X_test
+                for row_idx in range(min(n_row_sample, len(y_test))):
+                    start_time = time.perf_counter()
+                    model.predict(rows[row_idx : row_idx + 1])
+                    row_latency_list.append(time.perf_counter() - start_time)
+                latency_dict[model_name] = batch_latency, float(np.median(row_latency_list))
+            accuracy_list, rmse_list = get_regression_metric_list(y_test, prediction_list)
+            original_file_size = os.path.getsize(self.model_trainer_artifact.uncompacted_model_file_path)
+            compacted_file_size = os.path.getsize(self.model_trainer_artifact.trained_model_file_path)
+            compaction_comparison = CompactionComparison(
+                original_file_size=original_file_size,
+                compacted_file_size=compacted_file_size,
+                size_ratio=round(compacted_file_size / original_file_size, 4),
+                original_batch_latency=round(latency_dict["original"][0], 6),
+                compacted_batch_latency=round(latency_dict["compacted"][0], 6),
+                original_row_latency=round(latency_dict["original"][1], 6),
+                compacted_row_latency=round(latency_dict["compacted"][1], 6),
+                row_latency_ratio=round(latency_dict["compacted"][1] / latency_dict["original"][1], 4),
+                original_test_rmse=round(float(rmse_list[0]), 6),
+                compacted_test_rmse=round(float(rmse_list[1]), 6),
+                test_rmse_delta=round(float(rmse_list[1] - rmse_list[0]), 6),
+                original_test_accuracy=round(float(accuracy_list[0]), 6),
+                compacted_test_accuracy=round(float(accuracy_list[1]), 6),
+                test_accuracy_delta=round(float(accuracy_list[1] - accuracy_list[0]), 6),
+            )
+            logging.info(f"Compacted against original model: {compaction_comparison}")
+            compaction_report_file_path = self.model_trainer_artifact.compaction_report_file_path
+            compaction_report = read_yaml_file(file_path=compaction_report_file_path) or dict()
+            compaction_report["evaluation"] = dict(compaction_comparison._asdict())
+            write_yaml_file(file_path=compaction_report_file_path, data=compaction_report)
+            return compaction_comparison
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def get_best_model_file_path(self) -> str:
+        """Return file path of best model recorded in model evaluation file, None if there is none"""
+        try:
+            model_evaluation_file_path = self.model_evaluation_config.model_evaluation_file_path
+            if not os.path.exists(model_evaluation_file_path):
+                return None
+            model_eval_file_content = read_yaml_file(file_path=model_evaluation_file_path) or dict()
+            if BEST_MODEL_KEY not in model_eval_file_content:
+                return None
+            return model_eval_file_content[BEST_MODEL_KEY][MODEL_PATH_KEY]
         except Exception as e:
             raise HousingException(e) from e
 
@@ -84,41 +253,68 @@ class ModelEvaluation:
         except Exception as e:
             raise HousingException(e) from e
 
+    def evaluate_sample_model(
+        self, model, trained_model_object, trained_model_file_path: str, X_train, y_train, X_test, y_test
+    ) -> ModelEvaluationArtifact:
+        """
+        Evaluate model trained in sample mode against existing model for logging only.
+        Sample model is never accepted and evaluation report is not updated.
+        """
+        try:
+            model_list = [trained_model_object] if model is None else [model, trained_model_object]
+            metric_info_artifact = evaluate_regression_model(
+                model_list=model_list,
+                X_train=X_train,
+                y_train=y_train,
+                X_test=X_test,
+                y_test=y_test,
+                base_accuracy=0.0,
+            )
+            logging.info(f"Sample mode model evaluation completed. model metric artifact: {metric_info_artifact}")
+            model_evaluation_artifact = ModelEvaluationArtifact(
+                evaluated_model_path=trained_model_file_path, is_model_accepted=False
+            )
+            logging.info(f"Model trained in sample mode is never accepted. {model_evaluation_artifact}")
+            return model_evaluation_artifact
+        except Exception as e:
+            raise HousingException(e) from e
+
     def initiate_model_evaluation(self) -> ModelEvaluationArtifact:
         try:
             logging.info(f"Model Evaluation Log Started".center(100, "-"))
             trained_model_file_path = self.model_trainer_artifact.trained_model_file_path
             trained_model_object = load_object(file_path=trained_model_file_path)
+            # original forest of compacted trained model, scored against it for reporting only
+            uncompacted_model_file_path = self.model_trainer_artifact.uncompacted_model_file_path
+            uncompacted_model = None
+            if uncompacted_model_file_path is not None:
+                uncompacted_model = load_object(file_path=uncompacted_model_file_path)
 
-            train_file_path = self.data_ingestion_artifact.train_file_path
-            test_file_path = self.data_ingestion_artifact.test_file_path
-
-            schema_file_path = self.data_validation_artifact.schema_file_path
-
-            train_dataframe = load_data(
-                file_path=train_file_path,
-                schema_file_path=schema_file_path,
-            )
-            test_dataframe = load_data(
-                file_path=test_file_path,
-                schema_file_path=schema_file_path,
-            )
-            schema_content = read_yaml_file(file_path=schema_file_path)
-            target_column_name = schema_content[TARGET_COLUMN_KEY]
-
-            # target_column
-            logging.info(f"Converting target column into numpy array.")
-            train_target_arr = np.array(train_dataframe[target_column_name])
-            test_target_arr = np.array(test_dataframe[target_column_name])
-            logging.info(f"Conversion completed target column into numpy array.")
+            model = self.get_best_model()
+            if self.is_preprocessing_shared(model, trained_model_object):
+                # data was transformed by the same preprocessing moments earlier, estimators score transformed arrays
+                logging.info("Production and trained model share preprocessing of this run, using transformed data")
+                train_dataframe, train_target_arr, test_dataframe, test_target_arr = self.get_transformed_data()
+                model, trained_model_object = model.trained_model_object, trained_model_object.trained_model_object
+                if uncompacted_model is not None:
+                    uncompacted_model = uncompacted_model.trained_model_object
+            else:
+                logging.info("Loading raw training and testing data")
+                train_dataframe, train_target_arr, test_dataframe, test_target_arr = self.get_raw_data()
 
-            # dropping target column from the dataframe
-            logging.info(f"Dropping target column from the dataframe.")
-            train_dataframe.drop(target_column_name, axis=1, inplace=True)
-            test_dataframe.drop(target_column_name, axis=1, inplace=True)
-            logging.info(f"Dropping target column from the dataframe completed.")
+            if uncompacted_model is not None:
+                self.compare_compacted_model(trained_model_object, uncompacted_model, test_dataframe, test_target_arr)
 
-            model = self.get_best_model()
+            if self.model_evaluation_config.is_sample_mode:
+                return self.evaluate_sample_model(
+                    model=model,
+                    trained_model_object=trained_model_object,
+                    trained_model_file_path=trained_model_file_path,
+                    X_train=train_dataframe,
+                    y_train=train_target_arr,
+                    X_test=test_dataframe,
+                    y_test=test_target_arr,
+                )
 
             if model is None:
                 logging.info("Not found any existing model. Hence accepting trained model")
@@ -130,6 +326,12 @@ class ModelEvaluation:
                 return model_evaluation_artifact
 
             model_list = [model, trained_model_object]
+            # both models are identified by their saved file, predictions of production model on unchanged
+            # train and test rows are read from prediction cache
+            model_checksum_list = [
+                get_file_checksum(self.get_best_model_file_path()),
+                get_file_checksum(trained_model_file_path),
+            ]
 
             metric_info_artifact = evaluate_regression_model(
                 model_list=model_list,
@@ -138,6 +340,9 @@ class ModelEvaluation:
                 X_test=test_dataframe,
                 y_test=test_target_arr,
                 base_accuracy=self.model_trainer_artifact.model_accuracy,
+                prediction_cache=self.get_prediction_cache(),
+                model_checksum_list=model_checksum_list,
+                n_jobs=self.model_evaluation_config.n_jobs,
             )
             logging.info(f"Model evaluation completed. model metric artifact: {metric_info_artifact}")
 
@@ -148,7 +353,14 @@ class ModelEvaluation:
                 logging.info(response)
                 return response
 
-            if metric_info_artifact.index_number == 1:
+            if metric_info_artifact.index_number == 1 and not self.is_confidently_better(
+                model_list, test_dataframe, test_target_arr, model_checksum_list
+            ):
+                logging.info("Trained model is not better than existing model at confidence level, not accepting it")
+                model_evaluation_artifact = ModelEvaluationArtifact(
+                    evaluated_model_path=trained_model_file_path, is_model_accepted=False
+                )
+            elif metric_info_artifact.index_number == 1:
                 model_evaluation_artifact = ModelEvaluationArtifact(
                     evaluated_model_path=trained_model_file_path, is_model_accepted=True
                 )
@@ -22,10 +22,17 @@ class ModelPusher:
             export_model_file_path = os.path.join(export_dir, model_file_name)
             logging.info(f"Exporting model file: [{export_model_file_path}]")
             os.makedirs(export_dir, exist_ok=True)
-            shutil.copy(src=evaluated_model_file_path, dst=export_model_file_path)
+            if os.path.exists(export_model_file_path):
+                os.remove(export_model_file_path)
+            try:
+                # save_object replaces model file instead of rewriting it, exported model shares bytes of trained model
+                os.link(src=evaluated_model_file_path, dst=export_model_file_path)
+            except OSError:
+                # hard links need same filesystem
+                shutil.copy(src=evaluated_model_file_path, dst=export_model_file_path)
             # we can call a function to save model to Azure blob storage/ google cloud storage / s3 bucket
             logging.info(
-                f"Trained model: {evaluated_model_file_path} is copied in export dir:[{export_model_file_path}]"
+                f"Trained model: {evaluated_model_file_path} is exported in export dir:[{export_model_file_path}]"
             )
             model_pusher_artifact = ModelPusherArtifact(
                 is_model_pusher=True, export_model_file_path=export_model_file_path
@@ -38,6 +45,10 @@ class ModelPusher:
     def initiate_model_pusher(self) -> ModelPusherArtifact:
         try:
             logging.info(f"Model Pusher Log Started".center(100, "-"))
+            if self.model_pusher_config.is_sample_mode:
+                model_pusher_artifact = ModelPusherArtifact(is_model_pusher=False, export_model_file_path=None)
+                logging.info(f"Model trained in sample mode is never exported. {model_pusher_artifact}")
+                return model_pusher_artifact
             return self.export_model()
         except Exception as e:
             raise HousingException(e) from e
@@ -1,22 +1,39 @@
+import os
+import shutil
+import time
+import numpy as np
 from typing import List
 from housing.entity.config_entity import ModelTrainerConfig
-from housing.entity.artifact_entity import DataTransformationArtifact, ModelTrainerArtifact
-from housing.entity.model_factory import MetricInfoArtifact, ModelFactory, GridSearchedBestModel
-from housing.entity.model_factory import evaluate_regression_model
+from housing.entity.artifact_entity import (
+    DataIngestionArtifact,
+    DataValidationArtifact,
+    DataTransformationArtifact,
+    ModelTrainerArtifact,
+)
+from housing.constants import BEST_MODEL_KEY, MODEL_PATH_KEY, TARGET_COLUMN_KEY, PREDICTION_INTERVAL_QUANTILE_LIST
 from housing.utils.utils import load_numpy_array_data, save_object, load_object
+from housing.utils.utils import read_yaml_file, write_yaml_file, load_data
 from housing.exception import HousingException
 from housing.logger import logging
 
+# ? model_factory is imported in ModelTrainer.initiate_model_trainer, unpickling HousingEstimatorModel for prediction
+# imports this module and shouldn't load model selection dependencies
+
 
 class HousingEstimatorModel:
-    def __init__(self, preprocessing_object, trained_model_object):
+    def __init__(self, preprocessing_object, trained_model_object, interval_statistics=None, warm_start_state=None):
         """
         TrainedModel constructor
         preprocessing_object: preprocessing_object
         trained_model_object: trained_model_object
+        interval_statistics: LinearIntervalStatistics of linear trained model for prediction intervals, else None
+        warm_start_state: WarmStartState of incrementally warm startable trained model, else None
         """
         self.preprocessing_object = preprocessing_object
         self.trained_model_object = trained_model_object
+        self.interval_statistics = interval_statistics
+        self.warm_start_state = warm_start_state
+        self.estimator_prediction_model = None
 
     def predict(self, X):
         """
@@ -27,6 +44,63 @@ class HousingEstimatorModel:
         transformed_feature = self.preprocessing_object.transform(X)
         return self.trained_model_object.predict(transformed_feature)
 
+    def predict_interval(self, X, quantile_list: list = None):
+        """
+        Return quantiles of prediction of every row of raw inputs, shape (rows, quantiles)
+        Forests: quantiles of per tree predictions, all trees predicted in one vectorized pass over the batch.
+        Linear models: analytic ordinary least squares prediction interval from training statistics.
+        quantile_list: quantiles within (0, 1), None for PREDICTION_INTERVAL_QUANTILE_LIST
+        """
+        try:
+            transformed_feature = self.preprocessing_object.transform(X)
+            return self.get_transformed_prediction_interval(transformed_feature, quantile_list)
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def predict_with_interval(self, X, quantile_list: list = None):
+        """
+        Return (prediction, quantiles of prediction) of every row of raw inputs, inputs are transformed once for
+        both, see predict_interval
+        """
+        try:
+            transformed_feature = self.preprocessing_object.transform(X)
+            return (
+                self.trained_model_object.predict(transformed_feature),
+                self.get_transformed_prediction_interval(transformed_feature, quantile_list),
+            )
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def get_transformed_prediction_interval(self, transformed_feature, quantile_list: list = None):
+        """Return quantiles of prediction of every row of transformed inputs, see predict_interval"""
+        try:
+            from housing.entity import prediction_interval
+
+            quantile_list = PREDICTION_INTERVAL_QUANTILE_LIST if quantile_list is None else quantile_list
+            interval_statistics = getattr(self, "interval_statistics", None)
+            if interval_statistics is not None:
+                return prediction_interval.get_linear_prediction_interval(
+                    self.trained_model_object, transformed_feature, quantile_list, interval_statistics
+                )
+            # flat node arrays of sklearn forest are built once per loaded model
+            if getattr(self, "estimator_prediction_model", None) is None:
+                self.estimator_prediction_model = prediction_interval.get_estimator_prediction_model(
+                    self.trained_model_object
+                )
+            if self.estimator_prediction_model is None:
+                raise Exception(f"{self} supports neither per tree nor analytic prediction interval")
+            return prediction_interval.get_forest_prediction_interval(
+                self.estimator_prediction_model, transformed_feature, quantile_list
+            )
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def __getstate__(self):
+        # per tree prediction model is derived from trained model, it is rebuilt after loading
+        state = self.__dict__.copy()
+        state.pop("estimator_prediction_model", None)
+        return state
+
     def __repr__(self):
         return f"{type(self.trained_model_object).__name__}()"
 
@@ -36,37 +110,319 @@ class HousingEstimatorModel:
 
 class ModelTrainer:
     def __init__(
-        self, model_trainer_config: ModelTrainerConfig, data_transformation_artifact: DataTransformationArtifact
+        self,
+        model_trainer_config: ModelTrainerConfig,
+        data_transformation_artifact: DataTransformationArtifact,
+        data_ingestion_artifact: DataIngestionArtifact = None,
+        data_validation_artifact: DataValidationArtifact = None,
     ):
+        """
+        data_ingestion_artifact, data_validation_artifact: raw data and schema, required for warm start only
+        """
         try:
             self.model_trainer_config = model_trainer_config
             self.data_transformation_artifact = data_transformation_artifact
+            self.data_ingestion_artifact = data_ingestion_artifact
+            self.data_validation_artifact = data_validation_artifact
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def get_transformed_data(self):
+        """Return read only memory mapped input feature and target of transformed training and testing dataset"""
+        try:
+            artifact = self.data_transformation_artifact
+            return (
+                load_numpy_array_data(artifact.transformed_train_feature_file_path, mmap_mode="r"),
+                load_numpy_array_data(artifact.transformed_train_target_file_path, mmap_mode="r"),
+                load_numpy_array_data(artifact.transformed_test_feature_file_path, mmap_mode="r"),
+                load_numpy_array_data(artifact.transformed_test_target_file_path, mmap_mode="r"),
+            )
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def get_production_model(self):
+        """
+        Return best model recorded in model evaluation file, original forest saved next to it when best model is
+        compacted, None if there is no accepted model yet
+        """
+        try:
+            from housing.entity.forest_compaction import CompactForestRegressor
+
+            model_evaluation_file_path = self.model_trainer_config.model_evaluation_file_path
+            if model_evaluation_file_path is None or not os.path.exists(model_evaluation_file_path):
+                return None
+            model_eval_file_content = read_yaml_file(file_path=model_evaluation_file_path) or dict()
+            if BEST_MODEL_KEY not in model_eval_file_content:
+                return None
+            model_file_path = model_eval_file_content[BEST_MODEL_KEY][MODEL_PATH_KEY]
+            if not os.path.exists(model_file_path):
+                logging.info(f"Best model file [{model_file_path}] doesn't exist")
+                return None
+            housing_model = load_object(file_path=model_file_path)
+            if isinstance(housing_model.trained_model_object, CompactForestRegressor):
+                # compacted forest can't be warm started, its original forest is
+                model_file_path = os.path.join(
+                    os.path.dirname(model_file_path),
+                    os.path.basename(self.model_trainer_config.uncompacted_model_file_path),
+                )
+                if not os.path.exists(model_file_path):
+                    logging.info(f"Original model of compacted best model [{model_file_path}] doesn't exist")
+                    return None
+                housing_model = load_object(file_path=model_file_path)
+            return model_file_path, housing_model
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def get_training_row_hash(self) -> np.ndarray:
+        """Return fingerprint of every raw training row of this run, None without data ingestion artifact"""
+        try:
+            from housing.entity.warm_start import get_row_hash
+
+            if self.data_ingestion_artifact is None or self.data_validation_artifact is None:
+                return None
+            train_df = load_data(
+                file_path=self.data_ingestion_artifact.train_file_path,
+                schema_file_path=self.data_validation_artifact.schema_file_path,
+            )
+            return get_row_hash(train_df)
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def initiate_warm_start_model_trainer(self) -> ModelTrainerArtifact:
+        """
+        Continue training of production model on data of this run instead of searching all models from scratch.
+        Raw data is transformed with preprocessing object of production model, so that new estimators see same
+        features as existing ones. Return None when there is no production model, it doesn't support warm start
+        or warm started model doesn't reach base accuracy, model is then trained from scratch.
+        """
+        try:
+            from housing.entity.model_factory import ModelFactory, evaluate_regression_model
+            from housing.entity.search_planner import SearchCostPlanner
+            from housing.entity.warm_start import ROW_STATISTICS_METHOD_LIST, WarmStartReport, get_row_hash
+            from housing.entity.warm_start import get_warm_start_method, get_warm_start_n_estimators, warm_start_model
+
+            production_model = self.get_production_model()
+            if production_model is None or self.data_ingestion_artifact is None:
+                logging.info("No production model to warm start from, training from scratch")
+                return None
+            base_model_file_path, housing_model = production_model
+            trained_model_object = housing_model.trained_model_object
+            method = get_warm_start_method(trained_model_object)
+            if method is None:
+                logging.info(f"{type(trained_model_object).__name__} doesn't support warm start, training from scratch")
+                return None
+            # every warm start adds estimators, ensembles are searched from scratch again once they reach the limit
+            n_estimators = get_warm_start_n_estimators(
+                trained_model_object, self.model_trainer_config.warm_start_n_estimators
+            )
+            max_estimators = self.model_trainer_config.warm_start_max_estimators
+            if n_estimators is not None and max_estimators is not None and n_estimators > max_estimators:
+                logging.info(
+                    f"Warm started model would have {n_estimators} estimators, more than {max_estimators}, "
+                    f"training from scratch"
+                )
+                return None
+            # models saved without fingerprints of their training rows would count already seen rows twice
+            warm_start_state = getattr(housing_model, "warm_start_state", None)
+            if method in ROW_STATISTICS_METHOD_LIST and warm_start_state is None:
+                logging.info("Production model has no warm start state, training from scratch")
+                return None
+
+            logging.info(f"Warm starting production model: {base_model_file_path}")
+            schema_file_path = self.data_validation_artifact.schema_file_path
+            target_column_name = read_yaml_file(file_path=schema_file_path)[TARGET_COLUMN_KEY]
+            train_df = load_data(
+                file_path=self.data_ingestion_artifact.train_file_path, schema_file_path=schema_file_path
+            )
+            test_df = load_data(
+                file_path=self.data_ingestion_artifact.test_file_path, schema_file_path=schema_file_path
+            )
+            preprocessing_obj = housing_model.preprocessing_object
+            x_train = preprocessing_obj.transform(train_df.drop(columns=[target_column_name]))
+            x_test = preprocessing_obj.transform(test_df.drop(columns=[target_column_name]))
+            y_train, y_test = np.array(train_df[target_column_name]), np.array(test_df[target_column_name])
+
+            start_time = time.time()
+            model, method, warm_start_state, n_new_rows = warm_start_model(
+                trained_model_object,
+                x_train,
+                y_train,
+                self.model_trainer_config.warm_start_n_estimators,
+                warm_start_state=warm_start_state,
+                row_hash=get_row_hash(train_df),
+            )
+            warm_start_time = time.time() - start_time
+
+            metric_info = evaluate_regression_model(
+                model_list=[model],
+                X_train=x_train,
+                y_train=y_train,
+                X_test=x_test,
+                y_test=y_test,
+                base_accuracy=self.model_trainer_config.base_accuracy,
+            )
+            if metric_info is None:
+                logging.info("Warm started model doesn't reach base accuracy, training from scratch")
+                return None
+
+            model_factory = ModelFactory(model_config_path=self.model_trainer_config.model_config_file_path)
+            estimated_cold_time = (
+                SearchCostPlanner(
+                    model_config=model_factory.config,
+                    fit_timing_file_path=self.model_trainer_config.fit_timing_file_path,
+                    search_time_budget=self.model_trainer_config.search_time_budget,
+                    default_fit_time=self.model_trainer_config.default_fit_time,
+                    n_samples=len(x_train),
+                )
+                .get_search_plan()
+                .estimated_time
+            )
+            warm_start_report = WarmStartReport(
+                model_name=type(model).__name__,
+                base_model_file_path=base_model_file_path,
+                method=method,
+                n_estimators=model.get_params().get("n_estimators"),
+                n_new_rows=int(n_new_rows),
+                warm_start_time=round(warm_start_time, 3),
+                estimated_cold_time=round(float(estimated_cold_time), 3),
+                estimated_time_saved=round(float(estimated_cold_time) - warm_start_time, 3),
+            )
+            logging.info(f"Warm start report: {warm_start_report}")
+            write_yaml_file(
+                file_path=self.model_trainer_config.warm_start_report_file_path, data=dict(warm_start_report._asdict())
+            )
+            return self.save_trained_model(
+                metric_info,
+                preprocessing_obj=preprocessing_obj,
+                X_train=x_train,
+                y_train=y_train,
+                X_test=x_test,
+                y_test=y_test,
+                warm_start_state=warm_start_state,
+                is_compaction_allowed=False,
+            )
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def get_streaming_metric_info(self):
+        """
+        Train streaming models over memory mapped transformed arrays chunk by chunk and evaluate them chunk by chunk
+        return MetricInfoArtifact of best accepted model, memory mapped training input and target feature
+        """
+        try:
+            from housing.entity.model_factory import ModelFactory, evaluate_regression_model
+
+            chunk_size = self.model_trainer_config.streaming_chunk_size
+            logging.info(f"Memory mapping transformed training and testing dataset")
+            x_train, y_train, x_test, y_test = self.get_transformed_data()
+
+            model_factory = ModelFactory(model_config_path=self.model_trainer_config.model_config_file_path)
+            model_list = model_factory.get_streaming_trained_model_list(X=x_train, y=y_train, chunk_size=chunk_size)
+
+            logging.info(f"Evaluating all streaming trained model on training and testing dataset in chunks")
+            metric_info = evaluate_regression_model(
+                model_list=model_list,
+                X_train=x_train,
+                y_train=y_train,
+                X_test=x_test,
+                y_test=y_test,
+                base_accuracy=self.model_trainer_config.base_accuracy,
+                chunk_size=chunk_size,
+            )
+            if metric_info is None:
+                raise Exception("None of streaming trained models has base accuracy on training and testing dataset")
+            return metric_info, x_train, y_train
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def get_sharded_metric_info(self):
+        """
+        Train every model per shard of transformed training data, shards are given by shard_key over features of
+        preprocessing object of this run. Return MetricInfoArtifact of best accepted shard router.
+        """
+        try:
+            from housing.entity.model_factory import ModelFactory, evaluate_regression_model
+            from housing.entity.shard_router import get_shard_key
+
+            logging.info(f"Memory mapping transformed training and testing dataset")
+            x_train, y_train, x_test, y_test = self.get_transformed_data()
+            preprocessing_obj = load_object(file_path=self.data_transformation_artifact.preprocessed_object_file_path)
+            shard_key = get_shard_key(
+                preprocessing_obj,
+                self.model_trainer_config.shard_key,
+                grid_cell_size=self.model_trainer_config.shard_grid_cell_size,
+            )
+
+            model_factory = ModelFactory(model_config_path=self.model_trainer_config.model_config_file_path)
+            model_list = model_factory.get_sharded_trained_model_list(
+                X=x_train,
+                y=y_train,
+                shard_key=shard_key,
+                min_shard_rows=self.model_trainer_config.shard_min_rows,
+                n_jobs=self.model_trainer_config.shard_n_jobs,
+            )
+
+            logging.info(f"Evaluating all shard trained model on training and testing dataset")
+            metric_info = evaluate_regression_model(
+                model_list=model_list,
+                X_train=x_train,
+                y_train=y_train,
+                X_test=x_test,
+                y_test=y_test,
+                base_accuracy=self.model_trainer_config.base_accuracy,
+            )
+            if metric_info is None:
+                raise Exception("None of shard trained models has base accuracy on training and testing dataset")
+            return metric_info
         except Exception as e:
             raise HousingException(e) from e
 
     def initiate_model_trainer(self) -> ModelTrainerArtifact:
         try:
             logging.info(f"Model Trainer Log Started".center(100, "-"))
-            logging.info(f"Loading transformed training dataset")
-            transformed_train_file_path = self.data_transformation_artifact.transformed_train_file_path
-            train_array = load_numpy_array_data(file_path=transformed_train_file_path)
+            if self.model_trainer_config.streaming_chunk_size is not None:
+                metric_info, x_train, y_train = self.get_streaming_metric_info()
+                return self.save_trained_model(metric_info, X_train=x_train, y_train=y_train)
+            if self.model_trainer_config.shard_key is not None:
+                return self.save_trained_model(self.get_sharded_metric_info())
+            if self.model_trainer_config.model_evaluation_file_path is not None:
+                model_trainer_artifact = self.initiate_warm_start_model_trainer()
+                if model_trainer_artifact is not None:
+                    return model_trainer_artifact
 
-            logging.info(f"Loading transformed testing dataset")
-            transformed_test_file_path = self.data_transformation_artifact.transformed_test_file_path
-            test_array = load_numpy_array_data(file_path=transformed_test_file_path)
+            from housing.entity.model_factory import MetricInfoArtifact, ModelFactory, GridSearchedBestModel
+            from housing.entity.model_factory import evaluate_regression_model
+            from housing.entity.search_planner import SearchCostPlanner
 
-            logging.info(f"Splitting training and testing input and target feature")
-            x_train, y_train, x_test, y_test = (
-                train_array[:, :-1],
-                train_array[:, -1],
-                test_array[:, :-1],
-                test_array[:, -1],
-            )
+            logging.info(f"Memory mapping transformed training and testing dataset")
+            # search workers receive memory mapped arrays by file reference and share their pages
+            x_train, y_train, x_test, y_test = self.get_transformed_data()
+            shared_array_dir = self.model_trainer_config.shared_array_dir
 
             model_config_file_path = self.model_trainer_config.model_config_file_path
 
             logging.info(f"Initializing model factory class using model config file: {model_config_file_path}")
-            model_factory = ModelFactory(model_config_path=model_config_file_path)
+            model_factory = ModelFactory(
+                model_config_path=model_config_file_path,
+                max_cv=self.model_trainer_config.max_cv,
+                max_param_combination=self.model_trainer_config.max_param_combination,
+                fit_timing_file_path=self.model_trainer_config.fit_timing_file_path,
+                cv_cache_dir=self.model_trainer_config.cv_cache_dir,
+                cv_cache_max_size=self.model_trainer_config.cv_cache_max_size,
+                checkpoint_file_path=self.model_trainer_config.search_checkpoint_file_path,
+                shared_array_dir=shared_array_dir,
+            )
+
+            search_plan = SearchCostPlanner(
+                model_config=model_factory.config,
+                fit_timing_file_path=self.model_trainer_config.fit_timing_file_path,
+                search_time_budget=self.model_trainer_config.search_time_budget,
+                default_fit_time=self.model_trainer_config.default_fit_time,
+                n_samples=len(x_train),
+            ).get_search_plan()
+            logging.info(
+                f"Planned {search_plan.fit_count} fits, estimated search time: {search_plan.estimated_time} seconds"
+            )
 
             base_accuracy = self.model_trainer_config.base_accuracy
             logging.info(f"Expected accuracy: {base_accuracy}")
@@ -88,18 +444,140 @@ class ModelTrainer:
                 X_test=x_test,
                 y_test=y_test,
                 base_accuracy=base_accuracy,
+                n_jobs=model_factory.get_search_n_jobs(),
             )
 
             logging.info(f"Best found model on both training and testing dataset: {metric_info.model_name}")
-            preprocessing_obj = load_object(file_path=self.data_transformation_artifact.preprocessed_object_file_path)
+            if shared_array_dir is not None:
+                # memory mapped fold indices are scratch files of the search
+                shutil.rmtree(shared_array_dir, ignore_errors=True)
+            return self.save_trained_model(metric_info, X_train=x_train, y_train=y_train, X_test=x_test, y_test=y_test)
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def compact_trained_model(self, model_object, preprocessing_obj, X_train, y_train):
+        """
+        Return compacted forest of model_object on out of bag rows of training data it was fitted on, None when
+        compaction is disabled, model isn't a compactable forest with out of bag rows or compaction exceeds
+        tolerance. Original model is saved as uncompacted model and compaction report is written.
+        """
+        try:
+            from housing.entity.forest_compaction import compact_forest, has_oob_rows, is_compactable
+
+            compaction_tolerance = self.model_trainer_config.compaction_tolerance
+            if compaction_tolerance is None or X_train is None or not is_compactable(model_object):
+                return None
+            if not has_oob_rows(model_object):
+                logging.info(f"{type(model_object).__name__} has no out of bag rows to compact on, saving as is")
+                return None
+            compacted_model, compaction_report = compact_forest(
+                model_object,
+                X_train,
+                y_train,
+                tolerance=compaction_tolerance,
+                value_dtype=self.model_trainer_config.compaction_value_dtype,
+            )
+            write_yaml_file(
+                file_path=self.model_trainer_config.compaction_report_file_path,
+                data={"compaction": dict(compaction_report._asdict())},
+            )
+            if compacted_model is None:
+                logging.info(f"Compaction exceeds tolerance {compaction_tolerance}, saving original model")
+                return None
+            uncompacted_model_file_path = self.model_trainer_config.uncompacted_model_file_path
+            logging.info(f"Saving original model of compacted forest at path: {uncompacted_model_file_path}")
+            save_object(
+                file_path=uncompacted_model_file_path,
+                obj=HousingEstimatorModel(preprocessing_object=preprocessing_obj, trained_model_object=model_object),
+                compressor=self.model_trainer_config.model_compressor,
+            )
+            return compacted_model
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def get_compacted_metric_info(self, metric_info, compacted_model, X_train, y_train, X_test, y_test):
+        """Return metric_info of compacted model, so that artifact describes the model that is saved"""
+        try:
+            from housing.entity.model_factory import get_regression_metric_list
+
+            train_accuracy, train_rmse = get_regression_metric_list(y_train, [compacted_model.predict(X_train)])
+            test_accuracy, test_rmse = get_regression_metric_list(y_test, [compacted_model.predict(X_test)])
+            train_accuracy, test_accuracy = float(train_accuracy[0]), float(test_accuracy[0])
+            compacted_metric_info = metric_info._replace(
+                model_name=str(compacted_model),
+                model_object=compacted_model,
+                train_rmse=float(train_rmse[0]),
+                test_rmse=float(test_rmse[0]),
+                train_accuracy=train_accuracy,
+                test_accuracy=test_accuracy,
+                model_accuracy=(2 * (train_accuracy * test_accuracy)) / (train_accuracy + test_accuracy),
+            )
+            logging.info(f"Original model metric: {metric_info._replace(model_object=None)}")
+            logging.info(f"Compacted model metric: {compacted_metric_info._replace(model_object=None)}")
+            return compacted_metric_info
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def save_trained_model(
+        self,
+        metric_info,
+        preprocessing_obj=None,
+        X_train=None,
+        y_train=None,
+        X_test=None,
+        y_test=None,
+        warm_start_state=None,
+        is_compaction_allowed=True,
+    ) -> ModelTrainerArtifact:
+        """
+        Save best model with preprocessing object as HousingEstimatorModel and return ModelTrainerArtifact
+        preprocessing_obj: preprocessing the model was trained with, None for preprocessing object of this run
+        X_train, y_train: transformed training data the model was fitted on, for out of bag forest compaction,
+        prediction interval statistics of linear models and warm start state of incremental models, None for none
+        X_test, y_test: transformed testing data metrics of compacted forest are computed on, None to save model as is
+        warm_start_state: WarmStartState of warm started model, None to compute it from training data of this run
+        is_compaction_allowed: False when trees of forest weren't all fitted on X_train, e.g. warm started forest
+        """
+        try:
+            if preprocessing_obj is None:
+                preprocessing_obj = load_object(
+                    file_path=self.data_transformation_artifact.preprocessed_object_file_path
+                )
             model_object = metric_info.model_object
+            compacted_model = None
+            if is_compaction_allowed and X_test is not None:
+                compacted_model = self.compact_trained_model(model_object, preprocessing_obj, X_train, y_train)
+            if compacted_model is not None:
+                model_object = compacted_model
+                metric_info = self.get_compacted_metric_info(
+                    metric_info, compacted_model, X_train, y_train, X_test, y_test
+                )
+            interval_statistics = None
+            if X_train is not None:
+                from housing.entity.prediction_interval import get_linear_interval_statistics, is_linear_model
+                from housing.entity.warm_start import ROW_STATISTICS_METHOD_LIST, get_warm_start_method
+                from housing.entity.warm_start import get_warm_start_state
+
+                if is_linear_model(model_object):
+                    interval_statistics = get_linear_interval_statistics(model_object, X_train, y_train)
+                if warm_start_state is None and get_warm_start_method(model_object) in ROW_STATISTICS_METHOD_LIST:
+                    warm_start_state = get_warm_start_state(
+                        model_object, self.get_training_row_hash(), X_train, y_train
+                    )
 
             trained_model_file_path = self.model_trainer_config.trained_model_file_path
             housing_model = HousingEstimatorModel(
-                preprocessing_object=preprocessing_obj, trained_model_object=model_object
+                preprocessing_object=preprocessing_obj,
+                trained_model_object=model_object,
+                interval_statistics=interval_statistics,
+                warm_start_state=warm_start_state,
             )
             logging.info(f"Saving model at path: {trained_model_file_path}")
-            save_object(file_path=trained_model_file_path, obj=housing_model)
+            save_object(
+                file_path=trained_model_file_path,
+                obj=housing_model,
+                compressor=self.model_trainer_config.model_compressor,
+            )
 
             model_trainer_artifact = ModelTrainerArtifact(
                 is_trained=True,
@@ -110,6 +588,12 @@ class ModelTrainer:
                 train_accuracy=metric_info.train_accuracy,
                 test_accuracy=metric_info.test_accuracy,
                 model_accuracy=metric_info.model_accuracy,
+                uncompacted_model_file_path=(
+                    None if compacted_model is None else self.model_trainer_config.uncompacted_model_file_path
+                ),
+                compaction_report_file_path=(
+                    None if compacted_model is None else self.model_trainer_config.compaction_report_file_path
+                ),
             )
 
             logging.info(f"Model Trainer Artifact: {model_trainer_artifact}")
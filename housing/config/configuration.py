@@ -6,15 +6,30 @@ from housing.logger import logging
 
 
 class Configuration:
-    def __init__(self, config_file_path: str = CONFIG_FILE_PATH, current_time_stamp: str = CURRENT_TIME_STAMP) -> None:
+    def __init__(
+        self,
+        config_file_path: str = CONFIG_FILE_PATH,
+        current_time_stamp: str = CURRENT_TIME_STAMP,
+        is_sample_mode: bool = None,
+    ) -> None:
+        """
+        is_sample_mode: overrides sample_mode of config file when not None
+        """
         try:
             self.config_info = read_yaml_file(file_path=config_file_path)
+            self.is_sample_mode = is_sample_mode
             self.training_pipeline_config = self.get_training_pipeline_config()
             self.artifact_dir = self.training_pipeline_config.artifact_dir
             self.time_stamp = current_time_stamp
         except Exception as e:
             raise HousingException(e) from e
 
+    def get_streaming_chunk_size(self) -> int:
+        """Return rows per chunk of streaming mode, None when pipeline runs in memory"""
+        if not self.training_pipeline_config.is_streaming_mode:
+            return None
+        return self.training_pipeline_config.streaming_chunk_size
+
     def get_data_ingestion_config(self) -> DataIngestionConfig:
         try:
             data_ingestion_artifact_dir = os.path.join(self.artifact_dir, DATA_INGESTION_ARTIFACT_DIR, self.time_stamp)
@@ -35,12 +50,16 @@ class Configuration:
             ingested_test_dir = os.path.join(
                 ingested_data_dir, data_ingestion_info[DATA_INGESTION_INGESTED_TEST_DIR_KEY]
             )
+            sample_size = None
+            if self.training_pipeline_config.is_sample_mode:
+                sample_size = self.training_pipeline_config.sample_size
             data_ingestion_config = DataIngestionConfig(
                 dataset_download_url=dataset_download_url,
                 tgz_download_dir=tgz_download_dir,
                 raw_data_dir=raw_data_dir,
                 ingested_train_dir=ingested_train_dir,
                 ingested_test_dir=ingested_test_dir,
+                sample_size=sample_size,
             )
             logging.info(f"Data Ingestion config: {data_ingestion_config}")
             return data_ingestion_config
@@ -96,11 +115,23 @@ class Configuration:
                 data_transformation_info[DATA_TRANSFORMATION_PREPROCESSING_DIR_KEY],
                 data_transformation_info[DATA_TRANSFORMATION_PREPROCESSED_OBJECT_FILE_NAME_KEY],
             )
+            array_order = data_transformation_info.get(DATA_TRANSFORMATION_ARRAY_ORDER_KEY, "C")
+            if array_order not in ["C", "F"]:
+                raise Exception(f"[{DATA_TRANSFORMATION_ARRAY_ORDER_KEY}] must be C or F, found: {array_order}")
+            spatial_n_neighbors = None
+            if data_transformation_info.get(DATA_TRANSFORMATION_SPATIAL_FEATURE_ENABLED_KEY, False):
+                spatial_n_neighbors = data_transformation_info[DATA_TRANSFORMATION_SPATIAL_N_NEIGHBORS_KEY]
             data_transformation_config = DataTransformationConfig(
                 add_bedroom_per_room=add_bedroom_per_room,
                 transformed_train_dir=transformed_train_dir,
                 transformed_test_dir=transformed_test_dir,
                 preprocess_object_file_path=preprocess_object_file_path,
+                streaming_chunk_size=self.get_streaming_chunk_size(),
+                streaming_fit_sample_size=self.training_pipeline_config.streaming_fit_sample_size,
+                array_order=array_order,
+                precision=self.training_pipeline_config.precision,
+                inplace_scaling=data_transformation_info.get(DATA_TRANSFORMATION_INPLACE_SCALING_KEY, False),
+                spatial_n_neighbors=spatial_n_neighbors,
             )
             logging.info(f"Data Transformation Config: {data_transformation_config}")
             return data_transformation_config
@@ -120,11 +151,107 @@ class Configuration:
                 model_trainer_config_info[MODEL_TRAINER_MODEL_CONFIG_DIR_KEY],
                 model_trainer_config_info[MODEL_TRAINER_MODEL_CONFIG_FILE_NAME_KEY],
             )
+            # fit timing is shared by all runs to estimate cost of next search
+            fit_timing_file_path = os.path.join(
+                self.artifact_dir,
+                MODEL_TRAINER_ARTIFACT_DIR,
+                model_trainer_config_info[MODEL_TRAINER_FIT_TIMING_FILE_NAME_KEY],
+            )
+            # cv result cache is shared by all runs and is kept out of time stamped model trainer directories
+            cv_cache_dir = None
+            if model_trainer_config_info.get(MODEL_TRAINER_CV_CACHE_ENABLED_KEY, False):
+                cv_cache_dir = os.path.join(
+                    self.artifact_dir, model_trainer_config_info[MODEL_TRAINER_CV_CACHE_DIR_KEY]
+                )
+            # completed fits of the run, a resumed run with same time stamp continues from it
+            search_checkpoint_file_path = os.path.join(
+                model_trainer_artifact_dir, model_trainer_config_info[MODEL_TRAINER_SEARCH_CHECKPOINT_FILE_NAME_KEY]
+            )
+            # memory mapped cv fold indices shared by search workers
+            shared_array_dir = None
+            if model_trainer_config_info.get(MODEL_TRAINER_SHARED_ARRAY_ENABLED_KEY, False):
+                shared_array_dir = os.path.join(
+                    model_trainer_artifact_dir, model_trainer_config_info[MODEL_TRAINER_SHARED_ARRAY_DIR_KEY]
+                )
+            # production model of model evaluation file is warm started instead of full search when enabled
+            model_evaluation_file_path = None
+            if (
+                model_trainer_config_info.get(MODEL_TRAINER_WARM_START_ENABLED_KEY, False)
+                and not self.training_pipeline_config.is_sample_mode
+                and not self.training_pipeline_config.is_streaming_mode
+            ):
+                model_evaluation_file_path = self.get_model_evaluation_config().model_evaluation_file_path
+            warm_start_report_file_path = os.path.join(
+                model_trainer_artifact_dir, model_trainer_config_info[MODEL_TRAINER_WARM_START_REPORT_FILE_NAME_KEY]
+            )
+            # per shard models are trained in place of model search, streaming mode takes precedence
+            shard_key = None
+            if (
+                model_trainer_config_info.get(MODEL_TRAINER_SHARD_ENABLED_KEY, False)
+                and not self.training_pipeline_config.is_streaming_mode
+            ):
+                shard_key = model_trainer_config_info[MODEL_TRAINER_SHARD_KEY_KEY]
+            model_compressor = model_trainer_config_info.get(MODEL_TRAINER_MODEL_COMPRESSOR_KEY, NO_COMPRESSOR)
+            if model_compressor not in OBJECT_COMPRESSOR_LIST:
+                raise Exception(
+                    f"[{MODEL_TRAINER_MODEL_COMPRESSOR_KEY}] must be one of {OBJECT_COMPRESSOR_LIST}, "
+                    f"found: {model_compressor}"
+                )
+            # accepted forests are compacted before saving, original is kept next to compacted model
+            compaction_tolerance = None
+            if model_trainer_config_info.get(MODEL_TRAINER_COMPACTION_ENABLED_KEY, False):
+                compaction_tolerance = model_trainer_config_info[MODEL_TRAINER_COMPACTION_TOLERANCE_KEY]
+            compaction_value_dtype = model_trainer_config_info.get(MODEL_TRAINER_COMPACTION_VALUE_DTYPE_KEY, "float32")
+            if compaction_value_dtype not in COMPACTION_VALUE_DTYPE_LIST:
+                raise Exception(
+                    f"[{MODEL_TRAINER_COMPACTION_VALUE_DTYPE_KEY}] must be one of {COMPACTION_VALUE_DTYPE_LIST}, "
+                    f"found: {compaction_value_dtype}"
+                )
+            uncompacted_model_file_path = os.path.join(
+                os.path.dirname(trained_model_file_path),
+                model_trainer_config_info.get(MODEL_TRAINER_UNCOMPACTED_MODEL_FILE_NAME_KEY, "uncompacted_model.pkl"),
+            )
+            compaction_report_file_path = os.path.join(
+                model_trainer_artifact_dir,
+                model_trainer_config_info.get(MODEL_TRAINER_COMPACTION_REPORT_FILE_NAME_KEY, "compaction.yaml"),
+            )
             base_accuracy = model_trainer_config_info[MODEL_TRAINER_BASE_ACCURACY_KEY]
+            max_cv = None
+            max_param_combination = None
+            if self.training_pipeline_config.is_sample_mode:
+                # accuracy on small sample is not meaningful and sample model is never accepted
+                base_accuracy = 0.0
+                # fit times on small sample would make shared timing of full searches far too optimistic
+                fit_timing_file_path = None
+                max_cv = self.training_pipeline_config.sample_max_cv
+                max_param_combination = self.training_pipeline_config.sample_max_param_combination
             model_trainer_config = ModelTrainerConfig(
                 trained_model_file_path=trained_model_file_path,
                 base_accuracy=base_accuracy,
                 model_config_file_path=model_config_file_path,
+                max_cv=max_cv,
+                max_param_combination=max_param_combination,
+                fit_timing_file_path=fit_timing_file_path,
+                search_time_budget=model_trainer_config_info[MODEL_TRAINER_SEARCH_TIME_BUDGET_KEY],
+                default_fit_time=model_trainer_config_info[MODEL_TRAINER_DEFAULT_FIT_TIME_KEY],
+                cv_cache_dir=cv_cache_dir,
+                cv_cache_max_size=model_trainer_config_info.get(MODEL_TRAINER_CV_CACHE_MAX_SIZE_KEY),
+                search_checkpoint_file_path=search_checkpoint_file_path,
+                shared_array_dir=shared_array_dir,
+                streaming_chunk_size=self.get_streaming_chunk_size(),
+                model_evaluation_file_path=model_evaluation_file_path,
+                warm_start_n_estimators=model_trainer_config_info.get(MODEL_TRAINER_WARM_START_N_ESTIMATORS_KEY),
+                warm_start_max_estimators=model_trainer_config_info.get(MODEL_TRAINER_WARM_START_MAX_ESTIMATORS_KEY),
+                warm_start_report_file_path=warm_start_report_file_path,
+                shard_key=shard_key,
+                shard_grid_cell_size=model_trainer_config_info.get(MODEL_TRAINER_SHARD_GRID_CELL_SIZE_KEY),
+                shard_min_rows=model_trainer_config_info.get(MODEL_TRAINER_SHARD_MIN_ROWS_KEY, 500),
+                shard_n_jobs=model_trainer_config_info.get(MODEL_TRAINER_SHARD_N_JOBS_KEY),
+                model_compressor=model_compressor,
+                compaction_tolerance=compaction_tolerance,
+                compaction_value_dtype=compaction_value_dtype,
+                uncompacted_model_file_path=uncompacted_model_file_path,
+                compaction_report_file_path=compaction_report_file_path,
             )
             logging.info(f"Model trainer config: {model_trainer_config}")
             return model_trainer_config
@@ -138,8 +265,25 @@ class Configuration:
             model_evaluation_file_path = os.path.join(
                 model_evaluation_artifact_dir, model_evaluation_config[MODEL_EVALUATION_FILE_NAME_KEY]
             )
+            # prediction cache is shared by all runs and is kept out of model evaluation directory
+            prediction_cache_dir = None
+            if model_evaluation_config.get(MODEL_EVALUATION_PREDICTION_CACHE_ENABLED_KEY, False):
+                prediction_cache_dir = os.path.join(
+                    self.artifact_dir, model_evaluation_config[MODEL_EVALUATION_PREDICTION_CACHE_DIR_KEY]
+                )
+            # trained model is accepted only when it is better at confidence level over bootstrap resamples
+            bootstrap_n_resamples = None
+            if model_evaluation_config.get(MODEL_EVALUATION_BOOTSTRAP_ENABLED_KEY, False):
+                bootstrap_n_resamples = model_evaluation_config[MODEL_EVALUATION_BOOTSTRAP_N_RESAMPLES_KEY]
             response = ModelEvaluationConfig(
-                model_evaluation_file_path=model_evaluation_file_path, time_stamp=self.time_stamp
+                model_evaluation_file_path=model_evaluation_file_path,
+                time_stamp=self.time_stamp,
+                is_sample_mode=self.training_pipeline_config.is_sample_mode,
+                prediction_cache_dir=prediction_cache_dir,
+                prediction_cache_max_size=model_evaluation_config.get(MODEL_EVALUATION_PREDICTION_CACHE_MAX_SIZE_KEY),
+                n_jobs=model_evaluation_config.get(MODEL_EVALUATION_N_JOBS_KEY),
+                bootstrap_n_resamples=bootstrap_n_resamples,
+                confidence_level=model_evaluation_config.get(MODEL_EVALUATION_CONFIDENCE_LEVEL_KEY, 0.95),
             )
             logging.info(f"Model Evaluation Config: {response}.")
             return response
@@ -153,12 +297,36 @@ class Configuration:
             export_dir_path = os.path.join(
                 ROOT_DIR, model_pusher_config_info[MODEL_PUSHER_MODEL_EXPORT_DIR_KEY], time_stamp
             )
-            model_pusher_config = ModelPusherConfig(export_dir_path=export_dir_path)
+            model_pusher_config = ModelPusherConfig(
+                export_dir_path=export_dir_path, is_sample_mode=self.training_pipeline_config.is_sample_mode
+            )
             logging.info(f"Model pusher config {model_pusher_config}")
             return model_pusher_config
         except Exception as e:
             raise HousingException(e) from e
 
+    def get_artifact_retention_config(self) -> ArtifactRetentionConfig:
+        try:
+            artifact_retention_info = self.config_info[ARTIFACT_RETENTION_CONFIG_KEY]
+            model_evaluation_config = self.get_model_evaluation_config()
+            model_export_dir = os.path.join(
+                ROOT_DIR, self.config_info[MODEL_PUSHER_CONFIG_KEY][MODEL_PUSHER_MODEL_EXPORT_DIR_KEY]
+            )
+            artifact_retention_config = ArtifactRetentionConfig(
+                artifact_dir=self.artifact_dir,
+                model_evaluation_file_path=model_evaluation_config.model_evaluation_file_path,
+                model_export_dir=model_export_dir,
+                current_time_stamp=self.time_stamp,
+                keep_last_n_run=artifact_retention_info[ARTIFACT_RETENTION_KEEP_LAST_N_RUN_KEY],
+                max_total_bytes=artifact_retention_info[ARTIFACT_RETENTION_MAX_TOTAL_BYTES_KEY],
+                deduplicate=artifact_retention_info[ARTIFACT_RETENTION_DEDUPLICATE_KEY],
+                run_after_pipeline=artifact_retention_info[ARTIFACT_RETENTION_RUN_AFTER_PIPELINE_KEY],
+            )
+            logging.info(f"Artifact Retention Config: {artifact_retention_config}")
+            return artifact_retention_config
+        except Exception as e:
+            raise HousingException(e) from e
+
     def get_training_pipeline_config(self) -> TrainingPipelineConfig:
         try:
             training_pipeline_info = self.config_info[TRAINING_PIPELINE_CONFIG_KEY]
@@ -167,7 +335,27 @@ class Configuration:
                 training_pipeline_info[TRAINING_PIPELINE_NAME_KEY],
                 training_pipeline_info[TRAINING_PIPELINE_ARTIFACT_DIR_KEY],
             )
-            training_pipeline_config = TrainingPipelineConfig(artifact_dir=artifact_dir)
+            is_sample_mode = training_pipeline_info.get(TRAINING_PIPELINE_SAMPLE_MODE_KEY, False)
+            if self.is_sample_mode is not None:
+                is_sample_mode = self.is_sample_mode
+            precision = training_pipeline_info.get(TRAINING_PIPELINE_PRECISION_KEY, "float64")
+            if precision not in PRECISION_LIST:
+                raise Exception(
+                    f"[{TRAINING_PIPELINE_PRECISION_KEY}] must be one of {PRECISION_LIST}, found: {precision}"
+                )
+            training_pipeline_config = TrainingPipelineConfig(
+                artifact_dir=artifact_dir,
+                is_sample_mode=is_sample_mode,
+                sample_size=training_pipeline_info.get(TRAINING_PIPELINE_SAMPLE_SIZE_KEY),
+                sample_max_cv=training_pipeline_info.get(TRAINING_PIPELINE_SAMPLE_MAX_CV_KEY),
+                sample_max_param_combination=training_pipeline_info.get(
+                    TRAINING_PIPELINE_SAMPLE_MAX_PARAM_COMBINATION_KEY
+                ),
+                is_streaming_mode=training_pipeline_info.get(TRAINING_PIPELINE_STREAMING_MODE_KEY, False),
+                streaming_chunk_size=training_pipeline_info.get(TRAINING_PIPELINE_STREAMING_CHUNK_SIZE_KEY),
+                streaming_fit_sample_size=training_pipeline_info.get(TRAINING_PIPELINE_STREAMING_FIT_SAMPLE_SIZE_KEY),
+                precision=precision,
+            )
             logging.info(f"Training Pipeline Config: {training_pipeline_config}")
             return training_pipeline_config
         except Exception as e:
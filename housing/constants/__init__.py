@@ -19,6 +19,27 @@ CURRENT_TIME_STAMP = datetime.now().strftime("%Y-%m-%dT%H-%M-%S")
 TRAINING_PIPELINE_CONFIG_KEY = "training_pipeline_config"
 TRAINING_PIPELINE_ARTIFACT_DIR_KEY = "artifact_dir"
 TRAINING_PIPELINE_NAME_KEY = "pipeline_name"
+TRAINING_PIPELINE_SAMPLE_MODE_KEY = "sample_mode"
+TRAINING_PIPELINE_SAMPLE_SIZE_KEY = "sample_size"
+TRAINING_PIPELINE_SAMPLE_MAX_CV_KEY = "sample_max_cv"
+TRAINING_PIPELINE_SAMPLE_MAX_PARAM_COMBINATION_KEY = "sample_max_param_combination"
+TRAINING_PIPELINE_STREAMING_MODE_KEY = "streaming_mode"
+TRAINING_PIPELINE_STREAMING_CHUNK_SIZE_KEY = "streaming_chunk_size"
+TRAINING_PIPELINE_STREAMING_FIT_SAMPLE_SIZE_KEY = "streaming_fit_sample_size"
+TRAINING_PIPELINE_PRECISION_KEY = "precision"
+PRECISION_LIST = ["float32", "float64"]
+
+# * Object Container of save_object
+OBJECT_CONTAINER_MAGIC = b"HOUSINGOBJ\x00\x01"
+OBJECT_CONTAINER_ALIGNMENT = 64
+NO_COMPRESSOR = "none"
+OBJECT_COMPRESSOR_LIST = [NO_COMPRESSOR, "zlib", "lzma", "lz4"]
+
+# * Leaf value dtypes of compacted forest
+COMPACTION_VALUE_DTYPE_LIST = ["float32", "float16"]
+
+# * Default quantiles of prediction interval, lower and upper bound of 90% band
+PREDICTION_INTERVAL_QUANTILE_LIST = [0.05, 0.95]
 
 # * Data Ingestion variable
 DATA_INGESTION_ARTIFACT_DIR = "data_ingestion"
@@ -45,6 +66,12 @@ DATA_TRANSFORMATION_ADD_BEDROOM_PER_ROOM_KEY = "add_bedroom_per_room"
 DATA_TRANSFORMATION_TRANSFORMED_DIR_KEY = "transformed_dir"
 DATA_TRANSFORMATION_TRANSFORMED_TRAIN_DIR_KEY = "transformed_train_dir"
 DATA_TRANSFORMATION_TRANSFORMED_TEST_DIR_KEY = "transformed_test_dir"
+DATA_TRANSFORMATION_ARRAY_ORDER_KEY = "array_order"
+DATA_TRANSFORMATION_INPLACE_SCALING_KEY = "inplace_scaling"
+DATA_TRANSFORMATION_SPATIAL_FEATURE_ENABLED_KEY = "spatial_feature_enabled"
+DATA_TRANSFORMATION_SPATIAL_N_NEIGHBORS_KEY = "spatial_n_neighbors"
+TRANSFORMED_FEATURE_FILE_SUFFIX = "_feature.npy"
+TRANSFORMED_TARGET_FILE_SUFFIX = "_target.npy"
 DATA_TRANSFORMATION_PREPROCESSING_DIR_KEY = "preprocessing_dir"
 DATA_TRANSFORMATION_PREPROCESSED_OBJECT_FILE_NAME_KEY = "preprocessed_object_file_name"
 
@@ -56,16 +83,56 @@ MODEL_TRAINER_TRAINED_MODEL_FILE_NAME_KEY = "model_file_name"
 MODEL_TRAINER_BASE_ACCURACY_KEY = "base_accuracy"
 MODEL_TRAINER_MODEL_CONFIG_DIR_KEY = "model_config_dir"
 MODEL_TRAINER_MODEL_CONFIG_FILE_NAME_KEY = "model_config_file_name"
+MODEL_TRAINER_FIT_TIMING_FILE_NAME_KEY = "fit_timing_file_name"
+MODEL_TRAINER_SEARCH_TIME_BUDGET_KEY = "search_time_budget"
+MODEL_TRAINER_DEFAULT_FIT_TIME_KEY = "default_fit_time"
+MODEL_TRAINER_CV_CACHE_ENABLED_KEY = "cv_cache_enabled"
+MODEL_TRAINER_CV_CACHE_DIR_KEY = "cv_cache_dir"
+MODEL_TRAINER_CV_CACHE_MAX_SIZE_KEY = "cv_cache_max_size"
+MODEL_TRAINER_SEARCH_CHECKPOINT_FILE_NAME_KEY = "search_checkpoint_file_name"
+MODEL_TRAINER_SHARED_ARRAY_ENABLED_KEY = "shared_array_enabled"
+MODEL_TRAINER_SHARED_ARRAY_DIR_KEY = "shared_array_dir"
+MODEL_TRAINER_WARM_START_ENABLED_KEY = "warm_start_enabled"
+MODEL_TRAINER_WARM_START_N_ESTIMATORS_KEY = "warm_start_n_estimators"
+MODEL_TRAINER_WARM_START_MAX_ESTIMATORS_KEY = "warm_start_max_estimators"
+MODEL_TRAINER_WARM_START_REPORT_FILE_NAME_KEY = "warm_start_report_file_name"
+MODEL_TRAINER_SHARD_ENABLED_KEY = "shard_enabled"
+MODEL_TRAINER_SHARD_KEY_KEY = "shard_key"
+MODEL_TRAINER_SHARD_GRID_CELL_SIZE_KEY = "shard_grid_cell_size"
+MODEL_TRAINER_SHARD_MIN_ROWS_KEY = "shard_min_rows"
+MODEL_TRAINER_SHARD_N_JOBS_KEY = "shard_n_jobs"
+MODEL_TRAINER_MODEL_COMPRESSOR_KEY = "model_compressor"
+MODEL_TRAINER_COMPACTION_ENABLED_KEY = "compaction_enabled"
+MODEL_TRAINER_COMPACTION_TOLERANCE_KEY = "compaction_tolerance"
+MODEL_TRAINER_COMPACTION_VALUE_DTYPE_KEY = "compaction_value_dtype"
+MODEL_TRAINER_UNCOMPACTED_MODEL_FILE_NAME_KEY = "uncompacted_model_file_name"
+MODEL_TRAINER_COMPACTION_REPORT_FILE_NAME_KEY = "compaction_report_file_name"
 
 # * Model Evaluation Variable
 MODEL_EVALUATION_ARTIFACT_DIR = "model_evaluation"
 MODEL_EVALUATION_CONFIG_KEY = "model_evaluation_config"
 MODEL_EVALUATION_FILE_NAME_KEY = "model_evaluation_file_name"
+MODEL_EVALUATION_PREDICTION_CACHE_ENABLED_KEY = "prediction_cache_enabled"
+MODEL_EVALUATION_PREDICTION_CACHE_DIR_KEY = "prediction_cache_dir"
+MODEL_EVALUATION_PREDICTION_CACHE_MAX_SIZE_KEY = "prediction_cache_max_size"
+MODEL_EVALUATION_N_JOBS_KEY = "n_jobs"
+MODEL_EVALUATION_BOOTSTRAP_ENABLED_KEY = "bootstrap_enabled"
+MODEL_EVALUATION_BOOTSTRAP_N_RESAMPLES_KEY = "bootstrap_n_resamples"
+MODEL_EVALUATION_CONFIDENCE_LEVEL_KEY = "confidence_level"
 
 # * Model Pusher Variable
+MODEL_PUSHER_ARTIFACT_DIR = "model_pusher"
 MODEL_PUSHER_CONFIG_KEY = "model_pusher_config"
 MODEL_PUSHER_MODEL_EXPORT_DIR_KEY = "model_export_dir"
 
+# * Artifact Retention Variable
+ARTIFACT_RETENTION_ARTIFACT_DIR = "artifact_retention"
+ARTIFACT_RETENTION_CONFIG_KEY = "artifact_retention_config"
+ARTIFACT_RETENTION_KEEP_LAST_N_RUN_KEY = "keep_last_n_run"
+ARTIFACT_RETENTION_MAX_TOTAL_BYTES_KEY = "max_total_bytes"
+ARTIFACT_RETENTION_DEDUPLICATE_KEY = "deduplicate"
+ARTIFACT_RETENTION_RUN_AFTER_PIPELINE_KEY = "run_after_pipeline"
+
 # * Schema File Variable
 SCHEMA_COLUMN_KEY = "columns"
 SCHEMA_TARGET_COLUMN_KEY = "target_column"
@@ -85,6 +152,38 @@ COLUMN_HOUSEHOLDS = "households"
 COLUMN_MEDIAN_INCOME = "median_income"
 COLUMN_MEDIAN_HOUSE_VALUE = "median_house_value"
 COLUMN_OCEAN_PROXIMITY = "ocean_proximity"
+# generated by SpatialFeatureGenerator
+COLUMN_NEIGHBOR_MEDIAN_INCOME = "neighbor_median_income"
+COLUMN_DISTANCE_TO_COAST = "distance_to_coast"
+COLUMN_DISTANCE_TO_CITY = "distance_to_city"
+
+# * Spatial Reference Points (latitude, longitude) of California
+CITY_COORDINATE_LIST = [
+    (34.05, -118.24),  # Los Angeles
+    (32.72, -117.16),  # San Diego
+    (37.34, -121.89),  # San Jose
+    (37.77, -122.42),  # San Francisco
+    (36.74, -119.79),  # Fresno
+    (38.58, -121.49),  # Sacramento
+]
+COAST_COORDINATE_LIST = [
+    (32.53, -117.12),
+    (32.75, -117.25),
+    (33.20, -117.39),
+    (33.60, -117.88),
+    (33.75, -118.40),
+    (34.02, -118.50),
+    (34.40, -119.70),
+    (34.45, -120.47),
+    (35.37, -120.86),
+    (36.60, -121.90),
+    (36.95, -122.03),
+    (37.77, -122.51),
+    (38.30, -123.05),
+    (39.44, -123.81),
+    (40.80, -124.16),
+    (41.75, -124.20),
+]
 TARGET_COLUMN_KEY = "target_column"
 
 # * Best Model
@@ -95,3 +194,10 @@ HISTORY_KEY = "history"
 # * Experiment Variable
 EXPERIMENT_DIR_NAME = "experiment"
 EXPERIMENT_FILE_NAME = "experiment.csv"
+# locked by process running pipeline of a run, in model trainer directory of run
+PIPELINE_LOCK_FILE_NAME = "pipeline.lock"
+
+# * Stage Instrumentation Variable
+STAGE_METRIC_FILE_NAME = "stage_metric.csv"
+STAGE_PROFILE_DIR_NAME = "profile"
+STAGE_PROFILE_FILE_EXTENSION = ".prof"
@@ -17,13 +17,16 @@ DataTransformationArtifact = namedtuple(
     [
         "is_transformed",
         "message",
-        "transformed_train_file_path",
-        "transformed_test_file_path",
+        "transformed_train_feature_file_path",
+        "transformed_train_target_file_path",
+        "transformed_test_feature_file_path",
+        "transformed_test_target_file_path",
         "preprocessed_object_file_path",
     ],
 )
 
-# boolean for status, message, trained model file path, metric for train and test data, model accuracy
+# boolean for status, message, trained model file path, metric for train and test data, model accuracy,
+# original model and compaction report file path of compacted forest (None when model isn't compacted)
 ModelTrainerArtifact = namedtuple(
     "ModelTrainerArtifact",
     [
@@ -35,6 +38,8 @@ ModelTrainerArtifact = namedtuple(
         "train_accuracy",
         "test_accuracy",
         "model_accuracy",
+        "uncompacted_model_file_path",
+        "compaction_report_file_path",
     ],
 )
 
@@ -43,3 +48,9 @@ ModelEvaluationArtifact = namedtuple("ModelEvaluationArtifact", ["is_model_accep
 
 # boolean for status, path of exported model
 ModelPusherArtifact = namedtuple("ModelPusherArtifact", ["is_model_pusher", "export_model_file_path"])
+
+# boolean for dry run, removed paths, bytes reclaimed by removal and by hardlink deduplication, message
+ArtifactRetentionArtifact = namedtuple(
+    "ArtifactRetentionArtifact",
+    ["is_dry_run", "removed_path_list", "reclaimed_bytes", "deduplicated_bytes", "message"],
+)
@@ -3,7 +3,14 @@ from collections import namedtuple
 #  download_url, download_folder, extracted_folder, file_path, train_dataset_folder, test_dataset_folder
 DataIngestionConfig = namedtuple(
     "DataIngestionConfig",
-    ["dataset_download_url", "tgz_download_dir", "raw_data_dir", "ingested_train_dir", "ingested_test_dir"],
+    [
+        "dataset_download_url",
+        "tgz_download_dir",
+        "raw_data_dir",
+        "ingested_train_dir",
+        "ingested_test_dir",
+        "sample_size",
+    ],
 )
 
 # schema_file_path
@@ -13,21 +20,106 @@ DataValidationConfig = namedtuple(
 )
 
 # data_specific_configurations*, transformed_data_dir, preprocessed_object_export_path
+# streaming_chunk_size is None for in-memory transformation, streaming_fit_sample_size bounds rows used to fit imputers
+# spatial_n_neighbors is None when spatial features are disabled
 DataTransformationConfig = namedtuple(
     "DataTransformationConfig",
-    ["add_bedroom_per_room", "transformed_train_dir", "transformed_test_dir", "preprocess_object_file_path"],
+    [
+        "add_bedroom_per_room",
+        "transformed_train_dir",
+        "transformed_test_dir",
+        "preprocess_object_file_path",
+        "streaming_chunk_size",
+        "streaming_fit_sample_size",
+        "array_order",
+        "precision",
+        "inplace_scaling",
+        "spatial_n_neighbors",
+    ],
 )
 
 # model_object_export_path, base_accuracy #! if trained model accuracy less than base_accuracy then reject the model
+# max_cv, max_param_combination limit model search in sample mode, None for full search
+# fit timing of past searches, time budget (seconds) and default fit time (seconds) to plan search cost
+# shard_key is None unless sharded training is enabled
 ModelTrainerConfig = namedtuple(
-    "ModelTrainerConfig", ["trained_model_file_path", "base_accuracy", "model_config_file_path"]
+    "ModelTrainerConfig",
+    [
+        "trained_model_file_path",
+        "base_accuracy",
+        "model_config_file_path",
+        "max_cv",
+        "max_param_combination",
+        "fit_timing_file_path",
+        "search_time_budget",
+        "default_fit_time",
+        "cv_cache_dir",
+        "cv_cache_max_size",
+        "search_checkpoint_file_path",
+        "shared_array_dir",
+        "streaming_chunk_size",
+        "model_evaluation_file_path",
+        "warm_start_n_estimators",
+        "warm_start_max_estimators",
+        "warm_start_report_file_path",
+        "shard_key",
+        "shard_grid_cell_size",
+        "shard_min_rows",
+        "shard_n_jobs",
+        "model_compressor",
+        "compaction_tolerance",
+        "compaction_value_dtype",
+        "uncompacted_model_file_path",
+        "compaction_report_file_path",
+    ],
 )
 
-# file_path of all the existing model in production, timestamp
-ModelEvaluationConfig = namedtuple("ModelEvaluationConfig", ["model_evaluation_file_path", "time_stamp"])
+# file_path of all the existing model in production, timestamp, boolean for sample mode #! sample model is never accepted
+ModelEvaluationConfig = namedtuple(
+    "ModelEvaluationConfig",
+    [
+        "model_evaluation_file_path",
+        "time_stamp",
+        "is_sample_mode",
+        "prediction_cache_dir",
+        "prediction_cache_max_size",
+        "n_jobs",
+        "bootstrap_n_resamples",
+        "confidence_level",
+    ],
+)
+
+# path to save model, boolean for sample mode #! sample model is never exported
+ModelPusherConfig = namedtuple("ModelPusherConfig", ["export_dir_path", "is_sample_mode"])
 
-# path to save model
-ModelPusherConfig = namedtuple("ModelPusherConfig", ["export_dir_path"])
+# artifact dirs to clean, files referencing models to keep, retention policies
+ArtifactRetentionConfig = namedtuple(
+    "ArtifactRetentionConfig",
+    [
+        "artifact_dir",
+        "model_evaluation_file_path",
+        "model_export_dir",
+        "current_time_stamp",
+        "keep_last_n_run",
+        "max_total_bytes",
+        "deduplicate",
+        "run_after_pipeline",
+    ],
+)
 
 # configuration of asset required during training
-TrainingPipelineConfig = namedtuple("TrainingPipelineConfig", ["artifact_dir"])
+# sample mode runs pipeline on subsample of data with capped model search for quick check of config changes
+TrainingPipelineConfig = namedtuple(
+    "TrainingPipelineConfig",
+    [
+        "artifact_dir",
+        "is_sample_mode",
+        "sample_size",
+        "sample_max_cv",
+        "sample_max_param_combination",
+        "is_streaming_mode",
+        "streaming_chunk_size",
+        "streaming_fit_sample_size",
+        "precision",
+    ],
+)
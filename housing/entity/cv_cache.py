@@ -0,0 +1,65 @@
+import json
+import hashlib
+import numpy as np
+import sklearn
+from typing import List
+from housing.exception import HousingException
+from housing.entity.disk_lru_cache import DiskLRUCache
+
+CV_CACHE_FILE_EXTENSION = ".json"
+SCORE_KEY = "score"
+FIT_TIME_KEY = "fit_time"
+FOLD_RESULT_KEY = "fold_result"
+
+
+def get_array_fingerprint(*array_list: np.ndarray) -> str:
+    """Return sha256 digest of shape, dtype and content of arrays"""
+    try:
+        digest = hashlib.sha256()
+        for array in array_list:
+            array = np.ascontiguousarray(array)
+            digest.update(f"{array.shape}{array.dtype.str}".encode())
+            digest.update(array.data)
+        return digest.hexdigest()
+    except Exception as e:
+        raise HousingException(e) from e
+
+
+def get_split_fingerprint(split_list: list) -> str:
+    """Return digest of train and test indices of every fold, identifies cv splitter and subsample of the fold"""
+    return get_array_fingerprint(*[np.asarray(index) for split in split_list for index in split])
+
+
+class CVResultCache(DiskLRUCache):
+    """On disk cache of cross validation fold scores and fit times of an estimator with fixed parameters
+
+    Entry key is made of data fingerprint, estimator class, full parameter dict, cv split fingerprint, scoring
+    and sklearn version, so any change in these is a miss. Value is list of {score, fit_time} per fold.
+    """
+
+    file_extension = CV_CACHE_FILE_EXTENSION
+    cache_name = "cv"
+    write_mode = "w"
+    read_error_tuple = (ValueError, KeyError)
+
+    @staticmethod
+    def get_key(estimator, params: dict, data_fingerprint: str, split_fingerprint: str, scoring) -> str:
+        estimator_class = f"{type(estimator).__module__}.{type(estimator).__qualname__}"
+        # full parameter dict, default and configured parameters are part of the key
+        full_params = {**estimator.get_params(deep=False), **params}
+        key_data = {
+            "data": data_fingerprint,
+            "estimator": estimator_class,
+            "params": {name: repr(value) for name, value in sorted(full_params.items())},
+            "cv": split_fingerprint,
+            "scoring": repr(scoring),
+            "sklearn": sklearn.__version__,
+        }
+        return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode()).hexdigest()
+
+    def read_entry(self, entry_file_path: str) -> List[dict]:
+        with open(entry_file_path) as entry_file:
+            return json.load(entry_file)[FOLD_RESULT_KEY]
+
+    def write_entry(self, entry_file, fold_result_list: List[dict]):
+        json.dump({FOLD_RESULT_KEY: fold_result_list}, entry_file)
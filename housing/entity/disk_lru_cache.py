@@ -0,0 +1,137 @@
+import os
+from collections import namedtuple
+from housing.exception import HousingException
+from housing.logger import logging
+from housing.utils.utils import open_for_replace
+
+DiskLRUCacheStats = namedtuple(
+    "DiskLRUCacheStats", ["hit_count", "miss_count", "write_count", "evicted_count", "entry_count", "size_bytes"]
+)
+
+
+class DiskLRUCache:
+    # extension of entry files, other files in cache directory (e.g. temporary files of writers) are ignored
+    file_extension = None
+    # mode entry files are written in, "w" for text entries
+    write_mode = "wb"
+    # name of cache in log messages
+    cache_name = "disk"
+    # errors of reading an entry which mean it is partially written or foreign, such entry is a miss
+    read_error_tuple = (ValueError, OSError)
+
+    def __init__(self, cache_dir: str, max_size_bytes: int = None):
+        """On disk key value cache with least recently used eviction
+
+        Every entry is one file named by its key, written to a temporary file and moved in place so that readers
+        never see a partial entry. Least recently used entries are evicted once the cache grows beyond
+        max_size_bytes. Subclasses define file_extension, read_entry and write_entry.
+
+        Args:
+            cache_dir (str): directory of cache entries, shared by all experiments
+            max_size_bytes (int, optional): upper limit of cache size. Defaults to None i.e. no limit.
+        """
+        try:
+            self.cache_dir = cache_dir
+            self.max_size_bytes = max_size_bytes
+            self.hit_count = 0
+            self.miss_count = 0
+            self.write_count = 0
+            self.evicted_count = 0
+            os.makedirs(self.cache_dir, exist_ok=True)
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def read_entry(self, entry_file_path: str):
+        raise NotImplementedError
+
+    def write_entry(self, entry_file, value):
+        raise NotImplementedError
+
+    def get_entry_file_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{self.file_extension}")
+
+    def get(self, key: str):
+        """Return cached value, None on miss"""
+        try:
+            entry_file_path = self.get_entry_file_path(key)
+            try:
+                value = self.read_entry(entry_file_path)
+            except FileNotFoundError:
+                self.miss_count += 1
+                return None
+            except self.read_error_tuple:
+                # partially written or foreign file is treated as miss and overwritten later
+                self.miss_count += 1
+                return None
+            try:
+                # access time is tracked explicitly as filesystems are often mounted with noatime
+                os.utime(entry_file_path)
+            except FileNotFoundError:
+                # evicted by another process right after it was read, value read is still valid
+                pass
+            self.hit_count += 1
+            return value
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def set(self, key: str, value):
+        try:
+            with open_for_replace(self.get_entry_file_path(key), self.write_mode) as entry_file:
+                self.write_entry(entry_file, value)
+            self.write_count += 1
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def get_entry_list(self) -> list:
+        """Return (modification time, size, file path) of every entry"""
+        entry_list = []
+        for file_name in os.listdir(self.cache_dir):
+            if not file_name.endswith(self.file_extension):
+                continue
+            entry_file_path = os.path.join(self.cache_dir, file_name)
+            try:
+                entry_stat = os.stat(entry_file_path)
+            except FileNotFoundError:
+                # evicted by another process since listing
+                continue
+            entry_list.append((entry_stat.st_mtime, entry_stat.st_size, entry_file_path))
+        return entry_list
+
+    def evict(self) -> int:
+        """Remove least recently used entries until cache size is within max_size_bytes, return removed count"""
+        try:
+            if self.max_size_bytes is None:
+                return 0
+            entry_list = self.get_entry_list()
+            size_bytes = sum(entry_size for _, entry_size, _ in entry_list)
+            evicted_count = 0
+            for _, entry_size, entry_file_path in sorted(entry_list):
+                if size_bytes <= self.max_size_bytes:
+                    break
+                try:
+                    os.remove(entry_file_path)
+                    evicted_count += 1
+                except FileNotFoundError:
+                    # another process evicting concurrently removed it first, its size is gone all the same
+                    pass
+                size_bytes -= entry_size
+            self.evicted_count += evicted_count
+            if evicted_count > 0:
+                logging.info(f"Evicted {evicted_count} {self.cache_name} cache entries, cache size: {size_bytes} bytes")
+            return evicted_count
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def get_stats(self) -> DiskLRUCacheStats:
+        try:
+            entry_list = self.get_entry_list()
+            return DiskLRUCacheStats(
+                hit_count=self.hit_count,
+                miss_count=self.miss_count,
+                write_count=self.write_count,
+                evicted_count=self.evicted_count,
+                entry_count=len(entry_list),
+                size_bytes=sum(entry_size for _, entry_size, _ in entry_list),
+            )
+        except Exception as e:
+            raise HousingException(e) from e
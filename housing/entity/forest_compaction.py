@@ -0,0 +1,288 @@
+import numpy as np
+from collections import namedtuple
+from housing.constants import COMPACTION_VALUE_DTYPE_LIST
+from housing.exception import HousingException
+from housing.logger import logging
+
+# out of bag rmse of original and compacted forest on training rows, rmse_limit is the most compaction may reach
+CompactionReport = namedtuple(
+    "CompactionReport",
+    [
+        "model_name",
+        "original_n_estimators",
+        "compacted_n_estimators",
+        "value_dtype",
+        "original_rmse",
+        "compacted_rmse",
+        "rmse_limit",
+    ],
+)
+
+# compacted trained model against its original forest on testing data, ratios are compacted / original
+# batch latency is prediction time of all testing rows, row latency is median time of single row predictions
+CompactionComparison = namedtuple(
+    "CompactionComparison",
+    [
+        "original_file_size",
+        "compacted_file_size",
+        "size_ratio",
+        "original_batch_latency",
+        "compacted_batch_latency",
+        "original_row_latency",
+        "compacted_row_latency",
+        "row_latency_ratio",
+        "original_test_rmse",
+        "compacted_test_rmse",
+        "test_rmse_delta",
+        "original_test_accuracy",
+        "compacted_test_accuracy",
+        "test_accuracy_delta",
+    ],
+)
+
+
+def is_compactable(model) -> bool:
+    """Return True for fitted single output forests averaging their trees, e.g. RandomForest and ExtraTrees"""
+    from sklearn.ensemble import ExtraTreesRegressor, RandomForestRegressor
+
+    return (
+        isinstance(model, (RandomForestRegressor, ExtraTreesRegressor))
+        and hasattr(model, "estimators_")
+        and model.n_outputs_ == 1
+    )
+
+
+def has_oob_rows(forest) -> bool:
+    """Return True when every tree of forest is fitted on a bootstrap sample, leaving out of bag training rows"""
+    return bool(getattr(forest, "bootstrap", False))
+
+
+def get_oob_mask(forest, n_samples: int) -> np.ndarray:
+    """Return True where training row is out of bag of tree, shape (rows, trees), forest is fitted on n_samples rows"""
+    from sklearn.ensemble import _forest
+
+    # private sklearn helpers drawing bootstrap samples of fit, later versions take sample_weight too
+    try:
+        n_samples_bootstrap = _forest._get_n_samples_bootstrap(n_samples, forest.max_samples)
+    except TypeError:
+        n_samples_bootstrap = _forest._get_n_samples_bootstrap(n_samples, forest.max_samples, None)
+    oob_mask = np.zeros((n_samples, len(forest.estimators_)), dtype=bool)
+    for estimator_idx, estimator in enumerate(forest.estimators_):
+        try:
+            unsampled_idx = _forest._generate_unsampled_indices(estimator.random_state, n_samples, n_samples_bootstrap)
+        except TypeError:
+            unsampled_idx = _forest._generate_unsampled_indices(
+                estimator.random_state, n_samples, n_samples_bootstrap, None
+            )
+        oob_mask[unsampled_idx, estimator_idx] = True
+    return oob_mask
+
+
+def get_oob_rmse(y: np.ndarray, prediction_sum: np.ndarray, oob_count: np.ndarray) -> np.ndarray:
+    """
+    Return rmse of out of bag prediction (prediction_sum / oob_count) over rows with out of bag trees, of every
+    column when prediction_sum is 2d
+    """
+    has_oob = oob_count > 0
+    error = np.where(has_oob, prediction_sum / np.maximum(oob_count, 1), 0) - (
+        y if prediction_sum.ndim == 1 else y[:, np.newaxis]
+    )
+    return np.sqrt(np.sum(np.where(has_oob, error, 0) ** 2, axis=0) / np.maximum(np.sum(has_oob, axis=0), 1))
+
+
+def get_rmse(y: np.ndarray, prediction: np.ndarray) -> np.ndarray:
+    """Return rmse of prediction, of every column when prediction is 2d"""
+    error = prediction - (y if prediction.ndim == 1 else y[:, np.newaxis])
+    return np.sqrt(np.mean(error**2, axis=0))
+
+
+def get_float32_threshold(threshold: np.ndarray) -> np.ndarray:
+    """
+    Round float64 split thresholds down to float32. Trees compare float32 inputs, threshold rounded down lies
+    between the float32 values it separates, so every float32 input takes the same branch as before.
+    """
+    compact_threshold = threshold.astype(np.float32)
+    rounded_up = compact_threshold.astype(np.float64) > threshold
+    compact_threshold[rounded_up] = np.nextafter(compact_threshold[rounded_up], np.float32(-np.inf))
+    return compact_threshold
+
+
+class CompactForestRegressor:
+    def __init__(self, forest, value_dtype: str = "float32", estimator_idx_list: list = None):
+        """Forest of averaged regression trees stored as flat node arrays of smallest sufficient dtypes
+
+        Nodes of all trees are concatenated, children are global node indices. Split thresholds are float32 with
+        the same splits as sklearn, leaf values are value_dtype, node and feature indices are the smallest signed
+        integers holding them. Prediction walks all (row, tree) pairs level by level, pairs reaching a leaf are
+        dropped from later levels.
+
+        Args:
+            forest: fitted compactable forest, see is_compactable
+            value_dtype (str, optional): dtype of leaf values, float32 or float16. Defaults to "float32".
+            estimator_idx_list (list, optional): indices of trees of forest kept, None for all.
+        """
+        try:
+            if value_dtype not in COMPACTION_VALUE_DTYPE_LIST:
+                raise Exception(f"value_dtype must be one of {COMPACTION_VALUE_DTYPE_LIST}, found: {value_dtype}")
+            if estimator_idx_list is None:
+                estimator_idx_list = range(len(forest.estimators_))
+            tree_list = [forest.estimators_[idx].tree_ for idx in estimator_idx_list]
+            node_count_arr = np.array([tree.node_count for tree in tree_list])
+            node_offset_arr = np.concatenate([[0], np.cumsum(node_count_arr)[:-1]])
+            node_dtype = np.int32 if node_count_arr.sum() < np.iinfo(np.int32).max else np.int64
+            feature_dtype = np.min_scalar_type(-forest.n_features_in_)
+
+            self.model_name = type(forest).__name__
+            self.n_features_in_ = forest.n_features_in_
+            self.value_dtype = value_dtype
+            self.max_depth = max(tree.max_depth for tree in tree_list)
+            self.root_node = node_offset_arr.astype(node_dtype)
+            # leaves have feature -1 and no children, they are never split
+            self.feature = np.concatenate([np.where(tree.feature < 0, -1, tree.feature) for tree in tree_list])
+            self.feature = self.feature.astype(feature_dtype)
+            self.threshold = get_float32_threshold(np.concatenate([tree.threshold for tree in tree_list]))
+            self.children_left = np.concatenate(
+                [
+                    np.where(tree.children_left < 0, 0, tree.children_left + offset)
+                    for tree, offset in zip(tree_list, node_offset_arr)
+                ]
+            ).astype(node_dtype)
+            self.children_right = np.concatenate(
+                [
+                    np.where(tree.children_right < 0, 0, tree.children_right + offset)
+                    for tree, offset in zip(tree_list, node_offset_arr)
+                ]
+            ).astype(node_dtype)
+            self.value = np.concatenate([tree.value[:, 0, 0] for tree in tree_list]).astype(value_dtype)
+        except Exception as e:
+            raise HousingException(e) from e
+
+    @property
+    def n_estimators(self) -> int:
+        return len(self.root_node)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            arr.nbytes
+            for arr in [
+                self.root_node,
+                self.feature,
+                self.threshold,
+                self.children_left,
+                self.children_right,
+                self.value,
+            ]
+        )
+
+    def apply(self, X) -> np.ndarray:
+        """Return global leaf node index of every row in every tree, shape (rows, trees)"""
+        try:
+            X = np.asarray(X, dtype=np.float32)
+            n_estimators = self.n_estimators
+            leaf_node = np.tile(self.root_node, X.shape[0])
+            pair_idx = np.arange(leaf_node.size)
+            node = leaf_node
+            for _ in range(self.max_depth + 1):
+                feature = self.feature[node]
+                is_split = feature >= 0
+                if not is_split.any():
+                    break
+                pair_idx, node, feature = pair_idx[is_split], node[is_split], feature[is_split]
+                is_left = X[pair_idx // n_estimators, feature] <= self.threshold[node]
+                node = np.where(is_left, self.children_left[node], self.children_right[node])
+                leaf_node[pair_idx] = node
+            return leaf_node.reshape(X.shape[0], n_estimators)
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def predict_estimators(self, X) -> np.ndarray:
+        """Return prediction of every tree, shape (rows, trees)"""
+        return self.value[self.apply(X)].astype(np.float64)
+
+    def predict(self, X) -> np.ndarray:
+        return self.predict_estimators(X).mean(axis=1)
+
+    def __repr__(self):
+        return f"CompactForestRegressor({self.model_name}, n_estimators={self.n_estimators})"
+
+
+def get_estimator_ranking(estimator_prediction: np.ndarray, y: np.ndarray, oob_mask: np.ndarray) -> list:
+    """
+    Greedy backward elimination of trees: repeatedly drop the tree whose removal gives the lowest out of bag rmse
+    of averaged prediction of remaining trees. Return tree indices, last dropped first.
+    """
+    estimator_idx_list = list(range(estimator_prediction.shape[1]))
+    oob_prediction = np.where(oob_mask, estimator_prediction, 0)
+    prediction_sum = oob_prediction.sum(axis=1)
+    oob_count = oob_mask.sum(axis=1)
+    dropped_idx_list = []
+    while len(estimator_idx_list) > 1:
+        candidate_rmse = get_oob_rmse(
+            y,
+            prediction_sum[:, np.newaxis] - oob_prediction[:, estimator_idx_list],
+            oob_count[:, np.newaxis] - oob_mask[:, estimator_idx_list],
+        )
+        dropped_idx = estimator_idx_list.pop(int(np.argmin(candidate_rmse)))
+        prediction_sum -= oob_prediction[:, dropped_idx]
+        oob_count -= oob_mask[:, dropped_idx]
+        dropped_idx_list.append(dropped_idx)
+    return estimator_idx_list + dropped_idx_list[::-1]
+
+
+def compact_forest(
+    forest, X: np.ndarray, y: np.ndarray, tolerance: float, value_dtype: str = "float32", random_state: int = 42
+):
+    """
+    Return (CompactForestRegressor, CompactionReport) of forest with the fewest trees whose rmse stays within
+    (1 + tolerance) times rmse of forest. X, y are the rows forest was fitted on, every tree is judged on rows out
+    of its bootstrap sample only, testing data is left for evaluation. Rows are split in halves: trees are ranked
+    by greedy elimination on one half and number of trees kept is chosen on the other, so that ranking fitted to
+    rows isn't judged on the same rows. Trees are ranked and judged with quantized leaf values.
+    Compacted forest is None when quantization alone exceeds the tolerance.
+    """
+    try:
+        if not has_oob_rows(forest):
+            raise Exception(f"{type(forest).__name__} isn't fitted on bootstrap samples, it has no out of bag rows")
+        X = np.asarray(X)
+        y = np.asarray(y, dtype=np.float64)
+        oob_mask = get_oob_mask(forest, len(y))
+        row_idx = np.random.RandomState(random_state).permutation(len(y))
+        ranking_idx, check_idx = row_idx[: len(y) // 2], row_idx[len(y) // 2 :]
+        estimator_prediction = CompactForestRegressor(forest, value_dtype=value_dtype).predict_estimators(X)
+        check_mask = oob_mask[check_idx]
+
+        original_prediction = np.stack([estimator.predict(X[check_idx]) for estimator in forest.estimators_], axis=1)
+        original_rmse = float(
+            get_oob_rmse(y[check_idx], np.where(check_mask, original_prediction, 0).sum(axis=1), check_mask.sum(axis=1))
+        )
+        rmse_limit = original_rmse * (1 + tolerance)
+        estimator_ranking = get_estimator_ranking(
+            estimator_prediction[ranking_idx], y[ranking_idx], oob_mask[ranking_idx]
+        )
+        # out of bag rmse on check rows of the k best ranked trees, for every k
+        ranked_mask = check_mask[:, estimator_ranking]
+        ranked_prediction = np.where(ranked_mask, estimator_prediction[check_idx][:, estimator_ranking], 0)
+        prefix_rmse = get_oob_rmse(y[check_idx], np.cumsum(ranked_prediction, axis=1), np.cumsum(ranked_mask, axis=1))
+        compacted_model = None
+        n_kept = 0
+        compacted_rmse = float(prefix_rmse[-1])
+        if compacted_rmse <= rmse_limit:
+            n_kept = int(np.argmax(prefix_rmse <= rmse_limit)) + 1
+            compacted_rmse = float(prefix_rmse[n_kept - 1])
+            compacted_model = CompactForestRegressor(
+                forest, value_dtype=value_dtype, estimator_idx_list=sorted(estimator_ranking[:n_kept])
+            )
+        compaction_report = CompactionReport(
+            model_name=type(forest).__name__,
+            original_n_estimators=len(forest.estimators_),
+            compacted_n_estimators=n_kept,
+            value_dtype=value_dtype,
+            original_rmse=round(original_rmse, 6),
+            compacted_rmse=round(compacted_rmse, 6),
+            rmse_limit=round(rmse_limit, 6),
+        )
+        logging.info(f"Forest compaction: {compaction_report}")
+        return compacted_model, compaction_report
+    except Exception as e:
+        raise HousingException(e) from e
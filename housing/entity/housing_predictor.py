@@ -1,5 +1,8 @@
 import os
+import numpy as np
 import pandas as pd
+from housing.constants import SCHEMA_CATEGORICAL_COLUMN_KEY, SCHEMA_DOMAIN_VALUE_KEY, SCHEMA_NUMERICAL_COLUMN_KEY
+from housing.constants import SCHEMA_TARGET_COLUMN_KEY
 from housing.utils.utils import load_object
 from housing.exception import HousingException
 
@@ -39,6 +42,55 @@ class HousingData:
         except Exception as e:
             raise HousingException(e) from e
 
+    @staticmethod
+    def get_record_list_error_message(record_list, schema: dict) -> str:
+        """
+        Return why records e.g. parsed json can't be predicted, None when they are a non empty list of records with
+        a number for every numerical column and a known domain value for every categorical column of schema
+        """
+        if not isinstance(record_list, list) or len(record_list) == 0:
+            return "housing data must be a record or a non empty list of records"
+        numerical_column_list = schema[SCHEMA_NUMERICAL_COLUMN_KEY]
+        categorical_column_list = schema[SCHEMA_CATEGORICAL_COLUMN_KEY]
+        known_column_list = numerical_column_list + categorical_column_list + [schema[SCHEMA_TARGET_COLUMN_KEY]]
+        error_message_list = []
+        for record_idx, record in enumerate(record_list):
+            if not isinstance(record, dict):
+                error_message_list.append(f"record {record_idx} must be an object")
+                continue
+            for column in numerical_column_list + categorical_column_list:
+                if column not in record:
+                    error_message_list.append(f"record {record_idx}: {column} is missing")
+            for column in record:
+                if column not in known_column_list:
+                    error_message_list.append(f"record {record_idx}: {column} is not a housing data field")
+            for column in numerical_column_list:
+                value = record.get(column)
+                # bool is an int in python, but not a number in json
+                is_number = isinstance(value, (int, float)) and not isinstance(value, bool) and np.isfinite(value)
+                if column in record and not is_number:
+                    error_message_list.append(f"record {record_idx}: {column} must be a number, found: {value!r}")
+            for column in categorical_column_list:
+                domain_value_list = schema[SCHEMA_DOMAIN_VALUE_KEY][column]
+                if column in record and record[column] not in domain_value_list:
+                    error_message_list.append(
+                        f"record {record_idx}: {column} must be one of {domain_value_list}, found: {record[column]!r}"
+                    )
+        return "; ".join(error_message_list) if error_message_list else None
+
+    @staticmethod
+    def get_housing_input_data_frame_of_records(record_list: list) -> pd.DataFrame:
+        """Return input dataframe of records e.g. parsed json, every record has the fields of HousingData"""
+        try:
+            return pd.DataFrame.from_records(
+                [
+                    {column: value[0] for column, value in HousingData(**record).get_housing_data_as_dict().items()}
+                    for record in record_list
+                ]
+            )
+        except Exception as e:
+            raise HousingException(e) from e
+
     def get_housing_data_as_dict(self):
         try:
             input_data = {
@@ -58,6 +110,9 @@ class HousingData:
 
 
 class HousingPredictor:
+    # loaded model by file path and modification time, shared by predictors of the process
+    model_cache = {}
+
     def __init__(self, model_dir: str):
         try:
             self.model_dir = model_dir
@@ -74,11 +129,40 @@ class HousingPredictor:
         except Exception as e:
             raise HousingException(e) from e
 
+    def get_model(self, model_path: str):
+        """Return model of model_path, loaded once per model file, buffers are memory mapped when uncompressed"""
+        try:
+            cache_key = (model_path, os.stat(model_path).st_mtime_ns)
+            if cache_key not in HousingPredictor.model_cache:
+                HousingPredictor.model_cache.clear()
+                HousingPredictor.model_cache[cache_key] = load_object(file_path=model_path, mmap_mode="r")
+            return HousingPredictor.model_cache[cache_key]
+        except Exception as e:
+            raise HousingException(e) from e
+
     def predict(self, X):
         try:
             model_path = self.get_latest_model_path()
-            model = load_object(file_path=model_path)
+            model = self.get_model(model_path)
             median_house_value = model.predict(X)
             return median_house_value
         except Exception as e:
             raise HousingException(e) from e
+
+    def predict_interval(self, X, quantile_list: list = None):
+        """Return quantiles of median house value of every row, shape (rows, quantiles), see HousingEstimatorModel"""
+        try:
+            model_path = self.get_latest_model_path()
+            model = self.get_model(model_path)
+            return model.predict_interval(X, quantile_list=quantile_list)
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def predict_with_interval(self, X, quantile_list: list = None):
+        """Return (median house value, its quantiles) of every row, input is transformed once for both"""
+        try:
+            model_path = self.get_latest_model_path()
+            model = self.get_model(model_path)
+            return model.predict_with_interval(X, quantile_list=quantile_list)
+        except Exception as e:
+            raise HousingException(e) from e
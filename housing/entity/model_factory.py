@@ -1,12 +1,32 @@
 import yaml
 import os
+import time
 import importlib
 import numpy as np
 from typing import List
 from collections import namedtuple
 from housing.logger import logging
 from housing.exception import HousingException
-from sklearn.metrics import r2_score, mean_squared_error
+from housing.utils.utils import read_yaml_file, write_yaml_file, create_memory_mapped_array
+from sklearn.model_selection import ParameterGrid, check_cv
+from sklearn.metrics import check_scoring
+from sklearn.base import clone
+from joblib import Parallel, delayed, effective_n_jobs
+from housing.entity.search_strategy import (
+    SearchStrategy,
+    get_search_strategy,
+    get_candidate_list,
+    get_halving_schedule,
+    EXHAUSTIVE_STRATEGY,
+    RANDOMIZED_STRATEGY,
+    HALVING_STRATEGY,
+    N_SAMPLES_RESOURCE,
+)
+from housing.entity.cv_cache import CVResultCache, get_array_fingerprint, get_split_fingerprint, SCORE_KEY, FIT_TIME_KEY
+from housing.entity.prediction_cache import PredictionCache, get_data_fingerprint, get_model_checksum
+from housing.entity.streaming_model import predict_in_chunks, partial_fit_in_chunks
+from housing.entity.shard_router import ShardRouterRegressor
+from housing.entity.search_checkpoint import SearchCheckpoint, append_checkpoint_record, CANDIDATE_KEY, FOLD_INDEX_KEY
 
 GRID_SEARCH_KEY = "grid_search"
 MODULE_KEY = "module"
@@ -14,9 +34,29 @@ CLASS_KEY = "class"
 PARAM_KEY = "params"
 MODEL_SELECTION_KEY = "model_selection"
 SEARCH_PARAM_GRID_KEY = "search_param_grid"
+CV_KEY = "cv"
+DEFAULT_CV = 5
+SCORING_KEY = "scoring"
+PARALLEL_SEARCH_KEY = "parallel_search"
+ENABLED_KEY = "enabled"
+N_JOBS_KEY = "n_jobs"
+VERBOSE_KEY = "verbose"
+PRE_DISPATCH_KEY = "pre_dispatch"
+REFIT_KEY = "refit"
+ERROR_SCORE_KEY = "error_score"
+# grid_search params honoured by candidate evaluation engine, which stands in for grid_search class when fits are
+# cached or checkpointed, search_strategy is set or parallel_search is enabled
+SEARCH_ENGINE_PARAM_LIST = [CV_KEY, SCORING_KEY, N_JOBS_KEY, VERBOSE_KEY, PRE_DISPATCH_KEY, REFIT_KEY, ERROR_SCORE_KEY]
+SEARCH_ENGINE_CLASS_NAME = "sklearn.model_selection.GridSearchCV"
+MEAN_FIT_TIME_KEY = "mean_fit_time"
+N_SAMPLES_KEY = "n_samples"
+FIT_COUNT_KEY = "fit_count"
+STREAMING_MODEL_SELECTION_KEY = "streaming_model_selection"
+STREAMING_EPOCHS_KEY = "streaming_epochs"
+DEFAULT_STREAMING_EPOCHS = 1
 
 InitializedModelDetail = namedtuple(
-    "InitializedModelDetail", ["model_serial_number", "model", "param_grid_search", "model_name"]
+    "InitializedModelDetail", ["model_serial_number", "model", "param_grid_search", "model_name", "search_strategy"]
 )
 
 GridSearchedBestModel = namedtuple(
@@ -41,6 +81,15 @@ BestModel = namedtuple(
     ],
 )
 
+# fit of one parameter combination on one cross validation fold, start and end time are epoch seconds
+# start and end time are None for results read from cv cache
+CandidateFoldResult = namedtuple("CandidateFoldResult", ["score", "fit_time", "start_time", "end_time"])
+
+# wall time from first to last fit of model and sum of time spent by all cores on fits of model
+ParallelSearchReport = namedtuple(
+    "ParallelSearchReport", ["model_serial_number", "model_name", "fit_count", "wall_time", "core_seconds"]
+)
+
 MetricInfoArtifact = namedtuple(
     "MetricInfoArtifact",
     [
@@ -67,6 +116,63 @@ def evaluate_classification_model(
     pass
 
 
+def get_regression_metric_in_chunks(model, X: np.ndarray, y: np.ndarray, chunk_size: int):
+    """Return (r squared, root mean squared error) of model on X, y computed chunk by chunk"""
+    try:
+        squared_error_sum, y_sum, y_squared_sum = 0.0, 0.0, 0.0
+        for chunk_start, chunk_stop, y_pred in predict_in_chunks(model, X, chunk_size):
+            y_chunk = np.asarray(y[chunk_start:chunk_stop], dtype=np.float64)
+            squared_error_sum += float(np.sum((y_chunk - y_pred) ** 2))
+            y_sum += float(np.sum(y_chunk))
+            y_squared_sum += float(np.sum(y_chunk**2))
+        total_sum_of_squares = y_squared_sum - y_sum**2 / len(y)
+        return 1 - squared_error_sum / total_sum_of_squares, np.sqrt(squared_error_sum / len(y))
+    except Exception as e:
+        raise HousingException(e) from e
+
+
+def get_prediction_list(
+    model_list: list, X, prediction_cache: PredictionCache = None, model_checksum_list: list = None, n_jobs=None
+) -> list:
+    """
+    Return prediction of every model of model_list on X.
+    Cached predictions are read from prediction_cache, missing ones are computed concurrently and cached.
+    model_checksum_list: checksum of every model e.g. of its saved file, None to checksum pickled models
+    """
+    try:
+        prediction_list = [None] * len(model_list)
+        key_list = [None] * len(model_list)
+        if prediction_cache is not None:
+            data_fingerprint = get_data_fingerprint(X)
+            for index, model in enumerate(model_list):
+                model_checksum = (
+                    get_model_checksum(model) if model_checksum_list is None else model_checksum_list[index]
+                )
+                key_list[index] = PredictionCache.get_key(model_checksum, data_fingerprint)
+                prediction_list[index] = prediction_cache.get(key_list[index])
+        missing_index_list = [index for index, prediction in enumerate(prediction_list) if prediction is None]
+        # threads share models and data without copying them, numpy and tree predict release the gil
+        missing_prediction_list = Parallel(n_jobs=n_jobs, prefer="threads")(
+            delayed(model_list[index].predict)(X) for index in missing_index_list
+        )
+        for index, prediction in zip(missing_index_list, missing_prediction_list):
+            prediction_list[index] = np.asarray(prediction, dtype=np.float64).ravel()
+            if prediction_cache is not None:
+                prediction_cache.set(key_list[index], prediction_list[index])
+        return prediction_list
+    except Exception as e:
+        raise HousingException(e) from e
+
+
+def get_regression_metric_list(y: np.ndarray, prediction_list: list):
+    """Return (r squared array, root mean squared error array) of all predictions in one vectorized pass"""
+    y = np.asarray(y, dtype=np.float64).ravel()
+    residual = np.vstack(prediction_list) - y
+    squared_error_sum = np.einsum("ij,ij->i", residual, residual)
+    total_sum_of_squares = np.sum((y - y.mean()) ** 2)
+    return 1 - squared_error_sum / total_sum_of_squares, np.sqrt(squared_error_sum / len(y))
+
+
 def evaluate_regression_model(
     model_list: list,
     X_train: np.ndarray,
@@ -74,6 +180,10 @@ def evaluate_regression_model(
     X_test: np.ndarray,
     y_test: np.ndarray,
     base_accuracy: float = 0.6,
+    chunk_size: int = None,
+    prediction_cache: PredictionCache = None,
+    model_checksum_list: list = None,
+    n_jobs=None,
 ) -> MetricInfoArtifact:
     """
     Description:
@@ -85,6 +195,10 @@ def evaluate_regression_model(
     y_train: Training dataset target feature
     X_test: Testing dataset input feature
     y_test: Testing dataset input feature
+    chunk_size: predict and score chunk by chunk so that memory doesn't grow with dataset, None for all at once
+    prediction_cache: cache of predictions keyed by model checksum and data fingerprint, None to disable
+    model_checksum_list: checksum of every model for prediction cache, None to checksum pickled models
+    n_jobs: number of threads predicting models concurrently, None for one
 
     return
     It returned a named tuple
@@ -97,21 +211,27 @@ def evaluate_regression_model(
     try:
         index_number = 0
         metric_info_artifact = None
+        if chunk_size is None:
+            # predictions of all models on training and testing dataset, then metrics of all models at once
+            train_acc_list, train_rmse_list = get_regression_metric_list(
+                y_train, get_prediction_list(model_list, X_train, prediction_cache, model_checksum_list, n_jobs)
+            )
+            test_acc_list, test_rmse_list = get_regression_metric_list(
+                y_test, get_prediction_list(model_list, X_test, prediction_cache, model_checksum_list, n_jobs)
+            )
+            if prediction_cache is not None:
+                prediction_cache.evict()
+                logging.info(f"Prediction cache stats: {prediction_cache.get_stats()}")
         for model in model_list:
             model_name = str(model)  # getting model name based on model object
             logging.info(f"{'>>'*30}Started evaluating model: [{type(model).__name__}] {'<<'*30}")
 
-            # Getting prediction for training and testing dataset
-            y_train_pred = model.predict(X_train)
-            y_test_pred = model.predict(X_test)
-
-            # Calculating r squared score on training and testing dataset
-            train_acc = r2_score(y_train, y_train_pred)
-            test_acc = r2_score(y_test, y_test_pred)
-
-            # Calculating mean squared error on training and testing dataset
-            train_rmse = np.sqrt(mean_squared_error(y_train, y_train_pred))
-            test_rmse = np.sqrt(mean_squared_error(y_test, y_test_pred))
+            if chunk_size is not None:
+                train_acc, train_rmse = get_regression_metric_in_chunks(model, X_train, y_train, chunk_size)
+                test_acc, test_rmse = get_regression_metric_in_chunks(model, X_test, y_test, chunk_size)
+            else:
+                train_acc, train_rmse = train_acc_list[index_number], train_rmse_list[index_number]
+                test_acc, test_rmse = test_acc_list[index_number], test_rmse_list[index_number]
 
             # Calculating harmonic mean of train_accuracy and test_accuracy
             model_accuracy = (2 * (train_acc * test_acc)) / (train_acc + test_acc)
@@ -151,6 +271,56 @@ def evaluate_regression_model(
         raise HousingException(e) from e
 
 
+def fit_and_score_candidate(
+    estimator,
+    params: dict,
+    X: np.ndarray,
+    y: np.ndarray,
+    train_index: np.ndarray,
+    test_index: np.ndarray,
+    scoring,
+    checkpoint_file_path: str = None,
+    checkpoint_record: dict = None,
+    error_score=np.nan,
+) -> CandidateFoldResult:
+    """
+    Fit clone of estimator with params on train_index rows and score it on test_index rows.
+    Executed in worker process of parallel search, hence module level function.
+    Result is appended to checkpoint file as soon as the fit completes when checkpoint_file_path is given.
+    error_score: score of failed fit as in GridSearchCV, "raise" to raise the error
+    """
+    start_time = time.time()
+    estimator = clone(estimator).set_params(**params)
+    fit_start_time = time.perf_counter()
+    try:
+        estimator.fit(X[train_index], y[train_index])
+        fit_time = time.perf_counter() - fit_start_time
+        score = check_scoring(estimator, scoring=scoring)(estimator, X[test_index], y[test_index])
+    except Exception as e:
+        if error_score == "raise":
+            raise
+        fit_time = time.perf_counter() - fit_start_time
+        score = error_score
+        logging.warning(f"Fit of {type(estimator).__name__} with {params} failed, score set to {error_score}: {e}")
+    if checkpoint_file_path is not None:
+        append_checkpoint_record(
+            checkpoint_file_path, {**checkpoint_record, SCORE_KEY: float(score), FIT_TIME_KEY: fit_time}
+        )
+    return CandidateFoldResult(score=score, fit_time=fit_time, start_time=start_time, end_time=time.time())
+
+
+def get_best_candidate_index(mean_score_list: list) -> int:
+    """Return index of first candidate with highest mean score, failed candidates with nan score rank last"""
+    mean_score_arr = np.asarray(mean_score_list, dtype=np.float64)
+    if np.isnan(mean_score_arr).all():
+        raise ValueError(f"All {len(mean_score_list)} candidates failed to fit, check error_score of grid_search")
+    return int(np.nanargmax(mean_score_arr))
+
+
+def refit_estimator(estimator, params: dict, X: np.ndarray, y: np.ndarray):
+    return clone(estimator).set_params(**params).fit(X, y)
+
+
 def get_sample_model_config_yaml_file(export_dir: str):
     try:
         model_config = {
@@ -159,6 +329,7 @@ def get_sample_model_config_yaml_file(export_dir: str):
                 CLASS_KEY: "GridSearchCV",
                 PARAM_KEY: {"cv": 3, "verbose": 1},
             },
+            PARALLEL_SEARCH_KEY: {ENABLED_KEY: False, N_JOBS_KEY: -1},
             MODEL_SELECTION_KEY: {
                 "module_0": {
                     MODULE_KEY: "module_of_model",
@@ -184,18 +355,56 @@ class ModelFactory:
     def __init__(
         self,
         model_config_path: str = None,
+        max_cv: int = None,
+        max_param_combination: int = None,
+        fit_timing_file_path: str = None,
+        cv_cache_dir: str = None,
+        cv_cache_max_size: int = None,
+        checkpoint_file_path: str = None,
+        shared_array_dir: str = None,
     ):
+        """
+        model_config_path: model.yaml file path
+        max_cv: upper limit of cross validation folds, None for no limit
+        max_param_combination: upper limit of parameter combinations searched per model, None for no limit
+        fit_timing_file_path: yaml file to record mean fit time of each model for search cost planning
+        cv_cache_dir: directory of cross validation result cache shared by experiments, None to disable cache
+        cv_cache_max_size: upper limit of cv cache size in bytes, None for no limit
+        checkpoint_file_path: file where completed fits are logged to resume interrupted search, None to disable
+        shared_array_dir: directory where cv fold indices are memory mapped for search workers, None to keep them
+        in memory
+        """
         try:
             self.config: dict = ModelFactory.read_params(model_config_path)
 
             self.grid_search_cv_module: str = self.config[GRID_SEARCH_KEY][MODULE_KEY]
             self.grid_search_class_name: str = self.config[GRID_SEARCH_KEY][CLASS_KEY]
             self.grid_search_property_data: dict = dict(self.config[GRID_SEARCH_KEY][PARAM_KEY])
+            self.max_param_combination = max_param_combination
+            self.fit_timing_file_path = fit_timing_file_path
+            cv = self.grid_search_property_data.get(CV_KEY, DEFAULT_CV)
+            if max_cv is not None and isinstance(cv, int) and cv > max_cv:
+                logging.info(f"Limiting cross validation folds from {cv} to {max_cv}")
+                self.grid_search_property_data[CV_KEY] = max_cv
 
             self.models_initialization_config: dict = dict(self.config[MODEL_SELECTION_KEY])
 
+            # parallel search schedules fits of all models on one process pool of n_jobs workers
+            parallel_search_config: dict = dict(self.config.get(PARALLEL_SEARCH_KEY) or dict())
+            self.is_parallel_search: bool = parallel_search_config.get(ENABLED_KEY, False)
+            self.parallel_search_n_jobs: int = parallel_search_config.get(N_JOBS_KEY, -1)
+
             self.initialized_model_list = None
             self.grid_searched_best_model_list = None
+            self.parallel_search_report_list = None
+            self.cv_result_cache = None
+            if cv_cache_dir is not None:
+                self.cv_result_cache = CVResultCache(cache_dir=cv_cache_dir, max_size_bytes=cv_cache_max_size)
+            self.shared_array_dir = shared_array_dir
+            self.cv_split_list_dict = dict()
+            self.search_checkpoint = None
+            if checkpoint_file_path is not None:
+                self.search_checkpoint = SearchCheckpoint(checkpoint_file_path=checkpoint_file_path)
 
         except Exception as e:
             raise HousingException(e) from e
@@ -225,6 +434,18 @@ class ModelFactory:
         except Exception as e:
             raise HousingException(e) from e
 
+    @staticmethod
+    def limit_param_grid(param_grid, max_param_combination: int) -> list:
+        """
+        Return first max_param_combination parameter combinations of param_grid
+        as param_grid accepted by grid search i.e. list of dictionary with single value list
+        """
+        try:
+            param_combination_list = list(ParameterGrid(param_grid))[:max_param_combination]
+            return [{key: [value] for key, value in params.items()} for params in param_combination_list]
+        except Exception as e:
+            raise HousingException(e) from e
+
     @staticmethod
     def read_params(config_path: str) -> dict:
         try:
@@ -234,6 +455,396 @@ class ModelFactory:
         except Exception as e:
             raise HousingException(e) from e
 
+    def update_fit_timing(self, model_name: str, mean_fit_time: float, n_samples: int, fit_count: int):
+        """Record mean fit time of model in fit timing file, used by SearchCostPlanner to estimate search time"""
+        try:
+            if self.fit_timing_file_path is None:
+                return
+            fit_timing = None
+            if os.path.exists(self.fit_timing_file_path):
+                fit_timing = read_yaml_file(file_path=self.fit_timing_file_path)
+            fit_timing = dict() if fit_timing is None else fit_timing
+            fit_timing[model_name] = {
+                MEAN_FIT_TIME_KEY: mean_fit_time,
+                N_SAMPLES_KEY: n_samples,
+                FIT_COUNT_KEY: fit_count,
+            }
+            write_yaml_file(file_path=self.fit_timing_file_path, data=fit_timing)
+            logging.info(f"Mean fit time of {model_name}: {mean_fit_time} seconds on {n_samples} samples")
+        except Exception as e:
+            raise HousingException(e) from e
+
+    @staticmethod
+    def is_grid_search_strategy(search_strategy: SearchStrategy) -> bool:
+        """Exhaustive search without time budget is delegated to grid_search class of model.yaml"""
+        return search_strategy is None or (
+            search_strategy.name == EXHAUSTIVE_STRATEGY and search_strategy.time_budget is None
+        )
+
+    @staticmethod
+    def is_single_round_strategy(search_strategy: SearchStrategy) -> bool:
+        """Strategies whose candidates are known upfront and evaluated all at once, no budget check in between"""
+        return search_strategy is None or (
+            search_strategy.name in [EXHAUSTIVE_STRATEGY, RANDOMIZED_STRATEGY] and search_strategy.time_budget is None
+        )
+
+    def check_search_engine_config(self, is_grid_search_replaced: bool):
+        """
+        Raise error for grid_search params of model.yaml which candidate evaluation engine can't honour.
+        is_grid_search_replaced: engine runs exhaustive searches in place of grid_search class, which is then
+        required to be GridSearchCV
+        """
+        try:
+            grid_search_class_name = f"{self.grid_search_cv_module}.{self.grid_search_class_name}"
+            if is_grid_search_replaced and grid_search_class_name != SEARCH_ENGINE_CLASS_NAME:
+                raise ValueError(
+                    f"grid_search class {grid_search_class_name} can't be used with cv cache, search checkpoint or "
+                    f"parallel search, only GridSearchCV is reproduced by candidate evaluation engine. "
+                    f"Disable cv_cache_enabled, search_checkpoint_file_name and parallel_search to run it"
+                )
+            unsupported_param_list = [
+                param for param in self.grid_search_property_data if param not in SEARCH_ENGINE_PARAM_LIST
+            ]
+            if len(unsupported_param_list) > 0:
+                raise ValueError(
+                    f"grid_search params {unsupported_param_list} are not supported by candidate evaluation engine "
+                    f"used with cv cache, search checkpoint, search_strategy or parallel search, supported params "
+                    f"are {SEARCH_ENGINE_PARAM_LIST}"
+                )
+            if self.grid_search_property_data.get(REFIT_KEY, True) is not True:
+                raise ValueError(
+                    f"grid_search refit={self.grid_search_property_data[REFIT_KEY]} is not supported by candidate "
+                    f"evaluation engine, best parameters are always refitted on complete data"
+                )
+            error_score = self.grid_search_property_data.get(ERROR_SCORE_KEY, np.nan)
+            if error_score != "raise" and not isinstance(error_score, (int, float)):
+                raise ValueError(f"grid_search error_score must be 'raise' or a number, got {error_score}")
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def get_search_parallel(self, n_jobs) -> Parallel:
+        """Return Parallel of candidate evaluation engine with verbose and pre_dispatch of grid_search params"""
+        return Parallel(
+            n_jobs=n_jobs,
+            verbose=self.grid_search_property_data.get(VERBOSE_KEY, 0),
+            pre_dispatch=self.grid_search_property_data.get(PRE_DISPATCH_KEY, "2*n_jobs"),
+        )
+
+    def get_search_n_jobs(self):
+        if self.is_parallel_search:
+            return self.parallel_search_n_jobs
+        return self.grid_search_property_data.get(N_JOBS_KEY)
+
+    def get_cv_split_list(self, input_feature, output_feature) -> list:
+        """Return (train index, test index) of every cv fold, computed once per data size and shared by searches"""
+        try:
+            if len(input_feature) in self.cv_split_list_dict:
+                return self.cv_split_list_dict[len(input_feature)]
+            cv = check_cv(self.grid_search_property_data.get(CV_KEY, DEFAULT_CV), output_feature, classifier=False)
+            split_list = list(cv.split(input_feature, output_feature))
+            if self.shared_array_dir is not None:
+                split_list = [
+                    (
+                        create_memory_mapped_array(
+                            os.path.join(self.shared_array_dir, f"fold_{fold_index}_train_index.npy"), train_index
+                        ),
+                        create_memory_mapped_array(
+                            os.path.join(self.shared_array_dir, f"fold_{fold_index}_test_index.npy"), test_index
+                        ),
+                    )
+                    for fold_index, (train_index, test_index) in enumerate(split_list)
+                ]
+            self.cv_split_list_dict[len(input_feature)] = split_list
+            return split_list
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def evaluate_candidate_list(
+        self,
+        parallel,
+        initialized_model: InitializedModelDetail,
+        param_list: List[dict],
+        input_feature,
+        output_feature,
+        split_list: list,
+    ) -> List[List[CandidateFoldResult]]:
+        """Return CandidateFoldResult of every fold for each parameter combination of param_list"""
+        try:
+            return self.evaluate_candidate_task_list(
+                parallel,
+                [(initialized_model.model, params, split_list) for params in param_list],
+                input_feature,
+                output_feature,
+            )
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def evaluate_candidate_task_list(
+        self, parallel, candidate_task_list: list, input_feature, output_feature
+    ) -> List[List[CandidateFoldResult]]:
+        """
+        Evaluate (estimator, params, split_list) candidates, candidates found in cv cache and folds found in search
+        checkpoint are not fitted again and fits of all other candidates are scheduled together on parallel
+        ================================================================================
+        return: CandidateFoldResult of every fold for each candidate of candidate_task_list
+        """
+        try:
+            scoring = self.grid_search_property_data.get(SCORING_KEY)
+            candidate_fold_result_list = [[None] * len(split_list) for _, _, split_list in candidate_task_list]
+            candidate_key_list = [None] * len(candidate_task_list)
+            cached_candidate_index_set = set()
+            if self.cv_result_cache is not None or self.search_checkpoint is not None:
+                data_fingerprint = get_array_fingerprint(input_feature, output_feature)
+                split_fingerprint_dict = dict()
+                for candidate_index, (estimator, params, split_list) in enumerate(candidate_task_list):
+                    if id(split_list) not in split_fingerprint_dict:
+                        split_fingerprint_dict[id(split_list)] = get_split_fingerprint(split_list)
+                    candidate_key = CVResultCache.get_key(
+                        estimator, params, data_fingerprint, split_fingerprint_dict[id(split_list)], scoring
+                    )
+                    candidate_key_list[candidate_index] = candidate_key
+                    cached_fold_result_list = None
+                    if self.cv_result_cache is not None:
+                        cached_fold_result_list = self.cv_result_cache.get(candidate_key)
+                    if cached_fold_result_list is not None:
+                        cached_candidate_index_set.add(candidate_index)
+                    elif self.search_checkpoint is not None:
+                        cached_fold_result_list = [
+                            self.search_checkpoint.get(candidate_key, fold_index)
+                            for fold_index in range(len(split_list))
+                        ]
+                    if cached_fold_result_list is None:
+                        continue
+                    candidate_fold_result_list[candidate_index] = [
+                        (
+                            None
+                            if fold_result is None
+                            else CandidateFoldResult(
+                                score=fold_result[SCORE_KEY],
+                                fit_time=fold_result[FIT_TIME_KEY],
+                                start_time=None,
+                                end_time=None,
+                            )
+                        )
+                        for fold_result in cached_fold_result_list
+                    ]
+
+            fit_task_list = [
+                (candidate_index, fold_index)
+                for candidate_index, fold_result_list in enumerate(candidate_fold_result_list)
+                for fold_index, fold_result in enumerate(fold_result_list)
+                if fold_result is None
+            ]
+            checkpoint_file_path = None
+            if self.search_checkpoint is not None:
+                checkpoint_file_path = self.search_checkpoint.checkpoint_file_path
+            fold_result_list = []
+            if len(fit_task_list) > 0:
+                fold_result_list = parallel(
+                    delayed(fit_and_score_candidate)(
+                        candidate_task_list[candidate_index][0],
+                        candidate_task_list[candidate_index][1],
+                        input_feature,
+                        output_feature,
+                        candidate_task_list[candidate_index][2][fold_index][0],
+                        candidate_task_list[candidate_index][2][fold_index][1],
+                        scoring,
+                        checkpoint_file_path,
+                        {CANDIDATE_KEY: candidate_key_list[candidate_index], FOLD_INDEX_KEY: fold_index},
+                        self.grid_search_property_data.get(ERROR_SCORE_KEY, np.nan),
+                    )
+                    for candidate_index, fold_index in fit_task_list
+                )
+            for (candidate_index, fold_index), fold_result in zip(fit_task_list, fold_result_list):
+                candidate_fold_result_list[candidate_index][fold_index] = fold_result
+
+            if self.cv_result_cache is not None:
+                for candidate_index, fold_result_list in enumerate(candidate_fold_result_list):
+                    if candidate_index in cached_candidate_index_set:
+                        continue
+                    self.cv_result_cache.set(
+                        candidate_key_list[candidate_index],
+                        [
+                            {SCORE_KEY: float(fold_result.score), FIT_TIME_KEY: fold_result.fit_time}
+                            for fold_result in fold_result_list
+                        ],
+                    )
+            if self.cv_result_cache is not None or self.search_checkpoint is not None:
+                fold_count = sum(len(fold_result_list) for fold_result_list in candidate_fold_result_list)
+                logging.info(
+                    f"{len(cached_candidate_index_set)} of {len(candidate_task_list)} candidates found in cv cache, "
+                    f"{fold_count - len(fit_task_list)} of {fold_count} fits skipped, {len(fit_task_list)} scheduled"
+                )
+            return candidate_fold_result_list
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def execute_strategy_search_operation(
+        self, initialized_model: InitializedModelDetail, input_feature, output_feature
+    ) -> GridSearchedBestModel:
+        """
+        Perform parameter search with search_strategy of initialized model:
+        exhaustive: all combinations of search_param_grid
+        randomized: n_iter combinations sampled from search_param_grid lists and distributions
+        halving: successive halving of candidates, each rung gives factor times more n_samples or n_estimators
+        Search stops after the chunk or rung which exceeds time_budget seconds and best of evaluated candidates
+        is refitted on complete data.
+        ================================================================================
+        return: Function will return GridSearchedBestModel
+        """
+        try:
+            search_strategy: SearchStrategy = initialized_model.search_strategy
+            split_list = self.get_cv_split_list(input_feature, output_feature)
+            candidate_list = get_candidate_list(search_strategy, initialized_model.param_grid_search)
+            n_jobs = self.get_search_n_jobs()
+            logging.info(
+                f"{search_strategy.name} search of {initialized_model.model_name} over {len(candidate_list)} "
+                f"candidates: {search_strategy}"
+            )
+            start_time = time.perf_counter()
+            # (params, mean score, fold results) of candidates evaluated in the last chunk or rung
+            evaluated_candidate_list = []
+            timed_fold_result_list = []
+            with self.get_search_parallel(n_jobs) as parallel:
+                if search_strategy.name == HALVING_STRATEGY:
+                    evaluated_candidate_list, timed_fold_result_list = self.execute_halving_rungs(
+                        parallel,
+                        initialized_model,
+                        candidate_list,
+                        input_feature,
+                        output_feature,
+                        split_list,
+                        start_time,
+                    )
+                else:
+                    chunk_size = max(effective_n_jobs(n_jobs), 1)
+                    for chunk_start in range(0, len(candidate_list), chunk_size):
+                        param_list = candidate_list[chunk_start : chunk_start + chunk_size]
+                        candidate_fold_result_list = self.evaluate_candidate_list(
+                            parallel, initialized_model, param_list, input_feature, output_feature, split_list
+                        )
+                        for params, fold_result_list in zip(param_list, candidate_fold_result_list):
+                            mean_score = np.mean([fold_result.score for fold_result in fold_result_list])
+                            evaluated_candidate_list.append((params, mean_score))
+                            timed_fold_result_list.extend(fold_result_list)
+                        if ModelFactory.is_time_budget_exceeded(search_strategy, start_time):
+                            logging.info(
+                                f"Time budget of {search_strategy.time_budget} seconds exceeded after "
+                                f"{len(evaluated_candidate_list)} of {len(candidate_list)} candidates"
+                            )
+                            break
+
+                # first candidate with highest score, same tie breaking as GridSearchCV
+                best_candidate_index = get_best_candidate_index(
+                    [mean_score for _, mean_score in evaluated_candidate_list]
+                )
+                best_params, best_score = evaluated_candidate_list[best_candidate_index]
+                best_model = refit_estimator(initialized_model.model, best_params, input_feature, output_feature)
+
+            logging.info(
+                f"{search_strategy.name} search of {initialized_model.model_name} completed in "
+                f"{time.perf_counter() - start_time:.3f} seconds, best score {best_score} with {best_params}"
+            )
+            if len(timed_fold_result_list) > 0:
+                self.update_fit_timing(
+                    model_name=initialized_model.model_name,
+                    mean_fit_time=float(np.mean([fold_result.fit_time for fold_result in timed_fold_result_list])),
+                    n_samples=len(input_feature),
+                    fit_count=len(timed_fold_result_list),
+                )
+            return GridSearchedBestModel(
+                model_serial_number=initialized_model.model_serial_number,
+                model=initialized_model.model,
+                best_model=best_model,
+                best_parameters=best_params,
+                best_score=best_score,
+            )
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def execute_halving_rungs(
+        self,
+        parallel,
+        initialized_model: InitializedModelDetail,
+        candidate_list: List[dict],
+        input_feature,
+        output_feature,
+        split_list: list,
+        start_time: float,
+    ):
+        """
+        Evaluate candidate_list by successive halving, return (params, mean score) of candidates of last completed
+        rung and fold results of fits done with full resource (used for fit timing)
+        """
+        try:
+            search_strategy: SearchStrategy = initialized_model.search_strategy
+            if search_strategy.resource == N_SAMPLES_RESOURCE:
+                max_resources = min(len(train_index) for train_index, _ in split_list)
+                # subsample of every rung is prefix of same shuffled train index, so rungs are nested
+                random_state = np.random.RandomState(search_strategy.random_state)
+                shuffled_split_list = [
+                    (random_state.permutation(train_index), test_index) for train_index, test_index in split_list
+                ]
+            else:
+                max_resources = initialized_model.model.get_params()[search_strategy.resource]
+            if search_strategy.max_resources is not None:
+                max_resources = min(max_resources, search_strategy.max_resources)
+            halving_schedule = get_halving_schedule(
+                n_candidates=len(candidate_list),
+                factor=search_strategy.factor,
+                max_resources=max_resources,
+                min_resources=search_strategy.min_resources,
+            )
+            logging.info(f"Halving schedule: {halving_schedule}")
+            evaluated_candidate_list = [(params, None) for params in candidate_list]
+            timed_fold_result_list = []
+            for rung_index, halving_rung in enumerate(halving_schedule):
+                param_list = [params for params, _ in evaluated_candidate_list[: halving_rung.n_candidates]]
+                if search_strategy.resource == N_SAMPLES_RESOURCE:
+                    rung_split_list = [
+                        (np.sort(train_index[: halving_rung.resource]), test_index)
+                        for train_index, test_index in shuffled_split_list
+                    ]
+                else:
+                    rung_split_list = split_list
+                    param_list = [{**params, search_strategy.resource: halving_rung.resource} for params in param_list]
+                candidate_fold_result_list = self.evaluate_candidate_list(
+                    parallel, initialized_model, param_list, input_feature, output_feature, rung_split_list
+                )
+                rung_candidate_list = [
+                    (params, np.mean([fold_result.score for fold_result in fold_result_list]))
+                    for params, fold_result_list in zip(param_list, candidate_fold_result_list)
+                ]
+                # stable sort keeps first of tied candidates ahead, failed candidates with nan score go last
+                evaluated_candidate_list = sorted(
+                    rung_candidate_list, key=lambda candidate: np.inf if np.isnan(candidate[1]) else -candidate[1]
+                )
+                if halving_rung.resource == max_resources:
+                    timed_fold_result_list = [
+                        fold_result
+                        for fold_result_list in candidate_fold_result_list
+                        for fold_result in fold_result_list
+                    ]
+                logging.info(
+                    f"Halving rung {rung_index}: {len(param_list)} candidates with "
+                    f"{search_strategy.resource}={halving_rung.resource}, best score {evaluated_candidate_list[0][1]}"
+                )
+                if ModelFactory.is_time_budget_exceeded(search_strategy, start_time):
+                    logging.info(
+                        f"Time budget of {search_strategy.time_budget} seconds exceeded after halving rung "
+                        f"{rung_index} of {len(halving_schedule)}"
+                    )
+                    break
+            return evaluated_candidate_list, timed_fold_result_list
+        except Exception as e:
+            raise HousingException(e) from e
+
+    @staticmethod
+    def is_time_budget_exceeded(search_strategy: SearchStrategy, start_time: float) -> bool:
+        return (
+            search_strategy.time_budget is not None and time.perf_counter() - start_time > search_strategy.time_budget
+        )
+
     def execute_grid_search_operation(
         self, initialized_model: InitializedModelDetail, input_feature, output_feature
     ) -> GridSearchedBestModel:
@@ -248,6 +859,12 @@ class ModelFactory:
         return: Function will return GridSearchOperation object
         """
         try:
+            # GridSearchCV can't skip cached or checkpointed fits, such search runs on candidate evaluation engine
+            is_fit_skippable = self.cv_result_cache is not None or self.search_checkpoint is not None
+            if is_fit_skippable or not ModelFactory.is_grid_search_strategy(initialized_model.search_strategy):
+                return self.execute_strategy_search_operation(
+                    initialized_model=initialized_model, input_feature=input_feature, output_feature=output_feature
+                )
             # instantiating GridSearchCV class
 
             grid_search_cv_ref = ModelFactory.class_for_name(
@@ -263,6 +880,12 @@ class ModelFactory:
             logging.info(message)
             grid_search_cv.fit(input_feature, output_feature)
             message = f'{">>"* 30} f"Training {type(initialized_model.model).__name__}" completed {"<<"*30}'
+            self.update_fit_timing(
+                model_name=initialized_model.model_name,
+                mean_fit_time=float(np.mean(grid_search_cv.cv_results_["mean_fit_time"])),
+                n_samples=len(input_feature),
+                fit_count=len(grid_search_cv.cv_results_["mean_fit_time"]) * getattr(grid_search_cv, "n_splits_", 1),
+            )
             grid_searched_best_model = GridSearchedBestModel(
                 model_serial_number=initialized_model.model_serial_number,
                 model=initialized_model.model,
@@ -298,6 +921,14 @@ class ModelFactory:
                     )
 
                 param_grid_search = model_initialization_config[SEARCH_PARAM_GRID_KEY]
+                search_strategy = get_search_strategy(model_initialization_config)
+                if self.max_param_combination is not None:
+                    if search_strategy.n_iter is None:
+                        param_grid_search = ModelFactory.limit_param_grid(param_grid_search, self.max_param_combination)
+                    else:
+                        search_strategy = search_strategy._replace(
+                            n_iter=min(search_strategy.n_iter, self.max_param_combination)
+                        )
                 model_name = f"{model_initialization_config[MODULE_KEY]}.{model_initialization_config[CLASS_KEY]}"
 
                 model_initialization_config = InitializedModelDetail(
@@ -305,6 +936,7 @@ class ModelFactory:
                     model=model,
                     param_grid_search=param_grid_search,
                     model_name=model_name,
+                    search_strategy=search_strategy,
                 )
 
                 initialized_model_list.append(model_initialization_config)
@@ -314,6 +946,50 @@ class ModelFactory:
         except Exception as e:
             raise HousingException(e) from e
 
+    def get_streaming_trained_model_list(self, X, y, chunk_size: int) -> list:
+        """
+        Train every model of streaming_model_selection with partial_fit chunk by chunk, no parameter search.
+        X and y are usually memory mapped so that training memory doesn't grow with dataset.
+        """
+        try:
+            if STREAMING_MODEL_SELECTION_KEY not in self.config:
+                raise Exception(f"[{STREAMING_MODEL_SELECTION_KEY}] is required in model config for streaming mode")
+            n_epochs = self.config.get(STREAMING_EPOCHS_KEY, DEFAULT_STREAMING_EPOCHS)
+            trained_model_list = []
+            for model_serial_number, model_config in self.config[STREAMING_MODEL_SELECTION_KEY].items():
+                model_obj_ref = ModelFactory.class_for_name(
+                    module_name=model_config[MODULE_KEY], class_name=model_config[CLASS_KEY]
+                )
+                model = model_obj_ref()
+                if not hasattr(model, "partial_fit"):
+                    raise Exception(f"{model_config[CLASS_KEY]} of {model_serial_number} doesn't support partial_fit")
+                if PARAM_KEY in model_config:
+                    model = ModelFactory.update_property_of_class(
+                        instance_ref=model, property_data=dict(model_config[PARAM_KEY])
+                    )
+                logging.info(f"Training {model_serial_number}: {model} over chunks of {chunk_size} rows")
+                trained_model_list.append(partial_fit_in_chunks(model, X, y, chunk_size, n_epochs=n_epochs))
+            return trained_model_list
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def get_sharded_trained_model_list(self, X, y, shard_key, min_shard_rows: int, n_jobs: int = None) -> list:
+        """
+        Fit every model of model_selection with its params per shard of X, no parameter search.
+        Return ShardRouterRegressor of every model.
+        """
+        try:
+            trained_model_list = []
+            for initialized_model in self.get_initialized_model_list():
+                logging.info(f"Training {initialized_model.model_serial_number}: {initialized_model.model} per shard")
+                shard_router = ShardRouterRegressor(
+                    estimator=initialized_model.model, shard_key=shard_key, min_shard_rows=min_shard_rows, n_jobs=n_jobs
+                )
+                trained_model_list.append(shard_router.fit(X, y))
+            return trained_model_list
+        except Exception as e:
+            raise HousingException(e) from e
+
     def initiate_best_parameter_search_for_initialized_model(
         self, initialized_model: InitializedModelDetail, input_feature, output_feature
     ) -> GridSearchedBestModel:
@@ -339,16 +1015,159 @@ class ModelFactory:
     ) -> List[GridSearchedBestModel]:
 
         try:
+            # grid_search params are checked before any fit, engine replaces grid_search class of exhaustive search
+            # when fits are skippable or scheduled on shared pool
+            is_grid_search_replaced = (
+                self.is_parallel_search or self.cv_result_cache is not None or self.search_checkpoint is not None
+            )
+            if is_grid_search_replaced or not all(
+                ModelFactory.is_grid_search_strategy(initialized_model.search_strategy)
+                for initialized_model in initialized_model_list
+            ):
+                self.check_search_engine_config(is_grid_search_replaced)
+            grid_searched_best_model_dict = dict()
+            if self.is_parallel_search:
+                # models with budget checked or halving search run on their own after the shared pool search
+                single_round_model_list = [
+                    initialized_model
+                    for initialized_model in initialized_model_list
+                    if ModelFactory.is_single_round_strategy(initialized_model.search_strategy)
+                ]
+                if len(single_round_model_list) > 0:
+                    parallel_searched_best_model_list = self.initiate_parallel_search_for_initialized_models(
+                        initialized_model_list=single_round_model_list,
+                        input_feature=input_feature,
+                        output_feature=output_feature,
+                    )
+                    for grid_searched_best_model in parallel_searched_best_model_list:
+                        grid_searched_best_model_dict[grid_searched_best_model.model_serial_number] = (
+                            grid_searched_best_model
+                        )
             self.grid_searched_best_model_list = []
             for initialized_model in initialized_model_list:
-                grid_searched_best_model = self.initiate_best_parameter_search_for_initialized_model(
-                    initialized_model=initialized_model, input_feature=input_feature, output_feature=output_feature
-                )
+                grid_searched_best_model = grid_searched_best_model_dict.get(initialized_model.model_serial_number)
+                if grid_searched_best_model is None:
+                    grid_searched_best_model = self.initiate_best_parameter_search_for_initialized_model(
+                        initialized_model=initialized_model, input_feature=input_feature, output_feature=output_feature
+                    )
                 self.grid_searched_best_model_list.append(grid_searched_best_model)
+            if self.cv_result_cache is not None:
+                self.cv_result_cache.evict()
+                logging.info(f"cv cache stats: {self.cv_result_cache.get_stats()}")
             return self.grid_searched_best_model_list
         except Exception as e:
             raise HousingException(e) from e
 
+    def initiate_parallel_search_for_initialized_models(
+        self, initialized_model_list: List[InitializedModelDetail], input_feature, output_feature
+    ) -> List[GridSearchedBestModel]:
+        """
+        Perform parameter search of all initialized models together, every (model, parameter combination, fold)
+        fit is scheduled on single process pool limited to parallel_search n_jobs cores.
+        Best parameter of each model is selected by mean cross validation score and refitted on complete data as
+        GridSearchCV does.
+        ================================================================================
+        return: List of GridSearchedBestModel in same sequence as initialized_model_list
+        """
+        try:
+            split_list = self.get_cv_split_list(input_feature, output_feature)
+
+            candidate_list = [
+                (
+                    initialized_model,
+                    get_candidate_list(initialized_model.search_strategy, initialized_model.param_grid_search),
+                )
+                for initialized_model in initialized_model_list
+            ]
+            task_list = [
+                (model_index, candidate_index)
+                for model_index, (_, param_list) in enumerate(candidate_list)
+                for candidate_index in range(len(param_list))
+            ]
+            logging.info(
+                f"Parallel search of {len(initialized_model_list)} models: {len(task_list) * len(split_list)} fits "
+                f"on n_jobs={self.parallel_search_n_jobs}"
+            )
+            with self.get_search_parallel(self.parallel_search_n_jobs) as parallel:
+                candidate_fold_result_list = self.evaluate_candidate_task_list(
+                    parallel,
+                    [
+                        (
+                            candidate_list[model_index][0].model,
+                            candidate_list[model_index][1][candidate_index],
+                            split_list,
+                        )
+                        for model_index, candidate_index in task_list
+                    ],
+                    input_feature,
+                    output_feature,
+                )
+
+                model_fold_results = {}
+                for (model_index, candidate_index), fold_result_list in zip(task_list, candidate_fold_result_list):
+                    model_fold_results.setdefault(model_index, {})[candidate_index] = fold_result_list
+
+                best_candidate_list = []
+                for model_index, (_, param_list) in enumerate(candidate_list):
+                    mean_score_list = [
+                        np.mean([fold_result.score for fold_result in model_fold_results[model_index][candidate_index]])
+                        for candidate_index in range(len(param_list))
+                    ]
+                    # first candidate with highest score, same tie breaking as GridSearchCV
+                    best_candidate_index = get_best_candidate_index(mean_score_list)
+                    best_candidate_list.append(
+                        (param_list[best_candidate_index], mean_score_list[best_candidate_index])
+                    )
+
+                # refit of best parameter of every model share the same pool
+                best_model_list = parallel(
+                    delayed(refit_estimator)(initialized_model.model, best_params, input_feature, output_feature)
+                    for (initialized_model, _), (best_params, _) in zip(candidate_list, best_candidate_list)
+                )
+
+            grid_searched_best_model_list = []
+            self.parallel_search_report_list = []
+            for model_index, (initialized_model, _) in enumerate(candidate_list):
+                model_fold_result_list = [
+                    fold_result
+                    for candidate_fold_result_list in model_fold_results[model_index].values()
+                    for fold_result in candidate_fold_result_list
+                ]
+                fitted_fold_result_list = [
+                    fold_result for fold_result in model_fold_result_list if fold_result.start_time is not None
+                ]
+                parallel_search_report = ParallelSearchReport(
+                    model_serial_number=initialized_model.model_serial_number,
+                    model_name=initialized_model.model_name,
+                    fit_count=len(fitted_fold_result_list),
+                    wall_time=max([fold_result.end_time for fold_result in fitted_fold_result_list], default=0)
+                    - min([fold_result.start_time for fold_result in fitted_fold_result_list], default=0),
+                    core_seconds=sum(
+                        fold_result.end_time - fold_result.start_time for fold_result in fitted_fold_result_list
+                    ),
+                )
+                logging.info(f"Parallel search report: {parallel_search_report}")
+                self.parallel_search_report_list.append(parallel_search_report)
+                self.update_fit_timing(
+                    model_name=initialized_model.model_name,
+                    mean_fit_time=float(np.mean([fold_result.fit_time for fold_result in model_fold_result_list])),
+                    n_samples=len(input_feature),
+                    fit_count=len(model_fold_result_list),
+                )
+                best_params, best_score = best_candidate_list[model_index]
+                grid_searched_best_model_list.append(
+                    GridSearchedBestModel(
+                        model_serial_number=initialized_model.model_serial_number,
+                        model=initialized_model.model,
+                        best_model=best_model_list[model_index],
+                        best_parameters=best_params,
+                        best_score=best_score,
+                    )
+                )
+            return grid_searched_best_model_list
+        except Exception as e:
+            raise HousingException(e) from e
+
     @staticmethod
     def get_model_detail(
         model_details: List[InitializedModelDetail], model_serial_number: str
@@ -0,0 +1,63 @@
+import hashlib
+import pickle
+import numpy as np
+import pandas as pd
+from housing.entity.cv_cache import get_array_fingerprint
+from housing.entity.disk_lru_cache import DiskLRUCache
+from housing.exception import HousingException
+
+PREDICTION_CACHE_FILE_EXTENSION = ".npy"
+
+
+def get_file_checksum(file_path: str) -> str:
+    """Return sha256 digest of file content, identifies saved model without unpickling it"""
+    try:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as file_obj:
+            for block in iter(lambda: file_obj.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+    except Exception as e:
+        raise HousingException(e) from e
+
+
+def get_model_checksum(model) -> str:
+    """Return sha256 digest of pickled model"""
+    try:
+        return hashlib.sha256(pickle.dumps(model, protocol=4)).hexdigest()
+    except Exception as e:
+        raise HousingException(e) from e
+
+
+def get_data_fingerprint(X) -> str:
+    """Return digest of input features, dataframe is identified by column names, dtypes and row values"""
+    try:
+        if isinstance(X, pd.DataFrame):
+            digest = hashlib.sha256()
+            digest.update(repr(list(zip(X.columns, X.dtypes.astype(str)))).encode())
+            digest.update(pd.util.hash_pandas_object(X, index=False).values.tobytes())
+            return digest.hexdigest()
+        return get_array_fingerprint(np.asarray(X))
+    except Exception as e:
+        raise HousingException(e) from e
+
+
+class PredictionCache(DiskLRUCache):
+    """On disk cache of model predictions
+
+    Entry key is made of model checksum and input data fingerprint, so predictions of the production model on
+    unchanged train and test rows are read from disk instead of computed again on every evaluation.
+    """
+
+    file_extension = PREDICTION_CACHE_FILE_EXTENSION
+    cache_name = "prediction"
+
+    @staticmethod
+    def get_key(model_checksum: str, data_fingerprint: str) -> str:
+        return hashlib.sha256(f"{model_checksum}:{data_fingerprint}".encode()).hexdigest()
+
+    def read_entry(self, entry_file_path: str) -> np.ndarray:
+        return np.load(entry_file_path)
+
+    def write_entry(self, entry_file, prediction: np.ndarray):
+        np.save(entry_file, np.asarray(prediction))
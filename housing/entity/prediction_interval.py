@@ -0,0 +1,85 @@
+import numpy as np
+from collections import namedtuple
+from housing.exception import HousingException
+from housing.entity.forest_compaction import CompactForestRegressor, is_compactable
+
+# inverse of X^T X of training rows with leading intercept column, residual standard deviation and degrees of
+# freedom of training residuals, for ordinary least squares prediction intervals of linear models
+LinearIntervalStatistics = namedtuple("LinearIntervalStatistics", ["covariance", "residual_std", "dof"])
+
+
+def is_linear_model(model) -> bool:
+    """Return True for fitted single output linear models, e.g. LinearRegression, SGDRegressor, StreamingRidge"""
+    return hasattr(model, "coef_") and hasattr(model, "intercept_") and np.ndim(model.coef_) == 1
+
+
+def validate_quantile_list(quantile_list: list) -> np.ndarray:
+    quantile_arr = np.asarray(quantile_list, dtype=np.float64).ravel()
+    if len(quantile_arr) == 0 or ((quantile_arr <= 0) | (quantile_arr >= 1)).any():
+        raise Exception(f"Quantiles must be within (0, 1), found: {list(quantile_list)}")
+    return quantile_arr
+
+
+def get_linear_interval_statistics(model, X: np.ndarray, y: np.ndarray, chunk_size: int = 100000):
+    """
+    Return LinearIntervalStatistics of fitted linear model over its training rows, accumulated chunk by chunk so
+    that memory mapped training arrays are never copied whole
+    """
+    try:
+        n_rows, n_features = X.shape
+        gram = np.zeros((n_features + 1, n_features + 1))
+        squared_error_sum = 0.0
+        for chunk_start in range(0, n_rows, chunk_size):
+            X_chunk = np.asarray(X[chunk_start : chunk_start + chunk_size], dtype=np.float64)
+            y_chunk = np.asarray(y[chunk_start : chunk_start + chunk_size], dtype=np.float64)
+            design = np.hstack([np.ones((len(X_chunk), 1)), X_chunk])
+            gram += design.T @ design
+            squared_error_sum += float(np.sum((y_chunk - model.predict(X_chunk)) ** 2))
+        dof = max(n_rows - np.linalg.matrix_rank(gram), 1)
+        return LinearIntervalStatistics(
+            covariance=np.linalg.pinv(gram), residual_std=float(np.sqrt(squared_error_sum / dof)), dof=int(dof)
+        )
+    except Exception as e:
+        raise HousingException(e) from e
+
+
+def get_linear_prediction_interval(
+    model, X: np.ndarray, quantile_list: list, interval_statistics: LinearIntervalStatistics
+) -> np.ndarray:
+    """
+    Return quantiles of ordinary least squares prediction distribution of every row, shape (rows, quantiles):
+    prediction + t quantile * residual_std * sqrt(1 + leverage of row)
+    """
+    try:
+        from scipy.stats import t
+
+        quantile_arr = validate_quantile_list(quantile_list)
+        X = np.asarray(X, dtype=np.float64)
+        design = np.hstack([np.ones((len(X), 1)), X])
+        leverage = np.einsum("ij,jk,ik->i", design, interval_statistics.covariance, design)
+        scale = interval_statistics.residual_std * np.sqrt(1 + leverage)
+        return model.predict(X)[:, np.newaxis] + scale[:, np.newaxis] * t.ppf(quantile_arr, interval_statistics.dof)
+    except Exception as e:
+        raise HousingException(e) from e
+
+
+def get_estimator_prediction_model(model):
+    """
+    Return model predicting every tree of forest in one vectorized pass (predict_estimators), compacted forests
+    as they are and sklearn forests as CompactForestRegressor of all their trees, None for other models
+    """
+    if hasattr(model, "predict_estimators"):
+        return model
+    if is_compactable(model):
+        return CompactForestRegressor(model)
+    return None
+
+
+def get_forest_prediction_interval(estimator_prediction_model, X: np.ndarray, quantile_list: list) -> np.ndarray:
+    """Return quantiles of per tree predictions of every row, shape (rows, quantiles)"""
+    try:
+        quantile_arr = validate_quantile_list(quantile_list)
+        estimator_prediction = estimator_prediction_model.predict_estimators(X)
+        return np.quantile(estimator_prediction, quantile_arr, axis=1).T
+    except Exception as e:
+        raise HousingException(e) from e
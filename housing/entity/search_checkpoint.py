@@ -0,0 +1,67 @@
+import os
+import json
+from housing.exception import HousingException
+from housing.logger import logging
+
+CANDIDATE_KEY = "candidate"
+FOLD_INDEX_KEY = "fold"
+SCORE_KEY = "score"
+FIT_TIME_KEY = "fit_time"
+
+
+def append_checkpoint_record(checkpoint_file_path: str, record: dict):
+    """
+    Append record as json line and flush it to disk before returning.
+    Called by search workers, a single line append is atomic so concurrent workers don't interleave records.
+    """
+    line = json.dumps(record) + "\n"
+    file_descriptor = os.open(checkpoint_file_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(file_descriptor, line.encode())
+        os.fsync(file_descriptor)
+    finally:
+        os.close(file_descriptor)
+
+
+class SearchCheckpoint:
+    def __init__(self, checkpoint_file_path: str):
+        """Durable log of completed (candidate, fold) fits of parameter search of one run
+
+        Every completed fit is appended to checkpoint file, a restarted run of same time stamp reads the file and
+        only fits the remaining (candidate, fold) pairs. Candidate is identified by same key as cv cache, so
+        record of different data, parameters or folds is never reused.
+
+        Args:
+            checkpoint_file_path (str): json lines file in model trainer artifact directory of the run
+        """
+        try:
+            self.checkpoint_file_path = checkpoint_file_path
+            self.fold_result_dict = dict()
+            os.makedirs(os.path.dirname(self.checkpoint_file_path), exist_ok=True)
+            if os.path.exists(self.checkpoint_file_path):
+                self.load()
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def load(self):
+        try:
+            with open(self.checkpoint_file_path, "rb+") as checkpoint_file:
+                content = checkpoint_file.read()
+                complete_size = content.rfind(b"\n") + 1
+                if complete_size < len(content):
+                    # last line is incomplete when process died while writing it, it is cut so that the next
+                    # appended record starts on its own line
+                    checkpoint_file.truncate(complete_size)
+            for line in content[:complete_size].splitlines():
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                self.fold_result_dict[(record[CANDIDATE_KEY], record[FOLD_INDEX_KEY])] = record
+            logging.info(f"Resuming search with {len(self.fold_result_dict)} fits from {self.checkpoint_file_path}")
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def get(self, candidate_key: str, fold_index: int) -> dict:
+        """Return checkpoint record of completed fit, None if the fit is not done yet"""
+        return self.fold_result_dict.get((candidate_key, fold_index))
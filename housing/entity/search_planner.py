@@ -0,0 +1,238 @@
+import os
+from collections import namedtuple
+from typing import List
+from housing.entity.model_factory import (
+    GRID_SEARCH_KEY,
+    PARAM_KEY,
+    MODULE_KEY,
+    CLASS_KEY,
+    MODEL_SELECTION_KEY,
+    SEARCH_PARAM_GRID_KEY,
+    CV_KEY,
+    DEFAULT_CV,
+    MEAN_FIT_TIME_KEY,
+    PARALLEL_SEARCH_KEY,
+    ENABLED_KEY,
+    N_JOBS_KEY,
+    N_SAMPLES_KEY,
+)
+from housing.entity.search_strategy import (
+    get_search_strategy,
+    get_halving_schedule,
+    is_distribution_free,
+    HALVING_STRATEGY,
+    N_SAMPLES_RESOURCE,
+)
+from housing.utils.utils import read_yaml_file
+from housing.exception import HousingException
+from housing.logger import logging
+
+REFIT_KEY = "refit"
+# sklearn default of n_estimators and nominal training size when no timing is recorded for halving search plan
+DEFAULT_N_ESTIMATORS = 100
+DEFAULT_PLAN_N_SAMPLES = 10000
+
+ModelSearchPlan = namedtuple(
+    "ModelSearchPlan",
+    [
+        "model_serial_number",
+        "model_name",
+        "param_combination_count",
+        "cv",
+        "fit_count",
+        "mean_fit_time",
+        "estimated_time",
+    ],
+)
+
+SearchPlan = namedtuple(
+    "SearchPlan",
+    ["model_search_plan_list", "fit_count", "n_jobs", "estimated_time", "search_time_budget", "is_within_budget"],
+)
+
+
+def get_param_combination_count(param_grid) -> int:
+    """Return number of parameter combinations of param_grid, a dictionary or list of dictionary of value list"""
+    param_grid_list = [param_grid] if isinstance(param_grid, dict) else list(param_grid)
+    param_combination_count = 0
+    for grid in param_grid_list:
+        grid_combination_count = 1
+        for value_list in grid.values():
+            grid_combination_count *= len(value_list)
+        param_combination_count += grid_combination_count
+    return param_combination_count
+
+
+class SearchCostPlanner:
+    def __init__(
+        self,
+        model_config: dict,
+        fit_timing_file_path: str = None,
+        search_time_budget: float = None,
+        default_fit_time: float = 1.0,
+        cpu_count: int = None,
+        n_samples: int = None,
+    ):
+        """Estimate number of fits and wall time of model search defined in model config before training
+
+        Args:
+            model_config (dict): content of model.yaml
+            fit_timing_file_path (str, optional): mean fit time per model recorded by past searches. Defaults to None.
+            search_time_budget (float, optional): maximum estimated search time in seconds. Defaults to None.
+            default_fit_time (float, optional): fit time in seconds of model without recorded timing. Defaults to 1.0.
+            cpu_count (int, optional): available cores. Defaults to os.cpu_count().
+            n_samples (int, optional): training rows of planned search, recorded fit time is scaled linearly from
+                rows it was recorded on. Defaults to None i.e. rows of recorded timing.
+        """
+        try:
+            self.model_config = model_config
+            self.n_samples = n_samples
+            self.search_time_budget = search_time_budget
+            self.default_fit_time = default_fit_time
+            self.cpu_count = os.cpu_count() if cpu_count is None else cpu_count
+            self.fit_timing = dict()
+            if fit_timing_file_path is not None and os.path.exists(fit_timing_file_path):
+                fit_timing = read_yaml_file(file_path=fit_timing_file_path)
+                self.fit_timing = dict() if fit_timing is None else fit_timing
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def is_parallel_search(self) -> bool:
+        return bool((self.model_config.get(PARALLEL_SEARCH_KEY) or dict()).get(ENABLED_KEY, False))
+
+    def get_n_jobs(self) -> int:
+        """Return number of cores used by grid search as per n_jobs parameter, or by parallel search when enabled"""
+        if self.is_parallel_search():
+            n_jobs = self.model_config[PARALLEL_SEARCH_KEY].get(N_JOBS_KEY, -1)
+        else:
+            n_jobs = self.model_config[GRID_SEARCH_KEY].get(PARAM_KEY, dict()).get(N_JOBS_KEY)
+        if n_jobs is None:
+            return 1
+        if n_jobs < 0:
+            # joblib convention, -1 for all cores, -2 for all but one
+            n_jobs = self.cpu_count + 1 + n_jobs
+        return max(min(n_jobs, self.cpu_count), 1)
+
+    def get_cv(self) -> int:
+        cv = self.model_config[GRID_SEARCH_KEY].get(PARAM_KEY, dict()).get(CV_KEY, DEFAULT_CV)
+        return DEFAULT_CV if cv is None else int(cv)
+
+    def get_n_samples(self, model_name: str) -> int:
+        """Return training rows of planned search of model"""
+        if self.n_samples is not None:
+            return self.n_samples
+        return self.fit_timing.get(model_name, dict()).get(N_SAMPLES_KEY, DEFAULT_PLAN_N_SAMPLES)
+
+    def get_mean_fit_time(self, model_name: str) -> float:
+        """Return mean fit time of model on planned training rows, default_fit_time when no timing is recorded"""
+        model_fit_timing = self.fit_timing.get(model_name, dict())
+        if MEAN_FIT_TIME_KEY not in model_fit_timing:
+            return self.default_fit_time
+        mean_fit_time = model_fit_timing[MEAN_FIT_TIME_KEY]
+        recorded_n_samples = model_fit_timing.get(N_SAMPLES_KEY)
+        if self.n_samples is None or not recorded_n_samples:
+            return mean_fit_time
+        # fit time of timing recorded on sample or on older data grows with rows of planned search
+        return mean_fit_time * self.n_samples / recorded_n_samples
+
+    def get_candidate_count(self, search_strategy, param_grid) -> int:
+        """Return number of parameter combinations evaluated first by search strategy"""
+        if search_strategy.n_iter is None:
+            return get_param_combination_count(param_grid)
+        if is_distribution_free(param_grid):
+            return min(search_strategy.n_iter, get_param_combination_count(param_grid))
+        return search_strategy.n_iter
+
+    def get_halving_cost(self, search_strategy, model_initialization_config: dict, model_name: str, cv: int):
+        """Return (fit count, fit count weighted by resource fraction) of halving search"""
+        param_combination_count = self.get_candidate_count(
+            search_strategy, model_initialization_config[SEARCH_PARAM_GRID_KEY]
+        )
+        if search_strategy.resource == N_SAMPLES_RESOURCE:
+            n_samples = self.get_n_samples(model_name)
+            max_resources = max(n_samples * (cv - 1) // cv, 1)
+        else:
+            max_resources = dict(model_initialization_config.get(PARAM_KEY) or dict()).get(
+                search_strategy.resource, DEFAULT_N_ESTIMATORS
+            )
+        if search_strategy.max_resources is not None:
+            max_resources = min(max_resources, search_strategy.max_resources)
+        halving_schedule = get_halving_schedule(
+            n_candidates=param_combination_count,
+            factor=search_strategy.factor,
+            max_resources=max_resources,
+            min_resources=search_strategy.min_resources,
+        )
+        fit_count = sum(halving_rung.n_candidates * cv for halving_rung in halving_schedule)
+        weighted_fit_count = sum(
+            halving_rung.n_candidates * cv * halving_rung.resource / max_resources for halving_rung in halving_schedule
+        )
+        return fit_count, weighted_fit_count
+
+    def get_model_search_plan_list(self) -> List[ModelSearchPlan]:
+        try:
+            cv = self.get_cv()
+            n_jobs = self.get_n_jobs()
+            refit = self.model_config[GRID_SEARCH_KEY].get(PARAM_KEY, dict()).get(REFIT_KEY, True)
+            model_search_plan_list = []
+            for model_serial_number, model_initialization_config in self.model_config[MODEL_SELECTION_KEY].items():
+                model_name = f"{model_initialization_config[MODULE_KEY]}.{model_initialization_config[CLASS_KEY]}"
+                search_strategy = get_search_strategy(model_initialization_config)
+                param_combination_count = self.get_candidate_count(
+                    search_strategy, model_initialization_config[SEARCH_PARAM_GRID_KEY]
+                )
+                search_fit_count = param_combination_count * cv
+                # halving fits on part of resource cost proportionally less than full fits
+                weighted_fit_count = search_fit_count
+                if search_strategy.name == HALVING_STRATEGY:
+                    search_fit_count, weighted_fit_count = self.get_halving_cost(
+                        search_strategy, model_initialization_config, model_name, cv
+                    )
+                mean_fit_time = self.get_mean_fit_time(model_name)
+                if self.is_parallel_search():
+                    # fits of all models share n_jobs cores, time of model is its share of core seconds
+                    estimated_time = (weighted_fit_count + 1) * mean_fit_time / n_jobs
+                else:
+                    # cross validation fits are spread over n_jobs cores, refit of best parameter runs alone
+                    estimated_time = weighted_fit_count * mean_fit_time / max(min(n_jobs, search_fit_count), 1)
+                    if refit:
+                        estimated_time += mean_fit_time
+                if search_strategy.time_budget is not None:
+                    # search stops after the chunk or rung exceeding budget, refit follows
+                    estimated_time = min(estimated_time, search_strategy.time_budget + 2 * mean_fit_time)
+                model_search_plan_list.append(
+                    ModelSearchPlan(
+                        model_serial_number=model_serial_number,
+                        model_name=model_name,
+                        param_combination_count=param_combination_count,
+                        cv=cv,
+                        fit_count=search_fit_count + int(bool(refit)),
+                        mean_fit_time=mean_fit_time,
+                        estimated_time=estimated_time,
+                    )
+                )
+            return model_search_plan_list
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def get_search_plan(self) -> SearchPlan:
+        try:
+            model_search_plan_list = self.get_model_search_plan_list()
+            estimated_time = sum(model_search_plan.estimated_time for model_search_plan in model_search_plan_list)
+            if self.is_parallel_search() and len(model_search_plan_list) > 0:
+                # search can't finish before slowest single fit and its refit
+                slowest_fit_time = max(model_search_plan.mean_fit_time for model_search_plan in model_search_plan_list)
+                estimated_time = max(estimated_time, 2 * slowest_fit_time)
+            is_within_budget = self.search_time_budget is None or estimated_time <= self.search_time_budget
+            search_plan = SearchPlan(
+                model_search_plan_list=model_search_plan_list,
+                fit_count=sum(model_search_plan.fit_count for model_search_plan in model_search_plan_list),
+                n_jobs=self.get_n_jobs(),
+                estimated_time=estimated_time,
+                search_time_budget=self.search_time_budget,
+                is_within_budget=is_within_budget,
+            )
+            logging.info(f"Search plan: {search_plan}")
+            return search_plan
+        except Exception as e:
+            raise HousingException(e) from e
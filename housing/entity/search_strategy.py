@@ -0,0 +1,134 @@
+import math
+from collections import namedtuple
+from typing import List
+from scipy import stats
+from sklearn.model_selection import ParameterGrid, ParameterSampler
+from housing.exception import HousingException
+
+SEARCH_STRATEGY_KEY = "search_strategy"
+STRATEGY_NAME_KEY = "name"
+N_ITER_KEY = "n_iter"
+RESOURCE_KEY = "resource"
+FACTOR_KEY = "factor"
+MIN_RESOURCES_KEY = "min_resources"
+MAX_RESOURCES_KEY = "max_resources"
+TIME_BUDGET_KEY = "time_budget"
+RANDOM_STATE_KEY = "random_state"
+DISTRIBUTION_KEY = "distribution"
+DISTRIBUTION_ARGS_KEY = "args"
+DISTRIBUTION_KWARGS_KEY = "kwargs"
+
+EXHAUSTIVE_STRATEGY = "exhaustive"
+RANDOMIZED_STRATEGY = "randomized"
+HALVING_STRATEGY = "halving"
+SEARCH_STRATEGY_LIST = [EXHAUSTIVE_STRATEGY, RANDOMIZED_STRATEGY, HALVING_STRATEGY]
+
+N_SAMPLES_RESOURCE = "n_samples"
+N_ESTIMATORS_RESOURCE = "n_estimators"
+DEFAULT_N_ITER = 10
+DEFAULT_HALVING_FACTOR = 3
+
+SearchStrategy = namedtuple(
+    "SearchStrategy",
+    ["name", "n_iter", "resource", "factor", "min_resources", "max_resources", "time_budget", "random_state"],
+)
+
+# candidates evaluated in one round of halving search and resource (samples or estimators) given to each fit
+HalvingRung = namedtuple("HalvingRung", ["n_candidates", "resource"])
+
+
+def get_search_strategy(model_initialization_config: dict) -> SearchStrategy:
+    """Return SearchStrategy of model from search_strategy block of model.yaml, exhaustive when not specified"""
+    try:
+        strategy_config = dict(model_initialization_config.get(SEARCH_STRATEGY_KEY) or dict())
+        name = strategy_config.get(STRATEGY_NAME_KEY, EXHAUSTIVE_STRATEGY)
+        if name not in SEARCH_STRATEGY_LIST:
+            raise Exception(f"Search strategy [{name}] is not one of {SEARCH_STRATEGY_LIST}")
+        resource = strategy_config.get(RESOURCE_KEY, N_SAMPLES_RESOURCE)
+        if name == HALVING_STRATEGY and resource not in [N_SAMPLES_RESOURCE, N_ESTIMATORS_RESOURCE]:
+            raise Exception(
+                f"Halving resource [{resource}] is not one of {[N_SAMPLES_RESOURCE, N_ESTIMATORS_RESOURCE]}"
+            )
+        n_iter = strategy_config.get(N_ITER_KEY)
+        if name == RANDOMIZED_STRATEGY and n_iter is None:
+            n_iter = DEFAULT_N_ITER
+        return SearchStrategy(
+            name=name,
+            n_iter=n_iter,
+            resource=resource,
+            factor=strategy_config.get(FACTOR_KEY, DEFAULT_HALVING_FACTOR),
+            min_resources=strategy_config.get(MIN_RESOURCES_KEY),
+            max_resources=strategy_config.get(MAX_RESOURCES_KEY),
+            time_budget=strategy_config.get(TIME_BUDGET_KEY),
+            random_state=strategy_config.get(RANDOM_STATE_KEY),
+        )
+    except Exception as e:
+        raise HousingException(e) from e
+
+
+def get_param_distributions(param_grid):
+    """
+    Resolve distribution specification of param_grid to scipy.stats distribution
+    e.g. {distribution: randint, args: [2, 20]} to stats.randint(2, 20), value lists are kept as is
+    """
+    try:
+        if not isinstance(param_grid, dict):
+            return [get_param_distributions(grid) for grid in param_grid]
+        param_distributions = dict()
+        for param_name, value in param_grid.items():
+            if isinstance(value, dict) and DISTRIBUTION_KEY in value:
+                distribution = getattr(stats, value[DISTRIBUTION_KEY])
+                value = distribution(*value.get(DISTRIBUTION_ARGS_KEY, []), **value.get(DISTRIBUTION_KWARGS_KEY, {}))
+            param_distributions[param_name] = value
+        return param_distributions
+    except Exception as e:
+        raise HousingException(e) from e
+
+
+def is_distribution_free(param_grid) -> bool:
+    """True if param_grid only has value lists i.e. it can be enumerated exhaustively"""
+    param_grid_list = [param_grid] if isinstance(param_grid, dict) else list(param_grid)
+    return all(isinstance(value, list) for grid in param_grid_list for value in grid.values())
+
+
+def get_candidate_list(search_strategy: SearchStrategy, param_grid) -> List[dict]:
+    """Return parameter combinations to be evaluated first by search_strategy"""
+    try:
+        if search_strategy.n_iter is None:
+            return list(ParameterGrid(param_grid))
+        param_distributions = get_param_distributions(param_grid)
+        n_iter = search_strategy.n_iter
+        if is_distribution_free(param_grid):
+            # sampling without replacement is limited to number of combinations
+            n_iter = min(n_iter, len(ParameterGrid(param_grid)))
+        return list(ParameterSampler(param_distributions, n_iter=n_iter, random_state=search_strategy.random_state))
+    except Exception as e:
+        raise HousingException(e) from e
+
+
+def get_halving_schedule(n_candidates: int, factor: int, max_resources: int, min_resources: int = None) -> list:
+    """
+    Return list of HalvingRung, every rung keeps 1/factor of candidates and gives factor times more resource.
+    When min_resources is not specified, it is chosen so that the last rung uses max_resources.
+    """
+    try:
+        n_required_rungs = 1 + math.floor(math.log(max(n_candidates, 1), factor))
+        is_exhausting = min_resources is None
+        if is_exhausting:
+            min_resources = max(max_resources // factor ** (n_required_rungs - 1), 1)
+        min_resources = min(min_resources, max_resources)
+        n_possible_rungs = 1 + math.floor(math.log(max_resources / min_resources, factor))
+        n_rungs = min(n_required_rungs, n_possible_rungs)
+        halving_schedule = [
+            HalvingRung(
+                n_candidates=math.ceil(n_candidates / factor**rung_index),
+                resource=min(min_resources * factor**rung_index, max_resources),
+            )
+            for rung_index in range(n_rungs)
+        ]
+        if is_exhausting:
+            # integer division of min_resources may leave last rung short of max_resources
+            halving_schedule[-1] = halving_schedule[-1]._replace(resource=max_resources)
+        return halving_schedule
+    except Exception as e:
+        raise HousingException(e) from e
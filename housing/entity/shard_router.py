@@ -0,0 +1,175 @@
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import BaseEstimator, RegressorMixin, clone
+from housing.constants import COLUMN_LATITUDE, COLUMN_LONGITUDE
+from housing.exception import HousingException
+from housing.logger import logging
+
+# shard label of rows without shard, e.g. unknown category, they are predicted by fallback model
+NO_SHARD_LABEL = -1
+GRID_SHARD_KEY = "grid"
+
+
+class CategoryShardKey:
+    def __init__(self, column_idx_list: list, category_list: list):
+        """Shard label of transformed rows is index of active one hot column of a categorical column
+
+        Args:
+            column_idx_list (list): indices of one hot columns of categorical column in transformed features
+            category_list (list): category of every one hot column, used in shard names
+        """
+        self.column_idx_list = column_idx_list
+        self.category_list = category_list
+
+    def __call__(self, X: np.ndarray) -> np.ndarray:
+        indicator = np.asarray(X[:, self.column_idx_list])
+        label = np.argmax(indicator != 0, axis=1)
+        label[~(indicator != 0).any(axis=1)] = NO_SHARD_LABEL
+        return label
+
+    def get_shard_name(self, label: int) -> str:
+        return str(self.category_list[label]) if label != NO_SHARD_LABEL else "fallback"
+
+
+class GridShardKey:
+    def __init__(self, latitude_idx: int, longitude_idx: int, offset: list, scale: list, cell_size: float):
+        """Shard label of transformed rows is latitude/longitude grid cell of cell_size degrees
+
+        Args:
+            latitude_idx (int): index of scaled latitude in transformed features
+            longitude_idx (int): index of scaled longitude in transformed features
+            offset (list): [latitude, longitude] mean removed by scaler
+            scale (list): [latitude, longitude] scale divided by scaler
+            cell_size (float): edge of grid cell in degrees
+        """
+        self.latitude_idx = latitude_idx
+        self.longitude_idx = longitude_idx
+        self.offset = offset
+        self.scale = scale
+        self.cell_size = cell_size
+
+    def __call__(self, X: np.ndarray) -> np.ndarray:
+        latitude = np.asarray(X[:, self.latitude_idx], dtype=np.float64) * self.scale[0] + self.offset[0]
+        longitude = np.asarray(X[:, self.longitude_idx], dtype=np.float64) * self.scale[1] + self.offset[1]
+        # cells are numbered row by row over latitude and longitude in degrees, both within [-180, 180]
+        row = np.floor((latitude + 180) / self.cell_size).astype(np.int64)
+        column = np.floor((longitude + 180) / self.cell_size).astype(np.int64)
+        return row * int(np.ceil(360 / self.cell_size) + 1) + column
+
+    def get_shard_name(self, label: int) -> str:
+        if label == NO_SHARD_LABEL:
+            return "fallback"
+        n_column = int(np.ceil(360 / self.cell_size) + 1)
+        latitude = label // n_column * self.cell_size - 180
+        longitude = label % n_column * self.cell_size - 180
+        return f"lat {latitude:g}..{latitude + self.cell_size:g} lon {longitude:g}..{longitude + self.cell_size:g}"
+
+
+def get_shard_key(preprocessing_obj, shard_key_name: str, grid_cell_size: float = None):
+    """
+    Return shard key over transformed features of fitted preprocessing_obj (ColumnTransformer of DataTransformation)
+    shard_key_name: categorical column name, or "grid" for latitude/longitude cells of grid_cell_size degrees
+    """
+    try:
+        for name, pipeline, columns in preprocessing_obj.transformers_:
+            if name == "remainder" or not hasattr(pipeline, "steps"):
+                continue
+            output_start = preprocessing_obj.output_indices_[name].start
+            last_step = pipeline.steps[-1][1]
+            if shard_key_name == GRID_SHARD_KEY and COLUMN_LATITUDE in columns and COLUMN_LONGITUDE in columns:
+                # generated features are appended, input columns keep their position in scaled output
+                latitude_position, longitude_position = columns.index(COLUMN_LATITUDE), columns.index(COLUMN_LONGITUDE)
+                return GridShardKey(
+                    latitude_idx=output_start + latitude_position,
+                    longitude_idx=output_start + longitude_position,
+                    offset=[float(last_step.mean_[latitude_position]), float(last_step.mean_[longitude_position])],
+                    scale=[float(last_step.scale_[latitude_position]), float(last_step.scale_[longitude_position])],
+                    cell_size=grid_cell_size,
+                )
+            if shard_key_name in columns:
+                if not hasattr(last_step, "categories_"):
+                    raise Exception(f"Column [{shard_key_name}] is not one hot encoded by {type(last_step).__name__}")
+                column_position = list(columns).index(shard_key_name)
+                category_offset = sum(len(category_list) for category_list in last_step.categories_[:column_position])
+                category_list = list(last_step.categories_[column_position])
+                column_start = output_start + category_offset
+                return CategoryShardKey(
+                    column_idx_list=list(range(column_start, column_start + len(category_list))),
+                    category_list=category_list,
+                )
+        raise Exception(f"Shard key [{shard_key_name}] is neither a categorical column nor {GRID_SHARD_KEY}")
+    except Exception as e:
+        raise HousingException(e) from e
+
+
+def fit_shard_model(estimator, X: np.ndarray, y: np.ndarray, row_index: np.ndarray):
+    """Fit estimator on rows of one shard, X and y are memory mapped when sent to worker process"""
+    return estimator.fit(np.asarray(X[row_index]), np.asarray(y[row_index]))
+
+
+def group_row_index(label: np.ndarray) -> dict:
+    """Return row indices of every label, grouped with one stable sort instead of a mask per label"""
+    order = np.argsort(label, kind="stable")
+    unique_label, group_start = np.unique(label[order], return_index=True)
+    return dict(zip(unique_label.tolist(), np.split(order, group_start[1:])))
+
+
+class ShardRouterRegressor(BaseEstimator, RegressorMixin):
+    def __init__(self, estimator, shard_key, min_shard_rows: int = 500, n_jobs: int = None):
+        """Regressor made of one model per shard of data, rows are routed to the model of their shard
+
+        Shards are given by shard_key from transformed features. Shards with fewer than min_shard_rows training rows
+        and shards unseen in training are predicted by fallback model fitted on all rows. Shard models and fallback
+        model are fitted concurrently on a process pool.
+
+        Args:
+            estimator: unfitted estimator cloned for every shard
+            shard_key: callable returning shard label of every row of transformed features
+            min_shard_rows (int, optional): minimum training rows of shard with its own model. Defaults to 500.
+            n_jobs (int, optional): worker processes fitting shard models. Defaults to None i.e. one.
+        """
+        self.estimator = estimator
+        self.shard_key = shard_key
+        self.min_shard_rows = min_shard_rows
+        self.n_jobs = n_jobs
+
+    def fit(self, X, y):
+        try:
+            row_index_dict = group_row_index(self.shard_key(X))
+            shard_label_list = [
+                label
+                for label, row_index in row_index_dict.items()
+                if label != NO_SHARD_LABEL and len(row_index) >= self.min_shard_rows
+            ]
+            self.shard_size_dict_ = {label: len(row_index) for label, row_index in row_index_dict.items()}
+            # fallback model comes last, it is also the model of single shard data
+            task_row_index_list = [row_index_dict[label] for label in shard_label_list] + [np.arange(len(X))]
+            model_list = Parallel(n_jobs=self.n_jobs, backend="loky")(
+                delayed(fit_shard_model)(clone(self.estimator), X, y, row_index) for row_index in task_row_index_list
+            )
+            self.shard_model_dict_ = dict(zip(shard_label_list, model_list[:-1]))
+            self.fallback_model_ = model_list[-1]
+            shard_size_by_name = {
+                self.shard_key.get_shard_name(label): self.shard_size_dict_[label] for label in shard_label_list
+            }
+            logging.info(
+                f"Fitted {type(self.estimator).__name__} on shards {shard_size_by_name}, fallback on {len(X)} rows"
+            )
+            return self
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def predict(self, X):
+        """Predict mixed batch by shard, every shard model predicts all rows of its shard at once"""
+        try:
+            X = np.asarray(X)
+            prediction = np.empty(X.shape[0], dtype=np.float64)
+            for label, row_index in group_row_index(self.shard_key(X)).items():
+                model = self.shard_model_dict_.get(label, self.fallback_model_)
+                prediction[row_index] = model.predict(X[row_index])
+            return prediction
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def __repr__(self):
+        return f"ShardRouterRegressor({self.estimator!r})"
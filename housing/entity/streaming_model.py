@@ -0,0 +1,97 @@
+import numpy as np
+from sklearn.base import BaseEstimator, RegressorMixin
+from housing.exception import HousingException
+from housing.logger import logging
+
+
+def iterate_chunks(row_count: int, chunk_size: int, random_state: int = None):
+    """Yield (start, stop) row range of chunks, in shuffled chunk order when random_state is given"""
+    chunk_start_list = np.arange(0, row_count, chunk_size)
+    if random_state is not None:
+        chunk_start_list = np.random.RandomState(random_state).permutation(chunk_start_list)
+    for chunk_start in chunk_start_list:
+        yield int(chunk_start), int(min(chunk_start + chunk_size, row_count))
+
+
+def partial_fit_in_chunks(model, X: np.ndarray, y: np.ndarray, chunk_size: int, n_epochs: int = 1):
+    """
+    Train partial_fit capable model chunk by chunk, X and y are usually memory mapped so that only one chunk
+    is in memory at a time. Single pass models (e.g. StreamingRidge) see every row once whatever n_epochs is.
+    """
+    try:
+        if getattr(model, "is_single_pass", False):
+            n_epochs = 1
+        for epoch in range(n_epochs):
+            # chunk order is shuffled per epoch, rows within chunk keep their order from the shuffled ingestion split
+            for chunk_start, chunk_stop in iterate_chunks(len(X), chunk_size, random_state=epoch):
+                model.partial_fit(np.asarray(X[chunk_start:chunk_stop]), np.asarray(y[chunk_start:chunk_stop]))
+            logging.info(f"Completed epoch {epoch + 1}/{n_epochs} of {type(model).__name__}")
+        return model
+    except Exception as e:
+        raise HousingException(e) from e
+
+
+def predict_in_chunks(model, X: np.ndarray, chunk_size: int):
+    """Yield (start, stop, prediction) of every chunk of X"""
+    for chunk_start, chunk_stop in iterate_chunks(len(X), chunk_size):
+        yield chunk_start, chunk_stop, model.predict(np.asarray(X[chunk_start:chunk_stop]))
+
+
+class StreamingRidge(BaseEstimator, RegressorMixin):
+    is_single_pass = True
+
+    def __init__(self, alpha: float = 1.0, fit_intercept: bool = True):
+        """Ridge regression trained in a single pass over chunks
+
+        Accumulates X^T X, X^T y and column sums, memory is O(n_features^2) whatever the number of rows.
+        Coefficients are solved from the accumulated statistics, result is same as Ridge fitted on all rows.
+
+        Args:
+            alpha (float, optional): L2 regularization strength. Defaults to 1.0.
+            fit_intercept (bool, optional): fit intercept, intercept is not regularized. Defaults to True.
+        """
+        self.alpha = alpha
+        self.fit_intercept = fit_intercept
+
+    def reset(self):
+        for attribute in ["n_samples_seen_", "xtx_", "xty_", "x_sum_", "y_sum_", "coef_", "intercept_"]:
+            if hasattr(self, attribute):
+                delattr(self, attribute)
+
+    def partial_fit(self, X, y):
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64).ravel()
+        if not hasattr(self, "n_samples_seen_"):
+            self.n_samples_seen_ = 0
+            self.xtx_ = np.zeros((X.shape[1], X.shape[1]))
+            self.xty_ = np.zeros(X.shape[1])
+            self.x_sum_ = np.zeros(X.shape[1])
+            self.y_sum_ = 0.0
+        self.n_samples_seen_ += X.shape[0]
+        self.xtx_ += X.T @ X
+        self.xty_ += X.T @ y
+        self.x_sum_ += X.sum(axis=0)
+        self.y_sum_ += y.sum()
+        self.solve()
+        return self
+
+    def solve(self):
+        """Compute coef_ and intercept_ from accumulated statistics"""
+        xtx, xty = self.xtx_, self.xty_
+        x_mean = np.zeros_like(self.x_sum_)
+        y_mean = 0.0
+        if self.fit_intercept:
+            # centering through accumulated sums, equivalent to fitting on mean centered X and y
+            x_mean = self.x_sum_ / self.n_samples_seen_
+            y_mean = self.y_sum_ / self.n_samples_seen_
+            xtx = xtx - self.n_samples_seen_ * np.outer(x_mean, x_mean)
+            xty = xty - self.n_samples_seen_ * x_mean * y_mean
+        self.coef_ = np.linalg.solve(xtx + self.alpha * np.eye(len(xtx)), xty)
+        self.intercept_ = y_mean - x_mean @ self.coef_
+
+    def fit(self, X, y):
+        self.reset()
+        return self.partial_fit(X, y)
+
+    def predict(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.coef_ + self.intercept_
@@ -0,0 +1,136 @@
+import copy
+import numpy as np
+import pandas as pd
+from collections import namedtuple
+from housing.exception import HousingException
+from housing.logger import logging
+
+ADD_ESTIMATORS_METHOD = "add_estimators"
+PARTIAL_FIT_METHOD = "partial_fit"
+LINEAR_STATISTICS_METHOD = "linear_statistics"
+# methods updating model with statistics of rows it hasn't seen yet, they need WarmStartState of the model
+ROW_STATISTICS_METHOD_LIST = [PARTIAL_FIT_METHOD, LINEAR_STATISTICS_METHOD]
+
+# warm start time is measured, cold retrain time is search time estimated by search cost planner, so is time saved
+WarmStartReport = namedtuple(
+    "WarmStartReport",
+    [
+        "model_name",
+        "base_model_file_path",
+        "method",
+        "n_estimators",
+        "n_new_rows",
+        "warm_start_time",
+        "estimated_cold_time",
+        "estimated_time_saved",
+    ],
+)
+
+# sorted fingerprints of raw training rows model has seen and, for LinearRegression, X^T X and X^T y of its design
+# matrix (with leading intercept column when fitted with intercept), persisted with the model
+WarmStartState = namedtuple("WarmStartState", ["row_hash", "gram", "xty"])
+
+
+def get_row_hash(df: pd.DataFrame) -> np.ndarray:
+    """Return fingerprint of every raw row of dataframe, target included, independent of row position"""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def is_ordinary_least_squares(model) -> bool:
+    from sklearn.linear_model import LinearRegression
+
+    return isinstance(model, LinearRegression) and not model.get_params()["positive"] and hasattr(model, "coef_")
+
+
+def get_warm_start_method(model) -> str:
+    """Return how training of fitted model can be continued, None when it has to be retrained from scratch"""
+    params = model.get_params(deep=False) if hasattr(model, "get_params") else dict()
+    if "warm_start" in params and "n_estimators" in params:
+        return ADD_ESTIMATORS_METHOD
+    if hasattr(model, "partial_fit"):
+        return PARTIAL_FIT_METHOD
+    if is_ordinary_least_squares(model):
+        return LINEAR_STATISTICS_METHOD
+    return None
+
+
+def get_warm_start_n_estimators(model, n_estimators_increment: int) -> int:
+    """Return number of estimators of ensemble after warm start, None for models without estimators"""
+    if get_warm_start_method(model) != ADD_ESTIMATORS_METHOD:
+        return None
+    return model.get_params()["n_estimators"] + n_estimators_increment
+
+
+def get_linear_statistics(X: np.ndarray, y: np.ndarray, fit_intercept: bool, chunk_size: int = 100000) -> tuple:
+    """Return (X^T X, X^T y) of design matrix of X, accumulated chunk by chunk for memory mapped X"""
+    n_columns = X.shape[1] + int(fit_intercept)
+    gram, xty = np.zeros((n_columns, n_columns)), np.zeros(n_columns)
+    for chunk_start in range(0, len(X), chunk_size):
+        design = np.asarray(X[chunk_start : chunk_start + chunk_size], dtype=np.float64)
+        if fit_intercept:
+            design = np.hstack([np.ones((len(design), 1)), design])
+        gram += design.T @ design
+        xty += design.T @ np.asarray(y[chunk_start : chunk_start + chunk_size], dtype=np.float64)
+    return gram, xty
+
+
+def get_warm_start_state(model, row_hash: np.ndarray, X: np.ndarray, y: np.ndarray) -> WarmStartState:
+    """Return WarmStartState of model fitted on X, y whose raw rows have row_hash, None when method doesn't need it"""
+    try:
+        method = get_warm_start_method(model)
+        if method not in ROW_STATISTICS_METHOD_LIST or row_hash is None:
+            return None
+        gram, xty = None, None
+        if method == LINEAR_STATISTICS_METHOD:
+            gram, xty = get_linear_statistics(X, y, model.get_params()["fit_intercept"])
+        return WarmStartState(row_hash=np.unique(row_hash), gram=gram, xty=xty)
+    except Exception as e:
+        raise HousingException(e) from e
+
+
+def warm_start_model(
+    model, X, y, n_estimators_increment: int, warm_start_state: WarmStartState = None, row_hash: np.ndarray = None
+):
+    """
+    Continue training of copy of fitted model on X, y and return (model, method, WarmStartState, number of new rows).
+    Ensembles (forests, gradient boosting) keep their fitted estimators and add n_estimators_increment new ones
+    fitted on X, y. Incremental models are updated with rows whose row_hash isn't in warm_start_state only, rows the
+    model has already seen are not counted twice: partial_fit models (e.g. StreamingRidge) get new rows,
+    LinearRegression adds X^T X and X^T y of new rows to persisted ones and solves again. Fitted model itself is
+    left unchanged.
+    """
+    try:
+        method = get_warm_start_method(model)
+        if method is None:
+            raise Exception(f"{type(model).__name__} doesn't support warm start")
+        model = copy.deepcopy(model)
+        if method == ADD_ESTIMATORS_METHOD:
+            n_estimators = get_warm_start_n_estimators(model, n_estimators_increment)
+            logging.info(f"Warm starting {type(model).__name__} up to {n_estimators} estimators")
+            model.set_params(warm_start=True, n_estimators=n_estimators)
+            model.fit(X, y)
+            # later fit of the model is a full fit again
+            model.set_params(warm_start=False)
+            return model, method, None, len(X)
+
+        if warm_start_state is None or row_hash is None:
+            raise Exception(f"{type(model).__name__} warm start requires fingerprints of rows it was trained on")
+        new_row_idx = np.flatnonzero(~np.isin(row_hash, warm_start_state.row_hash))
+        logging.info(f"Warm starting {type(model).__name__} with {method} on {len(new_row_idx)} new rows")
+        gram, xty = warm_start_state.gram, warm_start_state.xty
+        if len(new_row_idx) > 0:
+            X_new, y_new = np.asarray(X)[new_row_idx], np.asarray(y)[new_row_idx]
+            if method == PARTIAL_FIT_METHOD:
+                model.partial_fit(X_new, y_new)
+            else:
+                fit_intercept = model.get_params()["fit_intercept"]
+                new_gram, new_xty = get_linear_statistics(X_new, y_new, fit_intercept)
+                gram, xty = gram + new_gram, xty + new_xty
+                # minimum norm least squares solution as LinearRegression
+                coef = np.linalg.pinv(gram) @ xty
+                model.coef_ = coef[int(fit_intercept) :]
+                model.intercept_ = float(coef[0]) if fit_intercept else 0.0
+        warm_start_state = WarmStartState(row_hash=np.union1d(warm_start_state.row_hash, row_hash), gram=gram, xty=xty)
+        return model, method, warm_start_state, len(new_row_idx)
+    except Exception as e:
+        raise HousingException(e) from e
@@ -0,0 +1,272 @@
+import os
+import sys
+import time
+import cProfile
+import functools
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from collections import namedtuple
+from housing.constants import STAGE_PROFILE_DIR_NAME, STAGE_PROFILE_FILE_EXTENSION, TRANSFORMED_TARGET_FILE_SUFFIX
+from housing.logger import logging
+from housing.exception import HousingException
+
+try:
+    import resource
+except ImportError:  # resource module is only available on unix platforms
+    resource = None
+
+DATA_FILE_EXTENSIONS = (".csv", ".npz", ".npy")
+PROC_DIR = "/proc"
+
+StageMetric = namedtuple(
+    "StageMetric",
+    [
+        "experiment_id",
+        "stage_name",
+        "start_time",
+        "wall_time",
+        "cpu_time",
+        "worker_cpu_time",
+        "peak_rss_delta_mb",
+        "rows_in",
+        "rows_out",
+        "artifact_bytes",
+        "profile_file_path",
+    ],
+)
+
+
+def get_peak_rss_mb() -> float:
+    """Return peak resident set size of current process in MB, None if not supported on the platform"""
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on linux
+    return peak_rss / (1024 * 1024) if sys.platform == "darwin" else peak_rss / 1024
+
+
+def get_cpu_time() -> float:
+    """
+    Return cpu time of all threads of current process (BLAS, OpenMP and joblib threads included) and of the
+    terminated and waited for child processes, in seconds
+    """
+    cpu_time = time.process_time()
+    if resource is not None:
+        children_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        cpu_time += children_usage.ru_utime + children_usage.ru_stime
+    return cpu_time
+
+
+def get_child_cpu_time_dict() -> dict:
+    """
+    Return {pid: cpu seconds} of live child processes e.g. persistent loky workers reused across stages, which
+    are not in RUSAGE_CHILDREN until they terminate. None where /proc is not available.
+    """
+    if not os.path.isdir(PROC_DIR):
+        return None
+    clock_ticks = os.sysconf("SC_CLK_TCK")
+    parent_pid = os.getpid()
+    child_cpu_time_dict = dict()
+    for pid in os.listdir(PROC_DIR):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(os.path.join(PROC_DIR, pid, "stat")) as stat_file:
+                stat = stat_file.read()
+        except OSError:
+            # process exited while scanning
+            continue
+        # fields after the parenthesized command name: state, ppid, ... utime (12th) and stime (13th)
+        field_list = stat[stat.rfind(")") + 2 :].split()
+        if int(field_list[1]) == parent_pid:
+            child_cpu_time_dict[int(pid)] = (int(field_list[11]) + int(field_list[12])) / clock_ticks
+    return child_cpu_time_dict
+
+
+def get_worker_cpu_time(start_cpu_time_dict: dict, end_cpu_time_dict: dict) -> float:
+    """
+    Return cpu time spent by live child processes between two get_child_cpu_time_dict snapshots. Time of a worker
+    which terminated in between is counted by get_cpu_time in full, so its time before the start is subtracted.
+    """
+    if start_cpu_time_dict is None or end_cpu_time_dict is None:
+        return None
+    worker_cpu_time = 0.0
+    for pid, cpu_time in end_cpu_time_dict.items():
+        worker_cpu_time += cpu_time - start_cpu_time_dict.get(pid, 0.0)
+    for pid, cpu_time in start_cpu_time_dict.items():
+        if pid not in end_cpu_time_dict:
+            worker_cpu_time -= cpu_time
+    return worker_cpu_time
+
+
+def get_row_count(file_path: str) -> int:
+    """Return number of data rows in csv or numpy array file without loading it in memory"""
+    try:
+        if file_path.endswith(".csv"):
+            with open(file_path, "rb") as file_obj:
+                return max(sum(1 for _ in file_obj) - 1, 0)
+        # transformed data is stored in npy format, memory mapping only reads the header
+        return int(np.load(file_path, mmap_mode="r").shape[0])
+    except Exception as e:
+        raise HousingException(e) from e
+
+
+def get_artifact_file_path_list(artifact) -> list:
+    """Return existing file paths referenced by artifact namedtuple"""
+    if not hasattr(artifact, "_asdict"):
+        return []
+    return [
+        value
+        for key, value in artifact._asdict().items()
+        if key.endswith("_path") and isinstance(value, str) and os.path.isfile(value)
+    ]
+
+
+def get_artifact_row_count(artifact_list: list) -> int:
+    """Return total rows of data files referenced by artifacts, None if artifacts don't reference data file"""
+    data_file_path_set = {
+        file_path
+        for artifact in artifact_list
+        for file_path in get_artifact_file_path_list(artifact)
+        # target file is aligned with its input feature file, its rows are counted once
+        if file_path.endswith(DATA_FILE_EXTENSIONS) and not file_path.endswith(TRANSFORMED_TARGET_FILE_SUFFIX)
+    }
+    if len(data_file_path_set) == 0:
+        return None
+    return sum(get_row_count(file_path) for file_path in data_file_path_set)
+
+
+def get_written_bytes(path_list: list, since: float) -> int:
+    """Return total size of files under path_list modified after since (epoch seconds)"""
+    file_path_set = set()
+    for path in path_list:
+        if os.path.isfile(path):
+            file_path_set.add(os.path.abspath(path))
+            continue
+        for dir_path, _, file_name_list in os.walk(path):
+            file_path_set.update(os.path.abspath(os.path.join(dir_path, file_name)) for file_name in file_name_list)
+    return sum(os.path.getsize(file_path) for file_path in file_path_set if os.path.getmtime(file_path) >= since)
+
+
+class StageInstrumentation:
+    def __init__(self, artifact_dir: str, time_stamp: str, stage_metric_file_path: str, profile_stages: bool = False):
+        """Record wall time, cpu time, peak rss delta, rows in/out and bytes written by pipeline stages
+
+        Args:
+            artifact_dir (str): artifact directory of training pipeline
+            time_stamp (str): time stamp of current run, used to locate stage artifact directory
+            stage_metric_file_path (str): csv file where stage metrics are appended
+            profile_stages (bool, optional): dump cProfile stats of each stage. Defaults to False.
+        """
+        try:
+            self.artifact_dir = artifact_dir
+            self.time_stamp = time_stamp
+            self.stage_metric_file_path = stage_metric_file_path
+            self.profile_stages = profile_stages
+            self.stage_metric_list = []
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def get_stage_dir(self, stage_name: str) -> str:
+        stage_dir = os.path.join(self.artifact_dir, stage_name)
+        time_stamped_stage_dir = os.path.join(stage_dir, self.time_stamp)
+        return time_stamped_stage_dir if os.path.exists(time_stamped_stage_dir) else stage_dir
+
+    def get_profile_file_path(self, stage_name: str) -> str:
+        return os.path.join(
+            self.artifact_dir, STAGE_PROFILE_DIR_NAME, self.time_stamp, f"{stage_name}{STAGE_PROFILE_FILE_EXTENSION}"
+        )
+
+    def save_stage_metric(self, stage_metric: StageMetric):
+        try:
+            stage_metric_df = pd.DataFrame([stage_metric._asdict()])
+            os.makedirs(os.path.dirname(self.stage_metric_file_path), exist_ok=True)
+            if os.path.exists(self.stage_metric_file_path) and pd.read_csv(
+                self.stage_metric_file_path, nrows=0
+            ).columns.tolist() != list(StageMetric._fields):
+                # file written before a metric was added is rewritten once with the current columns
+                stage_metric_df = pd.concat([pd.read_csv(self.stage_metric_file_path), stage_metric_df])
+                stage_metric_df[list(StageMetric._fields)].to_csv(self.stage_metric_file_path, index=False, mode="w")
+            elif os.path.exists(self.stage_metric_file_path):
+                stage_metric_df.to_csv(self.stage_metric_file_path, index=False, header=False, mode="a")
+            else:
+                stage_metric_df.to_csv(self.stage_metric_file_path, index=False, header=True, mode="w")
+        except Exception as e:
+            raise HousingException(e) from e
+
+    def run_stage(self, experiment_id: str, stage_name: str, stage_function, *args, **kwargs):
+        """Execute stage_function and record its StageMetric, returns output of stage_function"""
+        try:
+            logging.info(f"Stage [{stage_name}] started")
+            profiler = cProfile.Profile() if self.profile_stages else None
+            start_time = datetime.now()
+            start_epoch = time.time()
+            start_peak_rss = get_peak_rss_mb()
+            start_cpu_time = get_cpu_time()
+            start_child_cpu_time_dict = get_child_cpu_time_dict()
+            start_wall_time = time.perf_counter()
+            if profiler is not None:
+                profiler.enable()
+            try:
+                artifact = stage_function(*args, **kwargs)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+            wall_time = time.perf_counter() - start_wall_time
+            cpu_time = get_cpu_time() - start_cpu_time
+            worker_cpu_time = get_worker_cpu_time(start_child_cpu_time_dict, get_child_cpu_time_dict())
+            end_peak_rss = get_peak_rss_mb()
+
+            profile_file_path = None
+            if profiler is not None:
+                profile_file_path = self.get_profile_file_path(stage_name)
+                os.makedirs(os.path.dirname(profile_file_path), exist_ok=True)
+                profiler.dump_stats(profile_file_path)
+
+            input_artifact_list = list(args) + list(kwargs.values())
+            written_path_list = [self.get_stage_dir(stage_name)] + get_artifact_file_path_list(artifact)
+            stage_metric = StageMetric(
+                experiment_id=experiment_id,
+                stage_name=stage_name,
+                start_time=start_time,
+                wall_time=round(wall_time, 3),
+                # cpu_time covers live pool workers too, worker_cpu_time is their share
+                cpu_time=round(cpu_time + (worker_cpu_time or 0.0), 3),
+                worker_cpu_time=None if worker_cpu_time is None else round(worker_cpu_time, 3),
+                peak_rss_delta_mb=None if start_peak_rss is None else round(end_peak_rss - start_peak_rss, 3),
+                rows_in=get_artifact_row_count(input_artifact_list),
+                rows_out=get_artifact_row_count([artifact]),
+                artifact_bytes=get_written_bytes(written_path_list, since=start_epoch),
+                profile_file_path=profile_file_path,
+            )
+            self.stage_metric_list.append(stage_metric)
+            self.save_stage_metric(stage_metric)
+            logging.info(f"Stage [{stage_name}] completed: {stage_metric}")
+            return artifact
+        except Exception as e:
+            raise HousingException(e) from e
+
+
+def instrument_stage(stage_name: str):
+    """Decorator for Pipeline.start_* methods to record StageMetric of the stage
+
+    Args:
+        stage_name (str): name of stage, same as artifact directory name of the stage to measure bytes written
+    """
+
+    def decorator(stage_function):
+        @functools.wraps(stage_function)
+        def wrapper(pipeline, *args, **kwargs):
+            return pipeline.stage_instrumentation.run_stage(
+                pipeline.experiment.experiment_id,
+                stage_name,
+                stage_function,
+                pipeline,
+                *args,
+                **kwargs,
+            )
+
+        return wrapper
+
+    return decorator
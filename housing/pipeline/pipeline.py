@@ -1,21 +1,19 @@
 import os
 import uuid
+import fcntl
 import pandas as pd
 from threading import Thread
 from datetime import datetime
 from collections import namedtuple
-from housing.constants import EXPERIMENT_DIR_NAME, EXPERIMENT_FILE_NAME
+from housing.constants import *
 from housing.config.configuration import Configuration
 from housing.entity.artifact_entity import *
-from housing.component.data_ingestion import DataIngestion
-from housing.component.data_validation import DataValidation
-from housing.component.data_transformation import DataTransformation
-from housing.component.model_trainer import ModelTrainer
-from housing.component.model_evaluation import ModelEvaluation
-from housing.component.model_pusher import ModelPusher
+from housing.pipeline.instrumentation import StageInstrumentation, instrument_stage
 from housing.logger import logging
 from housing.exception import HousingException
 
+# ? components are imported in their start_* method so that importing Pipeline (e.g. by web workers serving only
+# prediction) doesn't load training dependencies like evidently, matplotlib and model selection modules
 
 Experiment = namedtuple(
     "Experiment",
@@ -31,34 +29,95 @@ Experiment = namedtuple(
         "experiment_file_path",
         "accuracy",
         "is_model_accepted",
+        "is_sample_mode",
     ],
 )
 
 
+def get_pipeline_lock_file_path(artifact_dir: str, time_stamp: str) -> str:
+    return os.path.join(artifact_dir, MODEL_TRAINER_ARTIFACT_DIR, time_stamp, PIPELINE_LOCK_FILE_NAME)
+
+
+def acquire_pipeline_lock(lock_file_path: str):
+    """
+    Return open lock file of run locked exclusively by this process, None when pipeline of run is alive in another
+    process or thread. Lock is released by closing the file or when the process dies, e.g. worker restart or OOM.
+    """
+    try:
+        os.makedirs(os.path.dirname(lock_file_path), exist_ok=True)
+        lock_file = open(lock_file_path, "a+")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return None
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        return lock_file
+    except Exception as e:
+        raise HousingException(e) from e
+
+
+def is_pipeline_alive(lock_file_path: str) -> bool:
+    """Return True when pipeline of run holds its lock, in any process"""
+    try:
+        if not os.path.exists(lock_file_path):
+            return False
+        lock_file = acquire_pipeline_lock(lock_file_path)
+        if lock_file is None:
+            return True
+        lock_file.close()
+        return False
+    except Exception as e:
+        raise HousingException(e) from e
+
+
 class Pipeline(Thread):
-    experiment: Experiment = Experiment(*([None] * 11))
+    experiment: Experiment = Experiment(*([None] * len(Experiment._fields)))
     experiment_file_path = None
+    stage_metric_file_path = None
 
-    def __init__(self, config: Configuration = Configuration()) -> None:
+    def __init__(
+        self, config: Configuration = None, profile_stages: bool = False, resume_experiment_id: str = None
+    ) -> None:
+        """
+        resume_experiment_id: id of interrupted experiment continued by this pipeline, config must have the
+        time stamp of interrupted experiment so that completed search fits are found in its artifact directory
+        """
         try:
+            # configuration is read when pipeline is created instead of when module is imported
+            config = Configuration() if config is None else config
             os.makedirs(config.training_pipeline_config.artifact_dir, exist_ok=True)
-            Pipeline.experiment_file_path = os.path.join(
-                config.training_pipeline_config.artifact_dir, EXPERIMENT_DIR_NAME, EXPERIMENT_FILE_NAME
-            )
+            Pipeline.set_experiment_file_path(config)
             super().__init__(daemon=False, name="pipeline")
             self.config = config
+            self.resume_experiment_id = resume_experiment_id
+            self.stage_instrumentation = StageInstrumentation(
+                artifact_dir=config.training_pipeline_config.artifact_dir,
+                time_stamp=config.time_stamp,
+                stage_metric_file_path=Pipeline.stage_metric_file_path,
+                profile_stages=profile_stages,
+            )
         except Exception as e:
             raise HousingException(e) from e
 
+    @instrument_stage(DATA_INGESTION_ARTIFACT_DIR)
     def start_data_ingestion(self) -> DataIngestionArtifact:
         try:
+            from housing.component.data_ingestion import DataIngestion
+
             data_ingestion = DataIngestion(data_ingestion_config=self.config.get_data_ingestion_config())
             return data_ingestion.initiate_data_ingestion()
         except Exception as e:
             raise HousingException(e) from e
 
+    @instrument_stage(DATA_VALIDATION_ARTIFACT_DIR)
     def start_data_validation(self, data_ingestion_artifact: DataIngestionArtifact) -> DataValidationArtifact:
         try:
+            from housing.component.data_validation import DataValidation
+
             data_validation = DataValidation(
                 data_validation_config=self.config.get_data_validation_config(),
                 data_ingestion_artifact=data_ingestion_artifact,
@@ -67,10 +126,13 @@ class Pipeline(Thread):
         except Exception as e:
             raise HousingException(e) from e
 
+    @instrument_stage(DATA_TRANSFORMATION_ARTIFACT_DIR)
     def start_data_transformation(
         self, data_ingestion_artifact: DataIngestionArtifact, data_validation_artifact: DataValidationArtifact
     ) -> DataTransformationArtifact:
         try:
+            from housing.component.data_transformation import DataTransformation
+
             data_transformation = DataTransformation(
                 data_transformation_config=self.config.get_data_transformation_config(),
                 data_ingestion_artifact=data_ingestion_artifact,
@@ -80,35 +142,53 @@ class Pipeline(Thread):
         except Exception as e:
             raise HousingException(e) from e
 
-    def start_model_trainer(self, data_transformation_artifact: DataTransformationArtifact) -> ModelTrainerArtifact:
+    @instrument_stage(MODEL_TRAINER_ARTIFACT_DIR)
+    def start_model_trainer(
+        self,
+        data_transformation_artifact: DataTransformationArtifact,
+        data_ingestion_artifact: DataIngestionArtifact = None,
+        data_validation_artifact: DataValidationArtifact = None,
+    ) -> ModelTrainerArtifact:
         try:
+            from housing.component.model_trainer import ModelTrainer
+
             model_trainer = ModelTrainer(
                 model_trainer_config=self.config.get_model_trainer_config(),
                 data_transformation_artifact=data_transformation_artifact,
+                data_ingestion_artifact=data_ingestion_artifact,
+                data_validation_artifact=data_validation_artifact,
             )
             return model_trainer.initiate_model_trainer()
         except Exception as e:
             raise HousingException(e) from e
 
+    @instrument_stage(MODEL_EVALUATION_ARTIFACT_DIR)
     def start_model_evaluation(
         self,
         data_ingestion_artifact: DataIngestionArtifact,
         data_validation_artifact: DataValidationArtifact,
         model_trainer_artifact: ModelTrainerArtifact,
+        data_transformation_artifact: DataTransformationArtifact = None,
     ) -> ModelEvaluationArtifact:
         try:
+            from housing.component.model_evaluation import ModelEvaluation
+
             model_eval = ModelEvaluation(
                 model_evaluation_config=self.config.get_model_evaluation_config(),
                 data_ingestion_artifact=data_ingestion_artifact,
                 data_validation_artifact=data_validation_artifact,
                 model_trainer_artifact=model_trainer_artifact,
+                data_transformation_artifact=data_transformation_artifact,
             )
             return model_eval.initiate_model_evaluation()
         except Exception as e:
             raise HousingException(e) from e
 
+    @instrument_stage(MODEL_PUSHER_ARTIFACT_DIR)
     def start_model_pusher(self, model_evaluation_artifact: ModelEvaluationArtifact) -> ModelPusherArtifact:
         try:
+            from housing.component.model_pusher import ModelPusher
+
             model_pusher = ModelPusher(
                 model_pusher_config=self.config.get_model_pusher_config(),
                 model_evaluation_artifact=model_evaluation_artifact,
@@ -117,6 +197,18 @@ class Pipeline(Thread):
         except Exception as e:
             raise HousingException(e) from e
 
+    @instrument_stage(ARTIFACT_RETENTION_ARTIFACT_DIR)
+    def start_artifact_retention(self) -> ArtifactRetentionArtifact:
+        try:
+            from housing.component.artifact_retention import ArtifactRetention
+
+            artifact_retention = ArtifactRetention(
+                artifact_retention_config=self.config.get_artifact_retention_config()
+            )
+            return artifact_retention.initiate_artifact_retention()
+        except Exception as e:
+            raise HousingException(e) from e
+
     def save_experiment(self):
         try:
             if Pipeline.experiment.experiment_id is not None:
@@ -134,7 +226,15 @@ class Pipeline(Thread):
                 experiment_report = pd.DataFrame(experiment_dict)
 
                 os.makedirs(os.path.dirname(Pipeline.experiment_file_path), exist_ok=True)
+                previous_columns = None
                 if os.path.exists(Pipeline.experiment_file_path):
+                    previous_columns = pd.read_csv(Pipeline.experiment_file_path, nrows=0).columns.tolist()
+                if previous_columns is not None and previous_columns != experiment_report.columns.tolist():
+                    # experiment file written before columns were added, rewriting with new header
+                    previous_experiment_report = pd.read_csv(Pipeline.experiment_file_path)
+                    experiment_report = pd.concat([previous_experiment_report, experiment_report], ignore_index=True)
+                    experiment_report.to_csv(Pipeline.experiment_file_path, mode="w", index=False, header=True)
+                elif previous_columns is not None:
                     experiment_report.to_csv(Pipeline.experiment_file_path, index=False, header=False, mode="a")
                 else:
                     experiment_report.to_csv(Pipeline.experiment_file_path, mode="w", index=False, header=True)
@@ -144,14 +244,26 @@ class Pipeline(Thread):
             raise HousingException(e) from e
 
     def run_pipeline(self):
+        pipeline_lock = None
         try:
             if Pipeline.experiment.running_status:
                 logging.info("Pipeline is already running")
                 return Pipeline.experiment
+            # run directories are used by one live pipeline only, a resumed run may still be alive in another worker
+            pipeline_lock = acquire_pipeline_lock(
+                get_pipeline_lock_file_path(self.config.training_pipeline_config.artifact_dir, self.config.time_stamp)
+            )
+            if pipeline_lock is None:
+                logging.info(f"Pipeline of run {self.config.time_stamp} is running in another process")
+                return Pipeline.experiment
             # data ingestion
             logging.info("Pipeline starting.")
 
             experiment_id = str(uuid.uuid4())
+            message = "Pipeline has been started."
+            if self.resume_experiment_id is not None:
+                experiment_id = self.resume_experiment_id
+                message = "Pipeline has been resumed."
 
             Pipeline.experiment = Experiment(
                 experiment_id=experiment_id,
@@ -163,8 +275,9 @@ class Pipeline(Thread):
                 execution_time=None,
                 experiment_file_path=Pipeline.experiment_file_path,
                 is_model_accepted=None,
-                message="Pipeline has been started.",
+                message=message,
                 accuracy=None,
+                is_sample_mode=self.config.training_pipeline_config.is_sample_mode,
             )
             logging.info(f"Pipeline experiment: {Pipeline.experiment}")
 
@@ -175,11 +288,16 @@ class Pipeline(Thread):
             data_transformation_artifact = self.start_data_transformation(
                 data_ingestion_artifact, data_validation_artifact
             )
-            model_trainer_artifact = self.start_model_trainer(data_transformation_artifact)
+            model_trainer_artifact = self.start_model_trainer(
+                data_transformation_artifact=data_transformation_artifact,
+                data_ingestion_artifact=data_ingestion_artifact,
+                data_validation_artifact=data_validation_artifact,
+            )
             model_evaluation_artifact = self.start_model_evaluation(
                 data_ingestion_artifact=data_ingestion_artifact,
                 data_validation_artifact=data_validation_artifact,
                 model_trainer_artifact=model_trainer_artifact,
+                data_transformation_artifact=data_transformation_artifact,
             )
             if model_evaluation_artifact.is_model_accepted:
                 model_pusher_artifact = self.start_model_pusher(model_evaluation_artifact)
@@ -188,6 +306,10 @@ class Pipeline(Thread):
                 logging.info("Trained model rejected.")
             logging.info("Pipeline completed.")
 
+            if self.config.get_artifact_retention_config().run_after_pipeline:
+                artifact_retention_artifact = self.start_artifact_retention()
+                logging.info(f"Artifact retention artifact: {artifact_retention_artifact}")
+
             stop_time = datetime.now()
             Pipeline.experiment = Experiment(
                 experiment_id=Pipeline.experiment.experiment_id,
@@ -201,11 +323,26 @@ class Pipeline(Thread):
                 experiment_file_path=Pipeline.experiment_file_path,
                 is_model_accepted=model_evaluation_artifact.is_model_accepted,
                 accuracy=model_trainer_artifact.model_accuracy,
+                is_sample_mode=self.config.training_pipeline_config.is_sample_mode,
             )
             logging.info(f"Pipeline experiment: {Pipeline.experiment}")
             self.save_experiment()
         except Exception as e:
+            if pipeline_lock is not None and Pipeline.experiment.running_status:
+                # failed run is recorded as stopped, it fails again when resumed and isn't offered for resume
+                logging.info(f"Pipeline failed: {e}")
+                stop_time = datetime.now()
+                Pipeline.experiment = Pipeline.experiment._replace(
+                    running_status=False,
+                    stop_time=stop_time,
+                    execution_time=stop_time - Pipeline.experiment.start_time,
+                    message="Pipeline has failed.",
+                )
+                self.save_experiment()
             raise HousingException(e) from e
+        finally:
+            if pipeline_lock is not None:
+                pipeline_lock.close()
 
     def run(self):
         try:
@@ -213,9 +350,51 @@ class Pipeline(Thread):
         except Exception as e:
             raise e
 
+    @classmethod
+    def set_experiment_file_path(cls, config: Configuration = None):
+        try:
+            config = Configuration() if config is None else config
+            Pipeline.experiment_file_path = os.path.join(
+                config.training_pipeline_config.artifact_dir, EXPERIMENT_DIR_NAME, EXPERIMENT_FILE_NAME
+            )
+            Pipeline.stage_metric_file_path = os.path.join(
+                config.training_pipeline_config.artifact_dir, EXPERIMENT_DIR_NAME, STAGE_METRIC_FILE_NAME
+            )
+        except Exception as e:
+            raise HousingException(e) from e
+
+    @classmethod
+    def get_interrupted_experiment(cls) -> Experiment:
+        """
+        Return last experiment if it was still running when its process died, e.g. worker restart or OOM,
+        None if it completed, failed or it is running in this or another process
+        """
+        try:
+            if Pipeline.experiment.running_status:
+                return None
+            if Pipeline.experiment_file_path is None:
+                Pipeline.set_experiment_file_path()
+            if not os.path.exists(Pipeline.experiment_file_path):
+                return None
+            df = pd.read_csv(Pipeline.experiment_file_path, dtype={"artifact_time_stamp": str})
+            if len(df) == 0 or not bool(df.iloc[-1]["running_status"]):
+                return None
+            artifact_dir = os.path.dirname(os.path.dirname(Pipeline.experiment_file_path))
+            if is_pipeline_alive(get_pipeline_lock_file_path(artifact_dir, df.iloc[-1]["artifact_time_stamp"])):
+                return None
+            experiment_dict = {field: df.iloc[-1].get(field) for field in Experiment._fields}
+            # experiments recorded before sample mode was added have no is_sample_mode
+            is_sample_mode = experiment_dict["is_sample_mode"]
+            experiment_dict["is_sample_mode"] = None if pd.isna(is_sample_mode) else bool(is_sample_mode)
+            return Experiment(**experiment_dict)
+        except Exception as e:
+            raise HousingException(e) from e
+
     @classmethod
     def get_experiments_status(cls, limit: int = 5) -> pd.DataFrame:
         try:
+            if Pipeline.experiment_file_path is None:
+                Pipeline.set_experiment_file_path()
             if os.path.exists(Pipeline.experiment_file_path):
                 df = pd.read_csv(Pipeline.experiment_file_path)
                 limit = -1 * int(limit)
@@ -224,3 +403,18 @@ class Pipeline(Thread):
                 return pd.DataFrame()
         except Exception as e:
             raise HousingException(e) from e
+
+    @classmethod
+    def get_stage_metrics(cls, limit: int = 5) -> pd.DataFrame:
+        """Return stage metrics of last limit experiments"""
+        try:
+            if Pipeline.stage_metric_file_path is None:
+                Pipeline.set_experiment_file_path()
+            if os.path.exists(Pipeline.stage_metric_file_path):
+                df = pd.read_csv(Pipeline.stage_metric_file_path)
+                experiment_id_list = df["experiment_id"].drop_duplicates().tolist()[-1 * int(limit) :]
+                return df[df["experiment_id"].isin(experiment_id_list)].drop(columns=["profile_file_path"])
+            else:
+                return pd.DataFrame()
+        except Exception as e:
+            raise HousingException(e) from e
@@ -1,10 +1,44 @@
 import os
+import io
+import json
+import lzma
+import mmap
+import zlib
+import struct
 import pickle
+import threading
 import yaml
 import numpy as np
 import pandas as pd
 from housing.constants import *
 from housing.exception import HousingException
+from contextlib import contextmanager
+
+
+def get_temp_file_path(file_path: str) -> str:
+    """Return temporary file path next to file_path, unique per process and thread"""
+    return f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def replace_file(temp_file_path: str, file_path: str):
+    """
+    Move written temp_file_path over file_path. Existing file_path is unlinked, not rewritten, so that files
+    hardlinked to it (deduplicated by artifact retention, exported by model pusher) keep their content.
+    """
+    os.replace(temp_file_path, file_path)
+
+
+@contextmanager
+def open_for_replace(file_path: str, mode: str = "wb", **kwargs):
+    """Open temporary file to be written instead of file_path, it replaces file_path when written without error"""
+    temp_file_path = get_temp_file_path(file_path)
+    try:
+        with open(temp_file_path, mode, **kwargs) as file_obj:
+            yield file_obj
+        replace_file(temp_file_path, file_path)
+    finally:
+        if os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
 
 
 def write_yaml_file(file_path: str, data: dict = None):
@@ -15,7 +49,7 @@ def write_yaml_file(file_path: str, data: dict = None):
     """
     try:
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, "w") as yaml_file:
+        with open_for_replace(file_path, "w") as yaml_file:
             if data is not None:
                 yaml.dump(data, yaml_file)
     except Exception as e:
@@ -38,43 +72,172 @@ def read_yaml_file(file_path: str) -> dict:
         raise HousingException(e) from e
 
 
-def save_numpy_array_data(file_path: str, array: np.array):
+def save_numpy_array_data(file_path: str, array: np.array, order: str = "C"):
+    """
+    order: memory layout of stored array, "C" row major or "F" column major, array is copied only if its layout
+    differs
+    """
     try:
         dir_path = os.path.dirname(file_path)
         os.makedirs(dir_path, exist_ok=True)
-        with open(file_path, "wb") as file_obj:
-            np.save(file_obj, array)
+        with open_for_replace(file_path) as file_obj:
+            np.save(file_obj, np.asarray(array, order=order))
     except Exception as e:
         raise HousingException(e) from e
 
 
-def load_numpy_array_data(file_path: str) -> np.array:
+def load_numpy_array_data(file_path: str, mmap_mode: str = None) -> np.array:
+    """
+    mmap_mode: "r" to memory map npy file read only, pages are read from disk when accessed. None to load it
+    """
     try:
+        if mmap_mode is not None:
+            return np.load(file_path, mmap_mode=mmap_mode)
         with open(file_path, "rb") as file_obj:
             return np.load(file_obj)
     except Exception as e:
         raise HousingException(e) from e
 
 
-def save_object(file_path: str, obj):
+def create_memory_mapped_array(file_path: str, array: np.array) -> np.memmap:
+    """
+    Store array as npy file and return read only memory mapped view of it.
+    Memory mapped arrays are passed to joblib workers by file reference, so workers share the page cache
+    instead of receiving a pickled copy each.
+    """
+    try:
+        dir_path = os.path.dirname(file_path)
+        os.makedirs(dir_path, exist_ok=True)
+        with open_for_replace(file_path) as file_obj:
+            np.save(file_obj, np.ascontiguousarray(array))
+        return np.load(file_path, mmap_mode="r")
+    except Exception as e:
+        raise HousingException(e) from e
+
+
+def get_compression_codec(compressor: str):
+    """Return (compress, decompress) functions of compressor, (None, None) for none"""
+    if compressor is None or compressor == NO_COMPRESSOR:
+        return None, None
+    if compressor == "zlib":
+        return zlib.compress, zlib.decompress
+    if compressor == "lzma":
+        return lzma.compress, lzma.decompress
+    if compressor == "lz4":
+        try:
+            import lz4.frame
+        except ImportError as e:
+            raise Exception("lz4 compressor requires lz4 package, pip install lz4") from e
+        return lz4.frame.compress, lz4.frame.decompress
+    raise Exception(f"Unknown compressor [{compressor}], expected one of {OBJECT_COMPRESSOR_LIST}")
+
+
+def save_object(file_path: str, obj, compressor: str = NO_COMPRESSOR):
+    """
+    Save obj in object container: pickle protocol 5 stream with large buffers (numpy arrays) written out-of-band
+    as separate aligned sections, each section compressed by compressor (none, zlib, lzma or lz4).
+    Layout: magic, pickle section, buffer sections, json header of section offsets, header size.
+    """
     try:
         dir_path = os.path.dirname(file_path)
         os.makedirs(dir_path, exist_ok=True)
-        with open(file_path, "wb") as file_obj:
-            pickle.dump(obj, file_obj)
+        compress, _ = get_compression_codec(compressor)
+        buffer_list = []
+        pickle_data = pickle.dumps(obj, protocol=5, buffer_callback=buffer_list.append)
+        section_list = []
+        with open_for_replace(file_path) as file_obj:
+            file_obj.write(OBJECT_CONTAINER_MAGIC)
+            for data in [memoryview(pickle_data)] + [buffer.raw() for buffer in buffer_list]:
+                # sections start at aligned offsets so that uncompressed buffers can be memory mapped as arrays
+                file_obj.write(b"\0" * (-file_obj.tell() % OBJECT_CONTAINER_ALIGNMENT))
+                stored_data = data if compress is None else compress(data)
+                section_list.append([file_obj.tell(), len(stored_data), data.nbytes])
+                file_obj.write(stored_data)
+            header = json.dumps({"compressor": compressor, "section_list": section_list}).encode()
+            file_obj.write(header)
+            file_obj.write(struct.pack("<Q", len(header)))
     except Exception as e:
         raise HousingException(e) from e
 
 
-def load_object(file_path: str):
+def load_object(file_path: str, mmap_mode: str = None):
+    """
+    Load object of object container, or of plain pickle file saved before object container
+    mmap_mode: "r" to memory map buffers of uncompressed container copy on write, pages are read when accessed.
+    None to read them. Compressed buffers are always read.
+    """
     try:
         with open(file_path, "rb") as file_obj:
-            return pickle.load(file_obj)
+            if file_obj.read(len(OBJECT_CONTAINER_MAGIC)) != OBJECT_CONTAINER_MAGIC:
+                file_obj.seek(0)
+                return pickle.load(file_obj)
+            file_obj.seek(-8, io.SEEK_END)
+            (header_size,) = struct.unpack("<Q", file_obj.read(8))
+            file_obj.seek(-8 - header_size, io.SEEK_END)
+            header = json.loads(file_obj.read(header_size))
+            _, decompress = get_compression_codec(header["compressor"])
+            if mmap_mode is not None and decompress is None:
+                file_view = memoryview(mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_COPY))
+                data_list = [
+                    file_view[offset : offset + stored_size] for offset, stored_size, _ in header["section_list"]
+                ]
+            else:
+                data_list = []
+                for offset, stored_size, size in header["section_list"]:
+                    file_obj.seek(offset)
+                    if decompress is None:
+                        # read straight into writable buffer, arrays built on it are writable like unpickled ones
+                        data = bytearray(size)
+                        file_obj.readinto(data)
+                    else:
+                        data = bytearray(decompress(file_obj.read(stored_size)))
+                    data_list.append(data)
+        return pickle.loads(data_list[0], buffers=data_list[1:])
     except Exception as e:
         raise HousingException(e) from e
 
 
-def load_data(file_path: str, schema_file_path: str) -> pd.DataFrame:
+def get_schema_dtype(schema_file_path: str, precision: str = None) -> dict:
+    """
+    Return read_csv dtype of every schema column, float columns in precision when given.
+    Category columns are read as object, categories of chunks read separately would differ and don't concatenate.
+    """
+    try:
+        schema = read_yaml_file(schema_file_path)[SCHEMA_COLUMN_KEY]
+        schema_dtype = dict()
+        for column, column_type in schema.items():
+            if column_type == "category":
+                schema_dtype[column] = object
+            elif precision is not None and np.issubdtype(np.dtype(column_type), np.floating):
+                schema_dtype[column] = precision
+            else:
+                schema_dtype[column] = column_type
+        return schema_dtype
+    except Exception as e:
+        raise HousingException(e) from e
+
+
+def read_data_in_chunks(file_path: str, schema_file_path: str, chunk_size: int, precision: str = None):
+    """
+    Iterate dataframe chunks of chunk_size rows of csv file_path, read with schema dtypes. Column not in schema is
+    an error as in load_data.
+    """
+    try:
+        schema_dtype = get_schema_dtype(schema_file_path, precision=precision)
+        unknown_column_list = [
+            column for column in pd.read_csv(file_path, nrows=0).columns if column not in schema_dtype
+        ]
+        if len(unknown_column_list) > 0:
+            raise Exception(f"Columns {unknown_column_list} of {file_path} are not in the schema")
+        return pd.read_csv(file_path, chunksize=chunk_size, dtype=schema_dtype)
+    except Exception as e:
+        raise HousingException(e) from e
+
+
+def load_data(file_path: str, schema_file_path: str, precision: str = None) -> pd.DataFrame:
+    """
+    precision: float dtype of float columns e.g. float32 to halve their memory, None to keep pandas default
+    """
     try:
         dataset_schema = read_yaml_file(schema_file_path)
         schema = dataset_schema[SCHEMA_COLUMN_KEY]
@@ -87,6 +250,9 @@ def load_data(file_path: str, schema_file_path: str) -> pd.DataFrame:
                 error_message = f"{error_message}\nColumn: [{column}] is not in the schema"
         if error_message:
             raise Exception(error_message)
+        if precision is not None:
+            float_column_list = dataframe.select_dtypes(include="floating").columns
+            dataframe = dataframe.astype({column: precision for column in float_column_list})
         return dataframe
     except Exception as e:
         raise HousingException(e) from e
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+from housing.entity.bootstrap_comparison import compare_with_bootstrap, RESAMPLED_ROW_BYTES
+
+
+@pytest.fixture
+def prediction():
+    random_state = np.random.RandomState(0)
+    y = random_state.rand(500) * 5e5
+    return y, y + random_state.normal(0, 5e4, 500), y + random_state.normal(0, 4.9e4, 500)
+
+
+def test_result_does_not_depend_on_block_bytes(prediction):
+    y, base_prediction, new_prediction = prediction
+    comparison_list = [
+        compare_with_bootstrap(y, base_prediction, new_prediction, n_resamples=300, block_bytes=block_bytes)
+        for block_bytes in [1, len(y) * RESAMPLED_ROW_BYTES * 7, 1 << 30]
+    ]
+    assert comparison_list[0] == comparison_list[1] == comparison_list[2]
+
+
+def test_clearly_better_model(prediction):
+    y, base_prediction, _ = prediction
+    comparison = compare_with_bootstrap(y, base_prediction, y + 1.0, n_resamples=200)
+    assert comparison.probability_better == 1.0
+    assert comparison.rmse_diff_lower <= comparison.rmse_diff <= comparison.rmse_diff_upper < 0
+    assert comparison.r2_diff > 0
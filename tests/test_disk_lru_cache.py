@@ -0,0 +1,50 @@
+import os
+import numpy as np
+from housing.entity.cv_cache import CVResultCache
+from housing.entity.prediction_cache import PredictionCache
+
+
+def test_cv_result_cache_roundtrip(tmp_path):
+    cv_result_cache = CVResultCache(cache_dir=str(tmp_path))
+    fold_result_list = [{"score": 0.5, "fit_time": 0.1}, {"score": 0.7, "fit_time": 0.2}]
+    assert cv_result_cache.get("key") is None
+    cv_result_cache.set("key", fold_result_list)
+    assert cv_result_cache.get("key") == fold_result_list
+    stats = cv_result_cache.get_stats()
+    assert (stats.hit_count, stats.miss_count, stats.write_count, stats.entry_count) == (1, 1, 1, 1)
+
+
+def test_partially_written_entry_is_miss(tmp_path):
+    prediction_cache = PredictionCache(cache_dir=str(tmp_path))
+    with open(prediction_cache.get_entry_file_path("key"), "wb") as entry_file:
+        entry_file.write(b"\x93NUMPY")
+    assert prediction_cache.get("key") is None
+    prediction_cache.set("key", np.arange(3.0))
+    np.testing.assert_array_equal(prediction_cache.get("key"), np.arange(3.0))
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    prediction_cache = PredictionCache(cache_dir=str(tmp_path))
+    for index, key in enumerate(["a", "b", "c"]):
+        prediction_cache.set(key, np.zeros(100))
+        os.utime(prediction_cache.get_entry_file_path(key), (index, index))
+    # reading "a" makes "b" the least recently used entry
+    prediction_cache.get("a")
+    entry_size = os.path.getsize(prediction_cache.get_entry_file_path("a"))
+    prediction_cache.max_size_bytes = 2 * entry_size
+    assert prediction_cache.evict() == 1
+    assert prediction_cache.get("b") is None
+    assert prediction_cache.get("a") is not None and prediction_cache.get("c") is not None
+
+
+def test_concurrent_eviction(tmp_path):
+    cache, other_cache = CVResultCache(cache_dir=str(tmp_path)), CVResultCache(cache_dir=str(tmp_path))
+    for key in ["a", "b", "c"]:
+        cache.set(key, [{"score": 0.5, "fit_time": 0.1}])
+    entry_list = cache.get_entry_list()
+    cache.max_size_bytes = other_cache.max_size_bytes = 0
+    # other process evicts every entry between listing and removing them
+    assert other_cache.evict() == 3
+    cache.get_entry_list = lambda: entry_list
+    assert cache.evict() == 0
+    assert cache.get("a") is None
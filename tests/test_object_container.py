@@ -0,0 +1,74 @@
+import os
+import pickle
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from housing.constants import OBJECT_CONTAINER_MAGIC, OBJECT_COMPRESSOR_LIST
+from housing.exception import HousingException
+from housing.utils.utils import save_object, load_object
+
+
+@pytest.fixture
+def obj():
+    random_state = np.random.RandomState(0)
+    X = random_state.rand(200, 3)
+    return {
+        "array": random_state.rand(1000, 8),
+        "int_array": np.arange(777, dtype=np.int32),
+        "fortran_array": np.asfortranarray(random_state.rand(50, 4)),
+        "empty_array": np.empty((0, 3)),
+        "model": RandomForestRegressor(n_estimators=5, random_state=0).fit(X, X.sum(axis=1)),
+        "X": X,
+        "text": "value",
+    }
+
+
+def assert_object_equal(loaded, obj):
+    assert loaded.keys() == obj.keys()
+    for key in ["array", "int_array", "fortran_array", "empty_array"]:
+        assert loaded[key].dtype == obj[key].dtype
+        assert loaded[key].flags.f_contiguous == obj[key].flags.f_contiguous
+        np.testing.assert_array_equal(loaded[key], obj[key])
+    np.testing.assert_array_equal(loaded["model"].predict(obj["X"]), obj["model"].predict(obj["X"]))
+    assert loaded["text"] == obj["text"]
+
+
+@pytest.mark.parametrize("compressor", OBJECT_COMPRESSOR_LIST)
+@pytest.mark.parametrize("mmap_mode", [None, "r"])
+def test_roundtrip(tmp_path, obj, compressor, mmap_mode):
+    if compressor == "lz4":
+        pytest.importorskip("lz4.frame")
+    file_path = str(tmp_path / "model.pkl")
+    save_object(file_path, obj, compressor=compressor)
+    with open(file_path, "rb") as file_obj:
+        assert file_obj.read(len(OBJECT_CONTAINER_MAGIC)) == OBJECT_CONTAINER_MAGIC
+    assert_object_equal(load_object(file_path, mmap_mode=mmap_mode), obj)
+
+
+def test_compressed_container_is_smaller(tmp_path, obj):
+    obj["array"] = np.zeros((1000, 8))
+    save_object(str(tmp_path / "none.pkl"), obj)
+    save_object(str(tmp_path / "zlib.pkl"), obj, compressor="zlib")
+    assert os.path.getsize(tmp_path / "zlib.pkl") < os.path.getsize(tmp_path / "none.pkl")
+
+
+def test_memory_mapped_array_is_copy_on_write(tmp_path, obj):
+    file_path = str(tmp_path / "model.pkl")
+    save_object(file_path, obj)
+    loaded = load_object(file_path, mmap_mode="r")
+    # arrays are writable like unpickled ones, writes never reach the file
+    loaded["array"][0, 0] = -1.0
+    assert load_object(file_path)["array"][0, 0] == obj["array"][0, 0]
+
+
+def test_plain_pickle_fallback(tmp_path, obj):
+    file_path = str(tmp_path / "model.pkl")
+    with open(file_path, "wb") as file_obj:
+        pickle.dump(obj, file_obj)
+    assert_object_equal(load_object(file_path), obj)
+    assert_object_equal(load_object(file_path, mmap_mode="r"), obj)
+
+
+def test_unknown_compressor(tmp_path, obj):
+    with pytest.raises(HousingException):
+        save_object(str(tmp_path / "model.pkl"), obj, compressor="zstd")
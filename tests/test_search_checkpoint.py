@@ -0,0 +1,105 @@
+import json
+import numpy as np
+import pytest
+import yaml
+from sklearn.linear_model import Ridge
+from sklearn.model_selection import GridSearchCV
+from housing.entity.model_factory import InitializedModelDetail, ModelFactory
+from housing.entity.search_strategy import get_search_strategy
+
+PARAM_GRID = {"alpha": [0.01, 0.1, 1.0, 10.0]}
+CV = 3
+
+
+class SearchInterrupted(BaseException):
+    """Stands in for the process being killed, it is not an Exception so nothing on the way catches it"""
+
+
+class InterruptibleRidge(Ridge):
+    # number of fits left before the search is interrupted, None to never interrupt
+    fit_budget = None
+    fit_count = 0
+
+    def fit(self, X, y, sample_weight=None):
+        if InterruptibleRidge.fit_budget is not None:
+            if InterruptibleRidge.fit_budget == 0:
+                raise SearchInterrupted()
+            InterruptibleRidge.fit_budget -= 1
+        InterruptibleRidge.fit_count += 1
+        return super().fit(X, y, sample_weight=sample_weight)
+
+
+@pytest.fixture
+def data():
+    random_state = np.random.RandomState(0)
+    X = random_state.rand(300, 4)
+    y = X @ np.array([1.0, -2.0, 3.0, 0.5]) + random_state.normal(scale=0.5, size=300)
+    return X, y
+
+
+@pytest.fixture
+def model_config_path(tmp_path):
+    model_config_path = tmp_path / "model.yaml"
+    model_config = {
+        "grid_search": {"module": "sklearn.model_selection", "class": "GridSearchCV", "params": {"cv": CV}},
+        "model_selection": {},
+    }
+    model_config_path.write_text(yaml.safe_dump(model_config))
+    return str(model_config_path)
+
+
+@pytest.fixture(autouse=True)
+def reset_fit_counter():
+    InterruptibleRidge.fit_budget = None
+    InterruptibleRidge.fit_count = 0
+    yield
+    InterruptibleRidge.fit_budget = None
+
+
+def search(model_config_path: str, checkpoint_file_path: str, X, y):
+    model_factory = ModelFactory(model_config_path=model_config_path, checkpoint_file_path=checkpoint_file_path)
+    initialized_model = InitializedModelDetail(
+        model_serial_number="module_0",
+        model=InterruptibleRidge(),
+        param_grid_search=PARAM_GRID,
+        model_name="InterruptibleRidge",
+        search_strategy=get_search_strategy({}),
+    )
+    return model_factory.initiate_best_parameter_search_for_initialized_models([initialized_model], X, y)[0]
+
+
+@pytest.mark.parametrize("completed_fit_count", [1, 5, 11])
+def test_resumed_search_matches_uninterrupted_search(tmp_path, data, model_config_path, completed_fit_count):
+    X, y = data
+    fit_count = len(PARAM_GRID["alpha"]) * CV
+    uninterrupted = search(model_config_path, str(tmp_path / "uninterrupted.jsonl"), X, y)
+
+    checkpoint_file_path = str(tmp_path / "search_checkpoint.jsonl")
+    InterruptibleRidge.fit_budget = completed_fit_count
+    with pytest.raises(SearchInterrupted):
+        search(model_config_path, checkpoint_file_path, X, y)
+    with open(checkpoint_file_path) as checkpoint_file:
+        assert len(checkpoint_file.readlines()) == completed_fit_count
+    # process died while appending the next record
+    with open(checkpoint_file_path, "a") as checkpoint_file:
+        checkpoint_file.write('{"candidate": "')
+
+    InterruptibleRidge.fit_budget = None
+    InterruptibleRidge.fit_count = 0
+    resumed = search(model_config_path, checkpoint_file_path, X, y)
+
+    # only the remaining folds and the refit of best parameters are fitted
+    assert InterruptibleRidge.fit_count == fit_count - completed_fit_count + 1
+    with open(checkpoint_file_path) as checkpoint_file:
+        assert len([json.loads(line) for line in checkpoint_file]) == fit_count
+    assert resumed.best_parameters == uninterrupted.best_parameters
+    assert resumed.best_score == uninterrupted.best_score
+    np.testing.assert_allclose(resumed.best_model.coef_, uninterrupted.best_model.coef_)
+
+
+def test_checkpointed_search_matches_grid_search_cv(tmp_path, data, model_config_path):
+    X, y = data
+    searched = search(model_config_path, str(tmp_path / "search_checkpoint.jsonl"), X, y)
+    grid_search_cv = GridSearchCV(Ridge(), param_grid=PARAM_GRID, cv=CV).fit(X, y)
+    assert searched.best_parameters == grid_search_cv.best_params_
+    assert searched.best_score == pytest.approx(grid_search_cv.best_score_)